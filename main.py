@@ -7,13 +7,14 @@
 import sys
 import os
 import re
+import asyncio
 from pathlib import Path
 from urllib.parse import urljoin
 
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from config import PRODUCT_LIST_URL
+from config import PRODUCT_LIST_URL, CATALOG_EXPORT_JSON
 from scraper import BandaiScraper
 
 
@@ -57,6 +58,57 @@ def load_products_from_json(json_file_path: str = 'data/scraped_data.json'):
 
 
 
+def renew_batch_leases(queue_manager, products: list):
+    """延长一批产品的租约（处理耗时可能超过租约时长），未能续约的产品可能已被其他进程领取"""
+    if not products:
+        return
+    renewed = queue_manager.renew_leases(product['id'] for product in products)
+    if renewed < len(products):
+        print(f"⚠️ {len(products) - renewed} 个产品的租约已失效，可能已被其他进程重新领取")
+
+
+async def keep_leases_alive(queue_manager, products: list):
+    """异步抓取一批产品期间，每隔三分之一租约时长续约一次"""
+    while True:
+        await asyncio.sleep(queue_manager.lease_seconds / 3)
+        renew_batch_leases(queue_manager, products)
+
+
+async def scrape_details_async(products: list, base_dir: str, async_scraper=None, parse_pool=None,
+                               queue_manager=None) -> list:
+    """
+    使用异步爬虫并发抓取一批产品详情
+    
+    Args:
+        products: 待处理队列中的产品记录
+        base_dir: 基础目录路径（如 'data/HG'）
+        async_scraper: 整个运行共用的异步爬虫（AsyncBandaiScraper），每批在新的事件循环中打开/关闭其HTTP会话；
+            不传时临时创建一个（连同其包装的同步爬虫）并在结束时关闭
+        parse_pool: 解析进程池（ParsePool），临时创建异步爬虫时使用，详情页在子进程中解析
+        queue_manager: 领取这批产品的队列，传入时抓取期间定期续约
+        
+    Returns:
+        list: 与 products 一一对应的详情爬取结果
+    """
+    from async_scraper import AsyncBandaiScraper
+    
+    owned = async_scraper is None
+    if owned:
+        async_scraper = AsyncBandaiScraper(parse_pool=parse_pool)
+    renewer = asyncio.ensure_future(keep_leases_alive(queue_manager, products)) if queue_manager else None
+    try:
+        async with async_scraper:
+            return await async_scraper.scrape_many_details(products, base_dir)
+    finally:
+        if renewer is not None:
+            renewer.cancel()
+        if owned:
+            async_scraper.scraper.image_downloader.close()
+            async_scraper.scraper.catalog.close()
+            async_scraper.scraper.http_cache.close()
+            async_scraper.scraper.session.close()
+
+
 def main():
     """
     主函数
@@ -66,18 +118,20 @@ def main():
     
     # 创建爬虫实例和队列管理器
     scraper = BandaiScraper()
-    from queue_manager import QueueManager
-    from config import Config
+    from queue_manager import create_queue_manager
     
-    queue_manager = QueueManager(Config.DATABASE_PATH)
+    # 队列后端由 QUEUE_BACKEND 决定（默认SQLite；redis 时多台机器可共用一个队列）
+    queue_manager = create_queue_manager()
     
-    # 重置处理中的任务为待处理状态
+    # 重置租约到期的处理中任务为待处理状态（其他进程持有租约的任务不受影响）
     print("=== 检查并重置处理中的任务 ===")
     queue_manager.reset_processing_to_pending()
     
     # 配置参数
     start_page = 1
     batch_size = 10
+    use_async = False  # 为True时每批产品详情并发抓取（建议同时调大 batch_size）
+    use_parse_pool = True  # 异步抓取时，详情页交给解析进程池解析（进程数见 PARSE_WORKERS）
     brand_code = "MGEX"  # 使用大写品牌代码
     from config import BRAND_CODE_TO_SLUG
     brand_slug = BRAND_CODE_TO_SLUG.get(brand_code)
@@ -86,10 +140,8 @@ def main():
     
     # 1. 爬取产品列表并添加到待处理队列
     print(f"=== 爬取产品列表（第 {start_page} 到 {end_page} 页） ===")
-    for page_num in range(start_page, end_page + 1):
-        print(f"\n正在爬取第 {page_num} 页...")
-        list_result = scraper.scrape_product_list(num_pages=1, start_page=page_num, base_url=base_url, brand_code=brand_code)
-        
+    list_results = scraper.scrape_product_lists_concurrent(base_url, start_page, end_page, brand_code)
+    for page_num, list_result in list_results.items():
         if list_result.success and list_result.data:
             added_count = queue_manager.add_to_pending_queue(list_result.data, page_num)
             print(f"第 {page_num} 页添加了 {added_count} 个产品到待处理队列")
@@ -103,67 +155,111 @@ def main():
     # 2. 从待处理队列获取产品进行详情爬取
     print("\n=== 开始处理待处理队列 ===")
     
+    parse_pool = None
+    async_scraper = None
+    if use_async:
+        from async_scraper import AsyncBandaiScraper
+        if use_parse_pool:
+            from parse_pool import ParsePool
+            parse_pool = ParsePool()
+        # 整个运行共用一个异步爬虫，包装同步爬虫以沿用其缓存、存储、速率控制器与产品目录库
+        async_scraper = AsyncBandaiScraper(scraper, parse_pool=parse_pool)
+    
     success_count = 0
     failed_count = 0
     
+    # 完成/失败状态经写缓冲批量提交，每批结束时统一写入；
+    # 每次提交状态前先提交产品目录库，产品不会在详情落盘之前被标记为已完成
+    status_buffer = queue_manager.write_buffer(before_flush=scraper.catalog.flush)
+    
     while True:
-        # 获取待处理的产品
-        pending_products = queue_manager.get_pending_products(batch_size)
+        # 原子地领取待处理的产品（标记为处理中并持有租约，多个进程可同时运行）
+        pending_products = queue_manager.claim_pending_products(batch_size)
         
         if not pending_products:
             print("✅ 待处理队列为空，处理完成！")
             break
         
-        print(f"\n获取到 {len(pending_products)} 个待处理产品")
+        print(f"\n领取到 {len(pending_products)} 个待处理产品")
+        
+        if use_async:
+            results = asyncio.run(scrape_details_async(pending_products, f'data/{brand_code}', async_scraper,
+                                                       queue_manager=queue_manager))
+        else:
+            results = None
         
-        for product in pending_products:
+        for index, product in enumerate(pending_products):
             print(f"\n--- 处理产品: {product['product_name']} ---")
             print(f"URL: {product['url']}")
             
-            # 标记为处理中
-            queue_manager.mark_as_processing(product['id'])
-            
             try:
                 # 爬取产品详情
-                result = scraper.scrape_product_details(
-                    product_url=product['url'], 
-                    base_dir=f'data/{brand_code}',
-                    queue_product_name=product['product_name']
-                )
+                if results is not None:
+                    result = results[index]
+                else:
+                    result = scraper.scrape_product_details(
+                        product_url=product['url'], 
+                        base_dir=f'data/{brand_code}',
+                        queue_product_name=product['product_name']
+                    )
                 
                 if result:
                     product_details, product_dir = result
                     # 详情已保存至本地文件夹
-                    queue_manager.mark_as_completed(product['id'])
+                    status_buffer.complete(product['id'])
                     success_count += 1
                     print(f"✅ 产品处理成功")
                 else:
-                    raise Exception("产品详情爬取失败")
+                    raise Exception(scraper.failure_reasons.pop(product['url'], "产品详情爬取失败"))
                     
             except Exception as e:
                 print(f"❌ 产品处理失败: {e}")
-                queue_manager.add_to_failed_queue(
+                # 加入失败队列，并标记为已完成，避免重复处理
+                status_buffer.fail(
+                    product['id'],
                     product['url'], 
                     product['product_name'], 
                     str(e)
                 )
-                queue_manager.mark_as_completed(product['id'])  # 标记为已完成，避免重复处理
+                print(f"❌ 已添加失败产品到失败队列: {product['product_name']}")
                 failed_count += 1
+            
+            # 逐个处理时，每处理完一个产品为本批剩余的产品续约
+            if results is None:
+                renew_batch_leases(queue_manager, pending_products[index + 1:])
         
-        # 显示当前统计
+        # 显示当前统计（提交队列状态前会先提交本批产品详情）
+        status_buffer.flush()
         stats = queue_manager.get_queue_stats()
         print(f"\n当前统计: 成功 {success_count}, 失败 {failed_count}")
         print(f"队列状态: 待处理 {stats['pending']}, 处理中 {stats['processing']}, 已完成 {stats['completed']}, 失败 {stats['failed']}")
+        print(f"请求速率: {scraper.rate_summary()}")
+    
+    status_buffer.close()
+    if parse_pool is not None:
+        parse_pool.close()
     
     # 最终统计
     print("\n" + "=" * 50)
     print("=== 处理完成 ===")
     print(f"成功处理: {success_count} 个产品")
     print(f"失败: {failed_count} 个产品")
+    scraper.http_cache.report()
+    if scraper.image_store:
+        scraper.image_store.report()
+    scraper.image_manifest.report()
+    if CATALOG_EXPORT_JSON:
+        scraper.catalog.export_json()
+    scraper.catalog.report()
+    scraper.catalog.close()
+    scraper.http_cache.close()
+    scraper.image_downloader.close()
+    scraper.session.close()
     
     # 清理已完成的项目
     if success_count > 0:
         queue_manager.clear_completed()
+    queue_manager.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步万代模型爬虫
+基于 asyncio + aiohttp 并发抓取，解析与存储逻辑委托给所包装的 BandaiScraper
+"""
+
+import asyncio
+import os
+import time
+from urllib.parse import urlparse
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+from config import (
+    BASE_URL, PRODUCT_LIST_URL, DEFAULT_HEADERS,
+    REQUEST_TIMEOUT, IMAGE_TIMEOUT, IMAGE_CHUNK_SIZE, MAX_CONCURRENCY_PER_HOST, PARSER_BACKEND
+)
+from image_downloader import PartialDownload, format_latencies
+from models import ProductDetails, ScrapingResult
+from parse_pool import ParsePool, PipelineStats
+from scraper import BandaiScraper
+
+
+class AsyncBandaiScraper:
+    """
+    异步万代模型爬虫类
+
+    包装一个 BandaiScraper，沿用其HTTP缓存、图片存储/清单/下载器、HTML归档、速率控制器、
+    产品目录库与失败原因，只把网络请求换成协程；包装的同步爬虫照常可用。
+    公开方法与 BandaiScraper 同名，但均为协程；同一主机同时进行中的请求数不超过 max_per_host。
+    需在 `async with` 中使用以管理HTTP会话，同一实例可在多个事件循环中先后使用。
+    传入 parse_pool 时详情页在解析进程池中解析，事件循环只负责网络I/O。
+    """
+
+    def __init__(self, scraper: Optional[BandaiScraper] = None, max_per_host: int = MAX_CONCURRENCY_PER_HOST,
+                 parser_backend: str = PARSER_BACKEND, parse_pool: Optional[ParsePool] = None):
+        """
+        Args:
+            scraper: 被包装的同步爬虫（其组件由调用方关闭），不传时按 parser_backend 新建一个
+            max_per_host: 同一主机的最大并发请求数
+            parser_backend: 新建同步爬虫时使用的HTML解析后端
+            parse_pool: 详情页解析进程池
+        """
+        self.scraper = scraper or BandaiScraper(parser_backend=parser_backend)
+        self.max_per_host = max_per_host
+        self.parse_pool = parse_pool
+        self.stage_stats = PipelineStats()
+        self.http: Optional[aiohttp.ClientSession] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._image_slots: Optional[asyncio.Semaphore] = None
+        self._image_inflight: Dict[str, asyncio.Future] = {}
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """创建异步HTTP会话（同一实例可在多个事件循环中先后使用，各循环的并发信号量重新创建）"""
+        if self.http is None:
+            self._host_semaphores = {}
+            self._image_slots = None
+            self._image_inflight = {}
+            connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.max_per_host)
+            self.http = aiohttp.ClientSession(headers=DEFAULT_HEADERS, connector=connector)
+
+    async def close(self):
+        """关闭异步HTTP会话"""
+        if self.http is not None:
+            await self.http.close()
+            self.http = None
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """获取URL所属主机的并发信号量"""
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def _fetch_html_async(self, url: str, kind: str = 'page') -> str:
+        """
+        异步请求页面并返回HTML文本
+
+        Args:
+            url: 页面URL
+            kind: 页面类型（'list' / 'detail'），用于归档索引
+
+        Returns:
+            str: 页面HTML文本（请求失败时抛出 aiohttp 异常）
+        """
+        return (await self._fetch_page_async(url, kind))[0]
+
+    async def _fetch_page_async(self, url: str, kind: str = 'page') -> Tuple[str, bool]:
+        """
+        异步请求页面，有缓存时发条件请求
+
+        Returns:
+            Tuple[str, bool]: (页面HTML文本, 内容是否未修改)，请求失败时抛出 aiohttp 异常
+        """
+        body, not_modified = await self._fetch_body_async(url, kind)
+        return body.decode('utf-8', errors='replace'), not_modified
+
+    async def _fetch_body_async(self, url: str, kind: str = 'page') -> Tuple[bytes, bool]:
+        """
+        异步请求页面，有缓存时发条件请求；重放模式下从归档读取（同 BandaiScraper._fetch_page）
+
+        Returns:
+            Tuple[bytes, bool]: (页面原始字节, 内容是否未修改)，请求失败时抛出 aiohttp 异常，
+                重放模式下归档缺失时抛出 ArchiveMiss
+        """
+        if self.scraper.replay:
+            body = self.scraper.html_archive.get(url)
+            print(f"从归档读取页面: {len(body)} 字节")
+            return body, False
+
+        cache_entry = self.scraper.http_cache.get(url)
+        if cache_entry and cache_entry.body is None:
+            cache_entry = None
+        headers = self.scraper.http_cache.conditional_headers(cache_entry)
+
+        controller = self.scraper.rate_controller
+        await controller.before_request_async()
+        async with self._host_semaphore(url):
+            timeout = aiohttp.ClientTimeout(total=controller.timeout(REQUEST_TIMEOUT))
+            start = time.monotonic()
+            try:
+                async with self.http.get(url, headers=headers, timeout=timeout) as response:
+                    controller.record(time.monotonic() - start, response.status, response.headers.get('Retry-After'))
+                    if response.status == 304 and cache_entry:
+                        self.scraper.http_cache.record_hit()
+                        print(f"响应状态码: 304（内容未修改，使用缓存）")
+                        return cache_entry.body, True
+                    response.raise_for_status()
+                    body = await response.read()
+            except asyncio.TimeoutError:
+                controller.record(time.monotonic() - start, timed_out=True)
+                raise
+
+        self.scraper.http_cache.record_miss()
+        self.scraper.http_cache.store(url, response.headers, body)
+        if self.scraper.html_archive:
+            self.scraper.html_archive.put(url, body, kind)
+        print(f"响应状态码: {response.status}")
+        print(f"响应内容长度: {len(body)} 字节")
+        return body, False
+
+    async def _extract_detail_fields_async(self, body: bytes) -> dict:
+        """提取详情页字段：有解析进程池时交给子进程，否则在当前线程解析"""
+        if self.parse_pool is not None:
+            return await self.parse_pool.extract_detail_async(body)
+        doc = self.scraper.data_extractor.parse(body.decode('utf-8', errors='replace'))
+        return self.scraper.data_extractor.extract_product_details(doc)
+
+    async def get_total_pages(self, base_url: Optional[str] = None) -> int:
+        """
+        获取产品列表的总页数
+
+        Returns:
+            int: 总页数，获取失败时返回1
+        """
+        try:
+            target_url = base_url or PRODUCT_LIST_URL
+            print(f"正在获取总页数: {target_url}")
+            html = await self._fetch_html_async(target_url, kind='list')
+            doc = self.scraper.data_extractor.parse_list_page(html)
+            self.scraper._parsed_list_pages = {target_url: doc}
+            return self.scraper.data_extractor.extract_total_pages(doc)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"获取总页数时请求错误: {e}")
+            return 1
+        except Exception as e:
+            print(f"获取总页数时出错: {e}")
+            return 1
+
+    async def scrape_product_list(self, num_pages: int = None, start_page: int = 1, base_url: str = None, brand_code: str = None) -> ScrapingResult:
+        """
+        并发抓取产品列表页面
+
+        各页同时请求，结果按页码顺序合并；遇到没有产品的页面时丢弃其后的页面，
+        与同步版本"到最后一页即停止"的行为一致。
+
+        Args:
+            num_pages: 爬取页数
+            start_page: 起始页码，默认为1
+            base_url: 列表页基础URL
+            brand_code: 品牌代码（决定头像保存目录）
+
+        Returns:
+            ScrapingResult: 爬取结果
+        """
+        if base_url is None:
+            print("❌ 未提供基础URL")
+            return ScrapingResult(success=False, error_message="未提供基础URL")
+
+        pages = list(range(start_page, start_page + num_pages))
+        page_results = await asyncio.gather(
+            *(self._scrape_list_page(page, base_url, brand_code) for page in pages),
+            return_exceptions=True
+        )
+
+        all_results = []
+        for page, result in zip(pages, page_results):
+            if isinstance(result, (aiohttp.ClientError, asyncio.TimeoutError)):
+                error_msg = f"请求错误: {result}"
+                print(error_msg)
+                return ScrapingResult(success=False, error_message=error_msg)
+            if isinstance(result, Exception):
+                error_msg = f"解析错误: {result}"
+                print(error_msg)
+                return ScrapingResult(success=False, error_message=error_msg)
+            if not result:
+                print(f"第 {page} 页没有产品，停止爬取")
+                break
+            all_results.extend(result)
+
+        print(f"\n总共收集到 {len(all_results)} 个产品链接")
+        return ScrapingResult(success=True, data=all_results)
+
+    async def _scrape_list_page(self, page: int, base_url: str, brand_code: Optional[str]) -> list:
+        """抓取单个列表页，返回该页的产品链接列表"""
+        current_url = base_url if page == 1 else f"{base_url}?p={page}"
+        print(f"\n正在访问第 {page} 页: {current_url}")
+        doc = self.scraper._parsed_list_pages.pop(current_url, None)
+        if doc is None:
+            if not self.scraper.replay:
+                await self.scraper.list_rate_limiter.acquire_async()
+            html = await self._fetch_html_async(current_url, kind='list')
+            doc = self.scraper.data_extractor.parse_list_page(html)
+
+        cards = self.scraper.data_extractor.extract_product_cards(doc)
+        if cards is None:
+            print(f"第 {page} 页未找到产品卡片，可能已到最后一页")
+            return []
+
+        page_results = []
+        for product_link, product_price, product_release_date in cards:
+            page_results.append(product_link)
+            try:
+                if product_link.avatar and product_link.href:
+                    product_dir = self.scraper._list_product_dir(product_link.text, brand_code)
+                    target_avatar_path = self.scraper._avatar_target_path(product_link.avatar, product_dir)
+                    if not self.scraper.replay and not (target_avatar_path and os.path.exists(target_avatar_path)):
+                        await self._download_single_image_async(product_link.avatar, current_url, product_dir)
+                    self.scraper._update_list_product_record(product_dir, product_link, product_price,
+                                                             product_release_date, brand_code)
+            except Exception as e:
+                print(f"  列表头像处理失败: {e}")
+
+        print(f"第 {page} 页收集到 {len(page_results)} 个产品链接")
+        return page_results
+
+    async def scrape_product_details(self, product_url: str, base_dir: str, queue_product_name: str) -> Optional[Tuple[ProductDetails, str]]:
+        """
+        抓取产品详情页面
+
+        Args:
+            product_url: 产品详情页URL
+            base_dir: 基础目录路径（如 'data/HG'）
+            queue_product_name: 队列中的产品名称，用于确定最终路径
+
+        Returns:
+            Tuple[ProductDetails, str]: (产品详情信息, 产品文件夹路径)，失败时返回None
+        """
+        url = product_url
+
+        # Premium Bandai 页面不发请求，直接走同步逻辑
+        if url and 'p-bandai' in url:
+            return self.scraper._scrape_p_bandai_details(url, base_dir, queue_product_name)
+
+        if not url or not url.startswith(f'{BASE_URL}/item'):
+            return self.scraper._record_failure(url, f"不支持的URL格式: {url}")
+
+        try:
+            print(f"正在访问产品详情页: {url}")
+            with self.stage_stats.track('fetch'):
+                body, not_modified = await self._fetch_body_async(url, kind='detail')
+            if not_modified:
+                unchanged = self.scraper._load_unchanged_details(url, base_dir)
+                if unchanged:
+                    return unchanged
+
+            with self.stage_stats.track('parse'):
+                fields = await self._extract_detail_fields_async(body)
+            product_name = fields['name']
+            print(f"解析完成: {product_name}")
+            output_path = self.scraper._resolve_output_path(base_dir, queue_product_name, product_name)
+            existing_data = self.scraper._load_existing_details(output_path, url)
+            if existing_data.get('image_links'):
+                fields['image_links'] = existing_data['image_links']
+            image_links = fields['image_links']
+
+            # 重放模式不访问网络
+            missing_images = [] if self.scraper.replay else self.scraper._missing_images(output_path, image_links)
+            if missing_images:
+                with self.stage_stats.track('images'):
+                    downloaded_files, download_success = await self._download_images_async(
+                        missing_images, url, os.path.join(output_path, "images"),
+                        self.scraper.image_downloader.expected_filenames(image_links)
+                    )
+                if download_success:
+                    print(f"✅ 图片下载成功，共下载 {len(downloaded_files)} 张图片")
+                else:
+                    print(f"❌ 图片下载失败")
+                    raise Exception("图片下载失败，任务失败")
+
+            product_details = self.scraper._build_product_details(product_name, fields, url, base_dir, existing_data)
+            self.scraper._save_product_details(product_details, output_path)
+            self.scraper.http_cache.mark_extracted(url, output_path)
+            return product_details, output_path
+
+        except aiohttp.ClientResponseError as e:
+            return self.scraper._record_failure(url, f"请求产品页面时出错: HTTP {e.status}: {e.message}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return self.scraper._record_failure(url, f"请求产品页面时出错: {e!r}")
+        except Exception as e:
+            return self.scraper._record_failure(url, f"处理产品详情时出错: {e}")
+
+    async def scrape_many_details(self, products: List[Dict], base_dir: str) -> List[Optional[Tuple[ProductDetails, str]]]:
+        """
+        并发抓取多个产品详情
+
+        Args:
+            products: 待处理队列中的产品记录（需包含 url 与 product_name）
+            base_dir: 基础目录路径（如 'data/HG'）
+
+        Returns:
+            List: 与 products 一一对应的 scrape_product_details 结果（结束时输出各阶段队列深度）
+        """
+        results = await asyncio.gather(*(
+            self.scrape_product_details(
+                product_url=product['url'],
+                base_dir=base_dir,
+                queue_product_name=product['product_name']
+            )
+            for product in products
+        ))
+        print(f"📊 阶段队列深度: {self.stage_stats.report()}")
+        return results
+
+    async def _download_images_async(self, image_links: List[str], referer_url: str, output_path: str,
+                                     filenames: Optional[Dict[str, str]] = None) -> Tuple[List[str], bool]:
+        """
+        并发下载一个产品的图片，遇到失败即取消其余下载，已完成的登记到图片清单（与 ImageDownloader.download_images 一致）
+
+        各产品的图片下载共用 image_downloader.max_workers 个并发名额。
+        """
+        filenames = filenames or {}
+
+        async def timed_download(img_url: str) -> Tuple[Optional[str], float]:
+            async with self._image_semaphore():
+                return await self._fetch_image_async(img_url, referer_url, output_path, filenames.get(img_url))
+
+        self.scraper.image_downloader.remove_stale_temp_files(output_path)
+        tasks = []
+        for i, img_url in enumerate(image_links):
+            print(f"下载图片 {i+1}/{len(image_links)}: {img_url[:50]}...")
+            tasks.append(asyncio.ensure_future(timed_download(img_url)))
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                file_path, _ = await next_done
+                if not file_path:
+                    print(f"  ✗ 图片下载失败，终止本次下载任务")
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = [task.result() for task in tasks if not task.cancelled()]
+        manifest = self.scraper.image_downloader.image_manifest
+        if manifest:
+            for img_url, task in zip(image_links, tasks):
+                if not task.cancelled() and task.result()[0]:
+                    manifest.record(output_path, img_url, task.result()[0])
+        downloaded_files = [file_path for file_path, _ in results if file_path]
+        latencies = [latency for file_path, latency in results if file_path]
+        print(f"成功下载 {len(downloaded_files)} / {len(image_links)} 张图片")
+        print(f"单张耗时: {format_latencies(latencies)}")
+        return downloaded_files, len(downloaded_files) == len(image_links)
+
+    def _image_semaphore(self) -> asyncio.Semaphore:
+        """获取各产品共用的图片下载并发信号量"""
+        if self._image_slots is None:
+            self._image_slots = asyncio.Semaphore(self.scraper.image_downloader.max_workers)
+        return self._image_slots
+
+    async def _download_single_image_async(self, image_url: str, referer_url: str, output_path: str) -> Optional[str]:
+        """异步下载单个图片，失败时返回None"""
+        return (await self._fetch_image_async(image_url, referer_url, output_path))[0]
+
+    async def _fetch_image_async(self, image_url: str, referer_url: str, output_path: str,
+                                 filename: Optional[str] = None) -> Tuple[Optional[str], float]:
+        """
+        异步获取单个图片并计时（同 ImageDownloader._fetch_image）：已在存储中的直接链接；
+        同一URL正在被其他任务下载时等待其结果
+        """
+        if self.scraper.image_downloader.image_store is None:
+            return await self._download_image_async(image_url, referer_url, output_path, filename)
+
+        start = time.monotonic()
+        try:
+            file_path = self.scraper.image_downloader.link_stored(image_url, output_path, filename)
+            if file_path:
+                return file_path, time.monotonic() - start
+
+            inflight = self._image_inflight.get(image_url)
+            if inflight is not None:
+                print(f"  ⏳ 同一图片正在下载，等待完成: {image_url[:50]}...")
+                await asyncio.shield(inflight)
+                file_path = self.scraper.image_downloader.link_stored(image_url, output_path, filename)
+                if file_path:
+                    return file_path, time.monotonic() - start
+                return await self._download_image_async(image_url, referer_url, output_path, filename)
+
+            inflight = self._image_inflight[image_url] = asyncio.get_running_loop().create_future()
+            try:
+                return await self._download_image_async(image_url, referer_url, output_path, filename)
+            finally:
+                del self._image_inflight[image_url]
+                inflight.set_result(None)
+
+        except Exception as e:
+            print(f"  ✗ 图片下载失败: {str(e)[:100]}...")
+            return None, time.monotonic() - start
+
+    async def _download_image_async(self, image_url: str, referer_url: str, output_path: str,
+                                    filename: Optional[str] = None) -> Tuple[Optional[str], float]:
+        """异步下载单个图片并计时，返回 (文件路径, 耗时秒数)，耗时不含限速等待；失败时文件路径为None"""
+        downloader = self.scraper.image_downloader
+        start = time.monotonic()
+        partial = None
+        range_rejected = False
+        try:
+            os.makedirs(output_path, exist_ok=True)
+            headers = downloader.build_headers(referer_url)
+            cache_entry, existing_path = downloader.cached_image(image_url, output_path, filename)
+            if cache_entry:
+                headers.update(self.scraper.http_cache.conditional_headers(cache_entry))
+            else:
+                partial = downloader.claim_partial(output_path, image_url)
+                if partial:
+                    headers.update(downloader.range_headers(partial))
+
+            controller = downloader.rate_controller
+            await controller.before_request_async()
+            async with self._host_semaphore(image_url):
+                timeout = aiohttp.ClientTimeout(total=controller.timeout(IMAGE_TIMEOUT))
+                start = time.monotonic()
+                try:
+                    async with self.http.get(image_url, headers=headers, timeout=timeout) as response:
+                        controller.record(time.monotonic() - start, response.status, response.headers.get('Retry-After'))
+                        if response.status == 416 and partial:
+                            # 部分内容已不对应服务器上的文件，丢弃后完整下载（释放连接与并发名额后再重试）
+                            downloader.discard_partial(partial)
+                            partial = None
+                            range_rejected = True
+                        else:
+                            if response.status == 304 and cache_entry:
+                                self.scraper.http_cache.record_hit()
+                                print(f"  ✓ 图片未修改，沿用本地文件: {existing_path}")
+                                return existing_path, time.monotonic() - start
+                            response.raise_for_status()
+                            content_type = response.headers.get('content-type', '')
+                            if not content_type.startswith('image/'):
+                                print(f"  ✗ 响应不是图片格式: {content_type}")
+                                return None, time.monotonic() - start
+                            filename = filename or downloader.resolve_filename(image_url, content_type)
+                            file_path = os.path.join(output_path, filename)
+                            stream_partial, partial = partial, None
+                            await self._save_stream_async(response, file_path, image_url, stream_partial)
+                except asyncio.TimeoutError:
+                    controller.record(time.monotonic() - start, timed_out=True)
+                    raise
+
+            if range_rejected:
+                return await self._download_image_async(image_url, referer_url, output_path, filename)
+
+            self.scraper.http_cache.record_miss()
+            self.scraper.http_cache.store(image_url, response.headers)
+
+            print(f"  ✓ 图片已保存: {file_path}")
+            return file_path, time.monotonic() - start
+
+        except Exception as e:
+            print(f"  ✗ 图片下载失败: {str(e)[:100]}...")
+            return None, time.monotonic() - start
+        finally:
+            if partial:
+                downloader.restore_partial(partial)
+
+    async def _save_stream_async(self, response: aiohttp.ClientResponse, file_path: str, image_url: str,
+                                 partial: Optional[PartialDownload] = None):
+        """将响应分块写入临时文件，校验完整后保存为 file_path；中断时保留为 .part 文件（同 ImageDownloader._save_stream）"""
+        downloader = self.scraper.image_downloader
+        output_path = os.path.dirname(file_path)
+        temp_file, temp_path, digest = downloader.open_stream_file(output_path, response.status, response.headers, partial)
+        try:
+            written = 0
+            with temp_file:
+                async for chunk in response.content.iter_chunked(IMAGE_CHUNK_SIZE):
+                    temp_file.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+            downloader.commit_temp_file(temp_path, file_path, written, response.headers, image_url, digest.hexdigest())
+        except BaseException:
+            downloader.keep_partial(temp_path, downloader.part_path(output_path, image_url), response.headers)
+            raise
@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+产品目录库模块
+以产品URL为键，把列表卡片与详情页提取的全部产品信息保存在一个SQLite库中，
+取代逐个产品读写 product_details.json；JSON 文件改由 export_json() 批量生成。
+产品名称与介绍文字建有 FTS5 全文索引（trigram 分词，可按任意子串检索日文），由触发器随记录写入同步更新；
+brand / series / product_tag 建有分面倒排索引（facet_index.py），在批量提交时增量更新
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import CATALOG_DIR, CATALOG_FLUSH_ITEMS
+from facet_index import IN_CHUNK_SIZE, FacetIndex, bitmap_ids
+from models import ProductLink
+
+# 产品记录中以JSON文本保存的字段
+JSON_FIELDS = ('image_links', 'product_info')
+# 产品记录字段（与 ProductDetails.to_dict() 一致）
+RECORD_FIELDS = ('product_name', 'image_links', 'product_info', 'article_content', 'url',
+                 'product_tag', 'series', 'avatar', 'brand')
+COLUMNS = ('url', 'product_dir', 'brand', 'product_name', 'image_links', 'image_count', 'product_info',
+           'article_content', 'product_tag', 'series', 'avatar', 'updated_at')
+
+# 全文索引：以 products 为外部内容表（按产品ID关联），只索引名称与介绍文字；
+# 写入在 flush() 的批量事务中由触发器完成，列表卡片重复写入（名称与介绍未变）时不更新索引
+SEARCH_INDEX_TRIGGERS = ('products_fts_insert', 'products_fts_delete', 'products_fts_update')
+SEARCH_INDEX_SQL = (
+    '''
+    CREATE VIRTUAL TABLE products_fts USING fts5(
+        product_name, article_content, content='products', content_rowid='id', tokenize='trigram'
+    )
+    ''',
+    '''
+    CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts (rowid, product_name, article_content)
+        VALUES (new.id, new.product_name, new.article_content);
+    END
+    ''',
+    '''
+    CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts (products_fts, rowid, product_name, article_content)
+        VALUES ('delete', old.id, old.product_name, old.article_content);
+    END
+    ''',
+    '''
+    CREATE TRIGGER products_fts_update AFTER UPDATE OF product_name, article_content ON products
+    WHEN old.product_name IS NOT new.product_name OR old.article_content IS NOT new.article_content BEGIN
+        INSERT INTO products_fts (products_fts, rowid, product_name, article_content)
+        VALUES ('delete', old.id, old.product_name, old.article_content);
+        INSERT INTO products_fts (rowid, product_name, article_content)
+        VALUES (new.id, new.product_name, new.article_content);
+    END
+    ''',
+)
+# trigram 分词只能用长度不少于3个字符的词检索，更短的词改为逐行匹配
+SEARCH_MIN_TERM_LENGTH = 3
+
+UPSERT_SQL = f'''
+    INSERT INTO products ({', '.join(COLUMNS)})
+    VALUES ({', '.join('?' for _ in COLUMNS)})
+    ON CONFLICT(url) DO UPDATE SET
+        {', '.join(f'{column} = excluded.{column}' for column in COLUMNS[1:])}
+'''
+
+
+class CatalogStore:
+    """
+    基于SQLite的产品目录库
+
+    put() 先把记录放入内存缓冲（同一URL合并为最新一条），攒够 flush_items 条时在一个事务中提交；
+    读取时优先返回缓冲中的记录，写入后立即可读。各线程共用一个连接，通过锁串行使用。
+    """
+
+    def __init__(self, catalog_dir: str = CATALOG_DIR, flush_items: int = CATALOG_FLUSH_ITEMS):
+        """
+        初始化产品目录库
+
+        Args:
+            catalog_dir: 目录库数据库所在目录
+            flush_items: 缓冲中攒够多少条记录后提交
+        """
+        self.catalog_dir = catalog_dir
+        self.db_path = os.path.join(catalog_dir, 'catalog.db')
+        self.flush_items = max(1, flush_items)
+        self.flushes = 0
+        self._pending: Dict[str, Dict] = {}
+        self._lock = threading.RLock()
+        os.makedirs(catalog_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self.facets = FacetIndex(self._conn)
+        self._init_db()
+
+    def _init_db(self):
+        """初始化产品表，并按顺序执行尚未执行的结构迁移（已执行到的版本记录在 PRAGMA user_version）"""
+        migrations = [self._add_product_ids, self._add_search_index, self._add_facet_index]
+        with self._lock, self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            self._create_tables()
+            version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+            for target, migrate in enumerate(migrations, 1):
+                if version < target:
+                    print(f"产品目录库结构迁移 v{target}: {migrate.__doc__}")
+                    migrate()
+            if version < len(migrations):
+                self._conn.execute(f'PRAGMA user_version = {len(migrations)}')
+
+    def _create_tables(self):
+        """
+        创建产品表：每个产品一行，exported_at 早于 updated_at 的记录需要重新导出JSON；
+        全文索引与分面索引按产品ID关联（显式的 INTEGER PRIMARY KEY，VACUUM 不会改变）
+        """
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS products (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                product_dir TEXT NOT NULL,
+                brand TEXT,
+                product_name TEXT,
+                image_links TEXT,
+                image_count INTEGER NOT NULL DEFAULT 0,
+                product_info TEXT,
+                article_content TEXT,
+                product_tag TEXT,
+                series TEXT,
+                avatar TEXT,
+                updated_at REAL NOT NULL,
+                exported_at REAL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_products_dir ON products (product_dir)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_products_brand ON products (brand)')
+        self._conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_products_unexported ON products (url)
+            WHERE exported_at IS NULL OR exported_at < updated_at
+        ''')
+
+    def _add_product_ids(self):
+        """为产品表补充显式的产品ID列"""
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(products)')}
+        if 'id' in columns:
+            return
+        # 旧表以隐式 rowid 关联的全文索引与分面索引作废，由后续迁移按产品ID重建
+        for trigger in SEARCH_INDEX_TRIGGERS:
+            self._conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        self._conn.execute('DROP TABLE IF EXISTS products_fts')
+        self._conn.execute('DROP TABLE IF EXISTS facet_postings')
+        for index in ('idx_products_dir', 'idx_products_brand', 'idx_products_unexported'):
+            self._conn.execute(f'DROP INDEX IF EXISTS {index}')
+        self._conn.execute('ALTER TABLE products RENAME TO products_old')
+        self._create_tables()
+        self._conn.execute(f'''
+            INSERT INTO products ({', '.join(COLUMNS)}, exported_at)
+            SELECT {', '.join(COLUMNS)}, exported_at FROM products_old ORDER BY rowid
+        ''')
+        self._conn.execute('DROP TABLE products_old')
+
+    def _add_search_index(self):
+        """为产品名称与介绍文字建立全文索引"""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'").fetchone()
+        if exists:
+            return
+        for sql in SEARCH_INDEX_SQL:
+            self._conn.execute(sql)
+        self._conn.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+    def _add_facet_index(self):
+        """为 brand / series / product_tag 建立分面倒排索引"""
+        if self.facets.init_table():
+            self.facets.rebuild()
+
+    def close(self):
+        """提交缓冲中的记录并关闭连接"""
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        按产品URL读取记录
+
+        Returns:
+            Optional[Dict]: ProductDetails.to_dict() 格式的字典并附带 product_dir，不存在时返回None
+        """
+        with self._lock:
+            record = self._pending.get(url)
+            if record is not None:
+                return dict(record)
+            row = self._conn.execute(
+                f'SELECT {", ".join(COLUMNS)} FROM products WHERE url = ?', (url,)).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def get_by_dir(self, product_dir: str) -> Optional[Dict]:
+        """按产品文件夹读取记录（同一文件夹有多条时取最近更新的）"""
+        product_dir = os.path.normpath(product_dir)
+        with self._lock:
+            for record in reversed(list(self._pending.values())):
+                if record['product_dir'] == product_dir:
+                    return dict(record)
+            row = self._conn.execute(f'''
+                SELECT {", ".join(COLUMNS)} FROM products WHERE product_dir = ?
+                ORDER BY updated_at DESC LIMIT 1
+            ''', (product_dir,)).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def put(self, record: Dict, product_dir: str):
+        """
+        写入（覆盖）一个产品的记录
+
+        Args:
+            record: ProductDetails.to_dict() 格式的字典，需包含 url
+            product_dir: 产品文件夹
+        """
+        record = {field: record.get(field) for field in RECORD_FIELDS}
+        record['product_dir'] = os.path.normpath(product_dir)
+        with self._lock:
+            self._pending.pop(record['url'], None)
+            self._pending[record['url']] = record
+            if len(self._pending) >= self.flush_items:
+                self.flush()
+
+    def merge_list_card(self, product_dir: str, product_link: ProductLink, product_price: str,
+                        product_release_date: str, brand: Optional[str] = None):
+        """
+        记录列表卡片信息：只补充尚无的字段（详情阶段会覆盖/补全），头像链接总是更新
+
+        Args:
+            product_dir: 列表卡片对应的产品文件夹（已有记录时保留原文件夹）
+            product_link: 产品链接（含名称与头像）
+            product_price: 卡片上的价格
+            product_release_date: 卡片上的发售日
+            brand: 品牌代码
+        """
+        with self._lock:
+            existing = self.get(product_link.href) or {}
+            record = dict(existing)
+            record.setdefault('product_name', product_link.text)
+            if not record.get('product_info'):
+                record['product_info'] = {
+                    '価格': product_price,
+                    '発売日': product_release_date,
+                    '対象年齢': '8歳以上'
+                }
+            record['article_content'] = record.get('article_content') or ''
+            record['image_links'] = record.get('image_links') or []
+            record['product_tag'] = record.get('product_tag') or ''
+            record['series'] = record.get('series') or ''
+            record['brand'] = record.get('brand') or brand or ''
+            record['url'] = product_link.href
+            record['avatar'] = product_link.avatar
+            self.put(record, existing.get('product_dir') or product_dir)
+
+    def flush(self):
+        """在一个事务中提交缓冲中的全部记录（同时增量更新分面索引）"""
+        with self._lock:
+            if not self._pending:
+                return
+            now = time.time()
+            with self._conn:
+                # 先取得写锁再读写入前的分面值，避免与其他进程的写入交错
+                self._conn.execute('BEGIN IMMEDIATE')
+                before = self.facets.snapshot(self._pending)
+                self._conn.executemany(UPSERT_SQL, [self._record_to_row(r, now) for r in self._pending.values()])
+                self.facets.apply(before, self.facets.snapshot(self._pending))
+            self._pending.clear()
+            self.flushes += 1
+
+    def _record_to_row(self, record: Dict, updated_at: float) -> tuple:
+        image_links = record.get('image_links') or []
+        return (
+            record['url'], record['product_dir'], record.get('brand') or '', record.get('product_name'),
+            json.dumps(image_links, ensure_ascii=False), len(image_links),
+            json.dumps(record.get('product_info'), ensure_ascii=False), record.get('article_content'),
+            record.get('product_tag'), record.get('series'), record.get('avatar'), updated_at,
+        )
+
+    def _row_to_record(self, row: tuple) -> Dict:
+        data = dict(zip(COLUMNS, row))
+        record = {field: data.get(field) for field in RECORD_FIELDS}
+        for field in JSON_FIELDS:
+            record[field] = json.loads(data[field]) if data[field] else None
+        record['image_links'] = record['image_links'] or []
+        record['product_dir'] = data['product_dir']
+        return record
+
+    def iter_records(self, brand: Optional[str] = None, batch_size: int = 500) -> Iterator[Dict]:
+        """
+        按写入顺序逐批读取全部记录（每批一次查询，内存占用与总数无关）
+
+        Args:
+            brand: 只读取该品牌的产品
+            batch_size: 每批读取的数量
+        """
+        self.flush()
+        condition = 'AND brand = ?' if brand else ''
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(f'''
+                    SELECT id, {", ".join(COLUMNS)} FROM products
+                    WHERE id > ? {condition}
+                    ORDER BY id LIMIT ?
+                ''', (last_id, brand, batch_size) if brand else (last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            for row in rows:
+                yield self._row_to_record(row[1:])
+
+    def export_json(self, only_changed: bool = True, batch_size: int = 500) -> int:
+        """
+        把记录导出为各产品文件夹中的 product_details.json
+
+        Args:
+            only_changed: 为True时只导出上次导出后有变化的产品
+            batch_size: 每批导出的数量
+
+        Returns:
+            int: 导出的文件数
+        """
+        self.flush()
+        condition = '(exported_at IS NULL OR exported_at < updated_at) AND' if only_changed else ''
+        exported = 0
+        last_url = ''
+        while True:
+            with self._lock:
+                rows = self._conn.execute(f'''
+                    SELECT {", ".join(COLUMNS)} FROM products
+                    WHERE {condition} url > ?
+                    ORDER BY url LIMIT ?
+                ''', (last_url, batch_size)).fetchall()
+            if not rows:
+                break
+            last_url = rows[-1][0]
+            done = []
+            for row in rows:
+                record = self._row_to_record(row)
+                product_dir = record.pop('product_dir')
+                os.makedirs(product_dir, exist_ok=True)
+                with open(os.path.join(product_dir, 'product_details.json'), 'w', encoding='utf-8') as f:
+                    json.dump(record, f, ensure_ascii=False, indent=2)
+                done.append((row[COLUMNS.index('updated_at')], row[0]))
+            with self._lock, self._conn:
+                self._conn.executemany('UPDATE products SET exported_at = ? WHERE url = ?', done)
+            exported += len(done)
+
+        print(f"✅ 已导出 {exported} 个产品的 product_details.json")
+        return exported
+
+    def import_json(self, data_dir: str) -> int:
+        """
+        导入已有的 product_details.json（目录库中已有的URL保持不变），用于从逐文件保存迁移
+
+        Args:
+            data_dir: 数据目录（如 'data'），递归查找其中的 product_details.json
+
+        Returns:
+            int: 新导入的产品数
+        """
+        self.flush()
+        now = time.time()
+        rows = []
+        for dirpath, _, filenames in os.walk(data_dir):
+            if 'product_details.json' not in filenames:
+                continue
+            try:
+                with open(os.path.join(dirpath, 'product_details.json'), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not isinstance(data, dict) or not data.get('url'):
+                continue
+            record = {field: data.get(field) for field in RECORD_FIELDS}
+            record['product_dir'] = os.path.normpath(dirpath)
+            rows.append(self._record_to_row(record, now) + (now,))
+
+        urls = [row[0] for row in rows]
+        with self._lock, self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            before = self.facets.snapshot(urls)
+            cursor = self._conn.executemany(f'''
+                INSERT OR IGNORE INTO products ({', '.join(COLUMNS)}, exported_at)
+                VALUES ({', '.join('?' for _ in COLUMNS)}, ?)
+            ''', rows)
+            imported = max(cursor.rowcount, 0)
+            self.facets.apply(before, self.facets.snapshot(urls))
+        print(f"✅ 已导入 {imported} 个产品（共找到 {len(rows)} 个 product_details.json）")
+        return imported
+
+    def search(self, query: str, limit: int = 50, brand: Optional[str] = None) -> List[Dict]:
+        """
+        在产品名称与介绍文字中检索（不区分大小写的子串匹配）
+
+        Args:
+            query: 检索词，多个词以空格分隔时须全部出现；不少于3个字符的词走全文索引，
+                   全部是更短的词时逐行匹配
+            limit: 最多返回的数量
+            brand: 只在该品牌中检索
+
+        Returns:
+            List[Dict]: 匹配的产品（url、brand、product_dir、product_name），使用全文索引时按相关度排序
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        indexed = [term for term in terms if len(term) >= SEARCH_MIN_TERM_LENGTH]
+        conditions, params = [], []
+        for term in terms:
+            if term in indexed:
+                continue
+            pattern = '%' + re.sub(r'([\\%_])', r'\\\1', term) + '%'
+            conditions.append("(p.product_name LIKE ? ESCAPE '\\' OR p.article_content LIKE ? ESCAPE '\\')")
+            params += [pattern, pattern]
+        if brand:
+            conditions.append('p.brand = ?')
+            params.append(brand)
+
+        if indexed:
+            match = ' AND '.join('"' + term.replace('"', '""') + '"' for term in indexed)
+            sql = f'''
+                SELECT p.url, p.brand, p.product_dir, p.product_name
+                FROM products_fts JOIN products p ON p.id = products_fts.rowid
+                WHERE products_fts MATCH ? {''.join(' AND ' + c for c in conditions)}
+                ORDER BY bm25(products_fts) LIMIT ?
+            '''
+            params = [match] + params
+        else:
+            sql = f'''
+                SELECT p.url, p.brand, p.product_dir, p.product_name FROM products p
+                WHERE {' AND '.join(conditions)}
+                ORDER BY p.id LIMIT ?
+            '''
+
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit]).fetchall()
+        return [dict(zip(('url', 'brand', 'product_dir', 'product_name'), row)) for row in rows]
+
+    def facet_query(self, brand: Optional[str] = None, series: Iterable[str] = (), tags: Iterable[str] = (),
+                    limit: Optional[int] = None) -> List[Dict]:
+        """
+        按品牌 / 系列 / 标签筛选产品（条件全部满足），只读取相关的倒排位图和命中的产品行
+
+        Args:
+            brand: 品牌代码
+            series: 须全部属于的系列（extract_series_links 的各项，如 'seed'）
+            tags: 须全部具有的标签（extract_product_tag 的各项，如 'gbase'）
+            limit: 最多返回的数量
+
+        Returns:
+            List[Dict]: 命中的产品（url、brand、product_dir、product_name），按加入目录库的顺序
+        """
+        conditions = {'brand': [brand] if brand else [], 'series': list(series), 'product_tag': list(tags)}
+        conditions = {field: values for field, values in conditions.items() if values}
+        if not conditions:
+            return []
+
+        self.flush()
+        results = []
+        with self._lock:
+            product_ids = bitmap_ids(self.facets.match(conditions), limit)
+            for start in range(0, len(product_ids), IN_CHUNK_SIZE):
+                chunk = product_ids[start:start + IN_CHUNK_SIZE]
+                results += self._conn.execute(f'''
+                    SELECT url, brand, product_dir, product_name FROM products
+                    WHERE id IN ({', '.join('?' for _ in chunk)}) ORDER BY id
+                ''', chunk).fetchall()
+        return [dict(zip(('url', 'brand', 'product_dir', 'product_name'), row)) for row in results]
+
+    def facet_values(self, field: str) -> List[Tuple[str, int]]:
+        """分面字段（brand / series / product_tag）的全部取值及产品数"""
+        self.flush()
+        with self._lock:
+            return self.facets.values(field)
+
+    def get_stats(self) -> Dict:
+        """获取目录库统计信息"""
+        self.flush()
+        with self._lock:
+            products, brands, with_images = self._conn.execute('''
+                SELECT COUNT(*), COUNT(DISTINCT brand), COUNT(*) FILTER (WHERE image_count > 0) FROM products
+            ''').fetchone()
+            unexported = self._conn.execute(
+                'SELECT COUNT(*) FROM products WHERE exported_at IS NULL OR exported_at < updated_at').fetchone()[0]
+        return {
+            'products': products,
+            'brands': brands,
+            'with_images': with_images,
+            'unexported': unexported,
+            'flushes': self.flushes,
+        }
+
+    def report(self):
+        """打印目录库统计信息"""
+        stats = self.get_stats()
+        print(f"产品目录库: {stats['products']} 个产品（{stats['brands']} 个品牌，"
+              f"{stats['with_images']} 个有图片链接），待导出JSON {stats['unexported']} 个，"
+              f"本次批量提交 {stats['flushes']} 次")
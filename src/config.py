@@ -37,7 +37,7 @@ BRAND_CODE_TO_SLUG = {
     "ABASE": "actionbase",
     "TOOL": "tool",
 }
-BASE_URL = "https://bandai-hobby.net"
+BASE_URL = os.getenv("BANDAI_BASE_URL", "https://bandai-hobby.net")  # 可指向本地替身服务器做基准测试
 PRODUCT_LIST_URL = f"{BASE_URL}/brand/" # 分页总目录，根据这个修改爬取大类
 # PRODUCT_LIST_URL = f"https://bandai-hobby.net/brand/hg/"
 
@@ -59,6 +59,56 @@ SCRAPED_DATA_FILE = f"{OUTPUT_DIR}/scraped_data.json"
 REQUEST_TIMEOUT = 10
 IMAGE_TIMEOUT = 30  # 增加图像下载超时时间到30秒
 
+# HTTP缓存配置（ETag/Last-Modified 条件请求）
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "cache/http")
+HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 缓存内容上限，超出后按LRU淘汰
+HTTP_CACHE_ACCESS_FLUSH_ITEMS = 200  # 读取缓存时记录的LRU访问时间攒够多少条后一次写入
+
+# 原始HTML归档配置（内容寻址压缩存储，支持离线重放提取）
+HTML_ARCHIVE_ENABLED = True
+HTML_ARCHIVE_DIR = os.getenv("HTML_ARCHIVE_DIR", "archive/html")
+
+# 图片内容寻址存储：同一内容只保存一份，各产品目录中的图片为指向它的硬链接
+# （需与 data 目录位于同一文件系统，否则退化为复制）
+IMAGE_STORE_ENABLED = True
+IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "store/images")
+
+# 图片清单：记录各产品图片目录中每个URL对应的文件名/大小/哈希，据此只下载缺少的图片
+IMAGE_MANIFEST_DIR = os.getenv("IMAGE_MANIFEST_DIR", "store/manifest")
+
+# 产品目录库：全部产品详情保存在一个SQLite库中（以产品URL为键），写入攒够 CATALOG_FLUSH_ITEMS 条后批量提交；
+# 各产品文件夹中的 product_details.json 由导出步骤生成（CATALOG_EXPORT_JSON 为True时每次运行结束导出有变化的产品）
+CATALOG_DIR = os.getenv("CATALOG_DIR", "store/catalog")
+CATALOG_FLUSH_ITEMS = 200
+CATALOG_EXPORT_JSON = True
+# 目录库的 Parquet 导出（需安装 pyarrow）：按品牌分区，每批读取/写入 PARQUET_BATCH_ROWS 行
+CATALOG_PARQUET_DIR = os.getenv("CATALOG_PARQUET_DIR", "export/parquet")
+PARQUET_BATCH_ROWS = 5000
+
+# 异步爬取配置
+MAX_CONCURRENCY_PER_HOST = 8  # 每个主机同时进行中的最大请求数
+
+# 列表页限速配置（令牌桶）
+LIST_RATE_PER_SEC = 1.0  # 列表页长期平均请求速率（次/秒）
+LIST_RATE_BURST = 3  # 允许的瞬时突发请求数
+LIST_CRAWL_WORKERS = 4  # 并发抓取列表页的线程数
+
+# 自适应速率控制配置（AIMD：健康时加性增速，遇到 429/503/超时/p95上升时乘性降速）
+ADAPTIVE_INITIAL_RATE = 2.0  # 页面请求初始速率（次/秒）
+ADAPTIVE_MIN_RATE = 0.2
+ADAPTIVE_MAX_RATE = 10.0
+IMAGE_ADAPTIVE_INITIAL_RATE = 5.0  # 图片CDN请求初始速率（次/秒）
+IMAGE_ADAPTIVE_MAX_RATE = 30.0
+ADAPTIVE_INCREASE_STEP = 0.1  # 每个健康响应增加的速率
+ADAPTIVE_DECREASE_FACTOR = 0.5  # 降速系数
+ADAPTIVE_LATENCY_WINDOW = 50  # 计算p95延迟的样本窗口
+ADAPTIVE_P95_RISE_FACTOR = 2.0  # p95超过基线的倍数时降速
+ADAPTIVE_MAX_TIMEOUT = 60  # 自适应超时的上限（秒）
+
+# 图片下载配置
+IMAGE_DOWNLOAD_WORKERS = 8  # 图片并发下载线程数（同一下载器内各产品共用），为1时逐张下载
+IMAGE_CHUNK_SIZE = 64 * 1024  # 分块写盘的块大小（字节），单个下载占用的内存不超过约一个块
+
 # CSS选择器配置
 CSS_SELECTORS = {
     'product_cards': 'p-card__wrap c-grid -cols2-1',
@@ -69,9 +119,38 @@ CSS_SELECTORS = {
     'detail_label_inner': 'pg-products__labelInner',
     'detail_label_text': 'pg-products__labelTxt',
     'product_article': 'pg-products__article',
+    'instruction_text': 'pg-products__instructionTxt',
+    'product_tag': 'pg-products__tag',  # class包含该片段的元素，以-开头的class为标签
+    'series_links': 'c-card__flat p-card__flat',
     'pagination_links': 'c-archives__pagination-list-item-link',  # 分页链接选择器
 }
 
+# 解析后端：'html.parser'（默认）、'lxml' 或 'selectolax'，各后端提取结果一致
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "html.parser")
+
+# 解析进程池的进程数，默认等于CPU核数
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0")) or os.cpu_count() or 1
+
+# 队列数据库（SQLite，WAL 日志模式）：synchronous=NORMAL 时提交不等待 fsync，
+# 只在检查点同步磁盘；断电时可能丢失最近的提交，但不会损坏数据库
+QUEUE_DB_SYNCHRONOUS = os.getenv("QUEUE_DB_SYNCHRONOUS", "NORMAL")
+QUEUE_DB_BUSY_TIMEOUT = 30  # 数据库被其他连接锁定时的最长等待（秒）
+QUEUE_FLUSH_ITEMS = 50  # 写缓冲攒够多少条状态变更后提交
+QUEUE_FLUSH_INTERVAL_MS = 500  # 写缓冲中最早的变更最多等待多久提交（毫秒）
+QUEUE_LEASE_SECONDS = 30 * 60  # 领取产品的租约时长（秒），到期未完成的产品可被其他进程重新领取
+
+# 队列后端：'sqlite'（默认，本地数据库文件）或 'redis'（多台机器共用一个队列，需安装 redis）
+QUEUE_BACKENDS = ('sqlite', 'redis')
+QUEUE_BACKEND = os.getenv("QUEUE_BACKEND", "sqlite")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_QUEUE_PREFIX = os.getenv("REDIS_QUEUE_PREFIX", "bandai:queue")  # 队列各键名的前缀
+
+# 失败队列重试：第 n 次失败后等待 FAILED_RETRY_BASE_SECONDS * 2^(n-1) 秒再重试，最长 FAILED_RETRY_MAX_SECONDS
+FAILED_RETRY_BASE_SECONDS = 10 * 60
+FAILED_RETRY_MAX_SECONDS = 24 * 60 * 60
+# 这些状态码的失败视为永久失败（页面不存在），不再自动重试
+PERMANENT_ERROR_STATUS_CODES = (400, 404, 410)
+
 class Config:
     # 数据库配置
     DATABASE_PATH = os.getenv("DATABASE_PATH", "database/bandai_hobby.db")
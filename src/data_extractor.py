@@ -3,53 +3,313 @@
 """
 数据提取模块
 负责从HTML页面中提取各种产品信息
+
+提取逻辑只依赖少量节点操作原语（_find_by_class、_text 等），默认由
+BeautifulSoup('html.parser') 实现；lxml / selectolax 后端覆盖这些原语，
+产出与默认后端逐字节一致的结果。
 """
 
 import re
-from bs4 import BeautifulSoup
-from typing import Dict, List, Tuple
+from bs4 import BeautifulSoup, CData, NavigableString, SoupStrainer, Tag
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from config import CSS_SELECTORS
+from config import CSS_SELECTORS, PARSER_BACKEND
+from models import ProductLink
 from utils import clean_text, normalize_url
 
+# 可选的解析后端
+PARSER_BACKENDS = ('html.parser', 'lxml', 'selectolax')
+
+# BeautifulSoup 视为空白的字符，以及保留空白的标签
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+PRESERVE_WHITESPACE_TAGS = ('pre', 'textarea')
+
+# BeautifulSoup 的 get_text 不包含这些标签内的文本（脚本、样式、模板与注音）
+SKIPPED_TEXT_TAGS = ('script', 'style', 'template', 'rt', 'rp')
+
+
+def collapse_whitespace(text: str) -> str:
+    """
+    按 BeautifulSoup 的规则折叠纯空白文本：含换行时折叠为一个换行，否则为一个空格
+    
+    Args:
+        text: 文本节点内容
+        
+    Returns:
+        str: 非纯空白文本原样返回
+    """
+    if text.strip(ASCII_SPACES):
+        return text
+    return '\n' if '\n' in text else ' '
+
+
+class DetailExtractionPlan:
+    """
+    详情页提取计划
+    
+    由 CSS_SELECTORS 编译为按class索引的匹配规则，遍历一次文档即可收集所有字段所需的节点，
+    代替每个字段各自对整棵树做 find / find_all。匹配规则同 BeautifulSoup 的 class_ 参数：
+    单个class按token匹配，含空格的class按整串匹配。
+    """
+    
+    # (字段名, 标签名, 是否收集全部匹配)
+    FIELDS = (
+        ('product_name', None, False),
+        ('thumbnail_wrapper', None, False),
+        ('product_details', None, False),
+        ('product_article', None, False),
+        ('instruction_text', None, False),
+        ('series_links', 'a', True),
+    )
+    # class包含该片段即匹配的字段
+    CONTAINS_FIELD = 'product_tag'
+    
+    def __init__(self, selectors: Dict[str, str] = CSS_SELECTORS):
+        self.token_rules: Dict[str, List[Tuple[str, Optional[str], bool]]] = {}
+        self.phrase_rules: Dict[str, List[Tuple[str, str, Optional[str], bool]]] = {}
+        for field, tag, collect_all in self.FIELDS:
+            tokens = selectors[field].split()
+            if len(tokens) == 1:
+                self.token_rules.setdefault(tokens[0], []).append((field, tag, collect_all))
+            else:
+                # 整串匹配时首个class必然相同，以首个class为索引
+                self.phrase_rules.setdefault(tokens[0], []).append((field, ' '.join(tokens), tag, collect_all))
+        self.contains_fragment = selectors[self.CONTAINS_FIELD]
+        
+        # 覆盖所有规则的CSS选择器组，供有原生选择器引擎的后端预筛选候选元素（结果仍按上述规则精确匹配）
+        self.css_prefilter = ', '.join(
+            [''.join(f'.{token}' for token in selectors[field].split()) for field, _, _ in self.FIELDS]
+            + [f'[class*="{self.contains_fragment}"]']
+        )
+    
+    def collect(self, extractor: 'DataExtractor', doc: Any) -> Dict[str, Any]:
+        """
+        遍历文档收集节点
+        
+        Args:
+            extractor: 提供节点操作原语的数据提取器
+            doc: 解析后的文档对象
+        
+        Returns:
+            Dict[str, Any]: 字段名 -> 首个匹配节点（无匹配时为None）或全部匹配节点列表
+        """
+        nodes: Dict[str, Any] = {field: [] if collect_all else None for field, _, collect_all in self.FIELDS}
+        nodes[self.CONTAINS_FIELD] = []
+        token_rules = self.token_rules
+        phrase_rules = self.phrase_rules
+        fragment = self.contains_fragment
+        class_list = extractor._class_list
+        tag_name = extractor._tag_name
+        
+        for element in extractor._iter_plan_candidates(doc, self):
+            classes = class_list(element)
+            if not classes:
+                continue
+            
+            matched = []
+            for class_name in classes:
+                rules = token_rules.get(class_name)
+                if rules:
+                    matched.extend(rules)
+            rules = phrase_rules.get(classes[0])
+            if rules:
+                joined = ' '.join(classes)
+                matched.extend((field, tag, collect_all) for field, phrase, tag, collect_all in rules if phrase == joined)
+            
+            for field, tag, collect_all in matched:
+                if tag is not None and tag_name(element) != tag:
+                    continue
+                if collect_all:
+                    found = nodes[field]
+                    if not found or found[-1] is not element:  # 同一class重复出现时只收集一次
+                        found.append(element)
+                elif nodes[field] is None:
+                    nodes[field] = element
+            
+            if any(fragment in class_name for class_name in classes):
+                nodes[self.CONTAINS_FIELD].append(element)
+        
+        return nodes
+
 
 class DataExtractor:
     """数据提取器类"""
     
+    backend = 'html.parser'
+    
     def __init__(self):
         """初始化数据提取器"""
-        pass
+        self.detail_plan = DetailExtractionPlan(CSS_SELECTORS)
+        
+        # 列表页只需产品卡片区域与分页链接；解析过程中 class 可能是原始字符串（bs4 4.13+）
+        # 或单个class，统一按空白拆分后匹配（规则同 class_ 参数）
+        card_classes = CSS_SELECTORS['product_cards'].split()
+        pagination_class = CSS_SELECTORS['pagination_links']
+        self.list_strainer = SoupStrainer(
+            class_=lambda value: bool(value) and (value.split() == card_classes or pagination_class in value.split())
+        )
     
-    def extract_product_name(self, soup: BeautifulSoup) -> str:
+    def parse(self, html: str) -> Any:
+        """
+        解析HTML文本
+        
+        Args:
+            html: HTML文本
+        
+        Returns:
+            解析后的文档对象，供各 extract_* 方法使用
+        """
+        return BeautifulSoup(html, 'html.parser')
+    
+    def parse_list_page(self, html: str) -> Any:
+        """
+        部分解析列表页：只为产品卡片区域与分页链接建树，其余节点在解析时丢弃
+        
+        Args:
+            html: 列表页HTML文本
+        
+        Returns:
+            精简后的文档对象，供 extract_product_cards 与 extract_total_pages 共用
+        """
+        return BeautifulSoup(html, 'html.parser', parse_only=self.list_strainer)
+    
+    # ---- 节点操作原语（其他解析后端覆盖以下方法）----
+    
+    def _iter_elements(self, doc: Any) -> Iterator[Any]:
+        """按文档顺序遍历所有元素"""
+        return (element for element in doc.descendants if isinstance(element, Tag))
+    
+    def _tag_name(self, node: Any) -> str:
+        """获取元素标签名"""
+        return node.name
+    
+    def _iter_plan_candidates(self, doc: Any, plan: 'DetailExtractionPlan') -> Iterator[Any]:
+        """按文档顺序产出提取计划需要检查的元素，默认为全部元素"""
+        return self._iter_elements(doc)
+    
+    def _find_by_class(self, node: Any, class_name: str, tag: Optional[str] = None) -> Any:
+        """查找第一个class匹配的后代元素（匹配规则同 BeautifulSoup 的 class_ 参数）"""
+        return node.find(tag, class_=class_name)
+    
+    def _find_all_by_class(self, node: Any, class_name: str, tag: Optional[str] = None) -> List[Any]:
+        """查找所有class匹配的后代元素"""
+        return node.find_all(tag, class_=class_name)
+    
+    def _find_all_class_contains(self, node: Any, fragment: str) -> List[Any]:
+        """查找任一class包含指定片段的后代元素"""
+        return node.find_all(class_=lambda x: x and fragment in x)
+    
+    def _find_all_tag(self, node: Any, tag: str) -> List[Any]:
+        """查找指定标签的所有后代元素"""
+        return node.find_all(tag)
+    
+    def _next_sibling_by_class(self, node: Any, tag: str, class_name: str) -> Any:
+        """查找之后第一个标签与class均匹配的兄弟元素"""
+        return node.find_next_sibling(tag, class_=class_name)
+    
+    def _attr(self, node: Any, name: str) -> Optional[str]:
+        """获取元素属性值，不存在时返回None"""
+        return node.get(name)
+    
+    def _class_list(self, node: Any) -> List[str]:
+        """获取元素的class列表"""
+        return node.get('class', [])
+    
+    def _text(self, node: Any, separator: str = '', strip: bool = False) -> str:
+        """获取元素文本（同 BeautifulSoup 的 get_text）"""
+        return node.get_text(separator=separator, strip=strip)
+    
+    def _article_strings(self, node: Any, preserve: bool = False) -> Iterator[str]:
+        """
+        产出文章区域的文本片段：同一父元素下相邻的文本与无属性的 <br> 合并为一段，<br> 计为一个空格，
+        注释等其他节点会打断合并（等价于将 '<br/>' 替换为空格后重新解析，但无需序列化与二次解析）
+        """
+        if node.name in SKIPPED_TEXT_TAGS:
+            return
+        preserve = preserve or node.name in PRESERVE_WHITESPACE_TAGS
+        fold = (lambda text: text) if preserve else collapse_whitespace
+        run = ''
+        for child in node.children:
+            if type(child) is NavigableString:
+                run += child
+                continue
+            if isinstance(child, Tag) and child.name == 'br' and not child.attrs:
+                run += ' '
+                continue
+            if run:
+                yield fold(run)
+                run = ''
+            if isinstance(child, Tag):
+                yield from self._article_strings(child, preserve)
+            elif type(child) is CData:
+                yield fold(str(child))
+        if run:
+            yield fold(run)
+    
+    def _article_text(self, node: Any) -> str:
+        """获取文章区域文本，<br> 视为空格"""
+        return '\n'.join(self._article_strings(node))
+    
+    # ---- 提取方法 ----
+    
+    def extract_product_details(self, doc: Any) -> Dict[str, Any]:
+        """
+        单次遍历提取详情页的全部字段
+        
+        按 detail_plan 遍历一次文档收集各字段所在的节点，再从这些节点提取，
+        结果与逐个调用 extract_product_name / extract_product_info / extract_article_content /
+        extract_product_tag / extract_series_links / extract_image_links 相同
+        
+        Args:
+            doc: 解析后的文档对象（由 parse() 返回）
+        
+        Returns:
+            Dict[str, Any]: 包含 name、product_info、article_content、product_tag、series、image_links
+        """
+        nodes = self.detail_plan.collect(self, doc)
+        return {
+            'name': self._product_name_from(nodes['product_name']),
+            'product_info': self._product_info_from(nodes['product_details']),
+            'article_content': self._article_content_from(nodes['product_article'], nodes['instruction_text']),
+            'product_tag': self._product_tag_from(nodes['product_tag']),
+            'series': self._series_links_from(nodes['series_links']),
+            'image_links': self._image_links_from(nodes['thumbnail_wrapper']),
+        }
+    
+    def extract_product_name(self, doc: Any) -> str:
         """
         提取产品名称
         
         Args:
-            soup: BeautifulSoup解析对象
-            
+            doc: 解析后的文档对象（由 parse() 返回）
+        
         Returns:
             str: 产品名称
         """
-        product_name_element = soup.find(class_=CSS_SELECTORS['product_name'])
-        return product_name_element.get_text(strip=True) if product_name_element else ""
+        return self._product_name_from(self._find_by_class(doc, CSS_SELECTORS['product_name']))
     
-    def extract_image_links(self, soup: BeautifulSoup) -> List[str]:
+    def _product_name_from(self, product_name_element: Any) -> str:
+        return self._text(product_name_element, strip=True) if product_name_element is not None else ""
+    
+    def extract_image_links(self, doc: Any) -> List[str]:
         """
         提取图片链接列表
         
         Args:
-            soup: BeautifulSoup解析对象
-            
+            doc: 解析后的文档对象（由 parse() 返回）
+        
         Returns:
             List[str]: 图片链接列表
         """
-        thumbnail_wrapper = soup.find(class_=CSS_SELECTORS['thumbnail_wrapper'])
+        return self._image_links_from(self._find_by_class(doc, CSS_SELECTORS['thumbnail_wrapper']))
+    
+    def _image_links_from(self, thumbnail_wrapper: Any) -> List[str]:
         image_links = []
         
-        if thumbnail_wrapper:
-            img_elements = thumbnail_wrapper.find_all('img')
+        if thumbnail_wrapper is not None:
+            img_elements = self._find_all_tag(thumbnail_wrapper, 'img')
             for img in img_elements:
-                src = img.get('src')
+                src = self._attr(img, 'src')
                 if src:
                     src = normalize_url(src)
                     image_links.append(src)
@@ -60,31 +320,33 @@ class DataExtractor:
         
         return image_links
     
-    def extract_product_info(self, soup: BeautifulSoup) -> Dict[str, str]:
+    def extract_product_info(self, doc: Any) -> Dict[str, str]:
         """
         提取产品详细信息
         
         Args:
-            soup: BeautifulSoup解析对象
-            
+            doc: 解析后的文档对象（由 parse() 返回）
+        
         Returns:
             Dict[str, str]: 产品信息字典
         """
-        details_section = soup.find(class_=CSS_SELECTORS['product_details'])
+        return self._product_info_from(self._find_by_class(doc, CSS_SELECTORS['product_details']))
+    
+    def _product_info_from(self, details_section: Any) -> Dict[str, str]:
         product_info = {}
         
-        if details_section:
-            dt_elements = details_section.find_all('dt', class_=CSS_SELECTORS['detail_label'])
+        if details_section is not None:
+            dt_elements = self._find_all_by_class(details_section, CSS_SELECTORS['detail_label'], tag='dt')
             print(f"找到 {len(dt_elements)} 个标签")
             
             for dt in dt_elements:
                 # 获取key (标签名)
-                label_inner = dt.find(class_=CSS_SELECTORS['detail_label_inner'])
-                key = label_inner.get_text(strip=True) if label_inner else ""
+                label_inner = self._find_by_class(dt, CSS_SELECTORS['detail_label_inner'])
+                key = self._text(label_inner, strip=True) if label_inner is not None else ""
                 
                 # 查找对应的dd元素（包含标签值）
-                dd = dt.find_next_sibling('dd', class_=CSS_SELECTORS['detail_label_text'])
-                value = dd.get_text(strip=True) if dd else ""
+                dd = self._next_sibling_by_class(dt, 'dd', CSS_SELECTORS['detail_label_text'])
+                value = self._text(dd, strip=True) if dd is not None else ""
                 
                 # 清理文本
                 value = clean_text(value)
@@ -97,36 +359,33 @@ class DataExtractor:
         
         return product_info
     
-    def extract_article_content(self, soup: BeautifulSoup) -> str:
+    def extract_article_content(self, doc: Any) -> str:
         """
         提取产品文章内容
         
         Args:
-            soup: BeautifulSoup解析对象
-            
+            doc: 解析后的文档对象（由 parse() 返回）
+        
         Returns:
             str: 文章内容
         """
         # 查找产品文章区域和说明文字区域
-        article_section = soup.find(class_=CSS_SELECTORS['product_article'])
-        instruction_section = soup.find(class_='pg-products__instructionTxt')
-        
+        article_section = self._find_by_class(doc, CSS_SELECTORS['product_article'])
+        instruction_section = self._find_by_class(doc, CSS_SELECTORS['instruction_text'])
+        return self._article_content_from(article_section, instruction_section)
+    
+    def _article_content_from(self, article_section: Any, instruction_section: Any) -> str:
         content_parts = []
         
-        if article_section:
+        if article_section is not None:
             # 处理产品文章区域
-            html_content = str(article_section)
-            html_content = html_content.replace('<br/>', ' ')
-            
-            # 重新解析处理后的HTML
-            temp_soup = BeautifulSoup(html_content, 'html.parser')
-            article_text = temp_soup.get_text(separator='\n', strip=False)
+            article_text = self._article_text(article_section)
             if article_text.strip():
                 content_parts.append(article_text)
         
-        if instruction_section:
+        if instruction_section is not None:
             # 处理说明文字区域
-            instruction_text = instruction_section.get_text(separator='\n', strip=False)
+            instruction_text = self._text(instruction_section, separator='\n', strip=False)
             if instruction_text.strip():
                 content_parts.append(instruction_text)
         
@@ -136,22 +395,23 @@ class DataExtractor:
             print("未找到产品文章区域或说明文字区域")
             return ""
     
-    def extract_product_tag(self, soup: BeautifulSoup) -> str:
+    def extract_product_tag(self, doc: Any) -> str:
         """
         提取产品标签信息
         
         Args:
-            soup: BeautifulSoup解析对象
-            
+            doc: 解析后的文档对象（由 parse() 返回）
+        
         Returns:
             str: 产品标签，多个标签用分号分隔，如"online;gbase"等，未找到时返回"general"
         """
         # 查找class包含pg-products__tag的元素
-        tag_elements = soup.find_all(class_=lambda x: x and 'pg-products__tag' in x)
-        
+        return self._product_tag_from(self._find_all_class_contains(doc, CSS_SELECTORS['product_tag']))
+    
+    def _product_tag_from(self, tag_elements: List[Any]) -> str:
         tags = []
         for element in tag_elements:
-            class_list = element.get('class', [])
+            class_list = self._class_list(element)
             for class_name in class_list:
                 # 查找以-开头的class（如-gbase）
                 if class_name.startswith('-'):
@@ -167,22 +427,23 @@ class DataExtractor:
         print("未找到产品标签，使用默认值: general")
         return "general"
     
-    def extract_series_links(self, soup: BeautifulSoup) -> str:
+    def extract_series_links(self, doc: Any) -> str:
         """
         提取系列链接信息
         
         Args:
-            soup: BeautifulSoup解析对象
-            
+            doc: 解析后的文档对象（由 parse() 返回）
+        
         Returns:
             str: 系列链接列表，用分号分割，如"g-reco;unicorn;seed"
         """
         # 查找class为c-card__flat p-card__flat的元素
-        series_elements = soup.find_all('a', class_='c-card__flat p-card__flat')
-        
+        return self._series_links_from(self._find_all_by_class(doc, CSS_SELECTORS['series_links'], tag='a'))
+    
+    def _series_links_from(self, series_elements: List[Any]) -> str:
         series_list = []
         for element in series_elements:
-            href = element.get('href', '')
+            href = self._attr(element, 'href') or ''
             if href:
                 # 从URL中提取系列名称，如从/series/g-reco/提取g-reco
                 if '/series/' in href:
@@ -200,13 +461,122 @@ class DataExtractor:
             print("未找到系列链接")
             return ""
     
+    def extract_total_pages(self, doc: Any) -> int:
+        """
+        从列表页提取总页数
+        
+        Args:
+            doc: 解析后的文档对象（由 parse() 返回）
+        
+        Returns:
+            int: 总页数，无法解析时返回1
+        """
+        # 查找分页链接
+        pagination_links = self._find_all_by_class(doc, CSS_SELECTORS['pagination_links'])
+        print(f"找到 {len(pagination_links)} 个分页链接")
+        
+        if not pagination_links:
+            print("未找到分页链接，返回默认页数1")
+            return 1
+        
+        # 获取最后一个分页链接的页码
+        last_link = pagination_links[-1]
+        page_text = self._text(last_link, strip=True)
+        
+        # 尝试提取页码数字
+        try:
+            total_pages = int(page_text)
+            print(f"总页数: {total_pages}")
+            return total_pages
+        except ValueError:
+            # 如果无法转换为数字，尝试从href中提取
+            href = self._attr(last_link, 'href') or ''
+            if 'p=' in href:
+                # 从URL参数中提取页码
+                match = re.search(r'p=(\d+)', href)
+                if match:
+                    total_pages = int(match.group(1))
+                    print(f"从URL中提取总页数: {total_pages}")
+                    return total_pages
+            
+            print(f"无法解析页码 '{page_text}'，返回默认页数1")
+            return 1
+    
+    def extract_product_cards(self, doc: Any) -> Optional[List[Tuple[ProductLink, str, str]]]:
+        """
+        从列表页提取产品卡片
+        
+        Args:
+            doc: 解析后的文档对象（由 parse() 返回）
+        
+        Returns:
+            List[Tuple[ProductLink, str, str]]: (产品链接, 价格, 发售日) 列表，
+                未找到卡片容器时返回None
+        """
+        # 查找指定class的元素
+        target_elements = self._find_all_by_class(doc, CSS_SELECTORS['product_cards'])
+        print(f"找到 {len(target_elements)} 个匹配的元素")
+        
+        if not target_elements:
+            return None
+        
+        element = target_elements[0]  # 只处理第一个元素
+        
+        # 查找所有链接
+        links = self._find_all_tag(element, 'a')
+        print(f"找到 {len(links)} 个链接")
+        
+        cards = []
+        for link in links:
+            href = self._attr(link, 'href')
+            
+            # 精确提取产品信息
+            product_name = ""
+            product_price = ""
+            product_release_date = ""
+            
+            # 提取产品名称
+            title_elem = self._find_by_class(link, 'p-card__tit')
+            if title_elem is not None:
+                product_name = self._text(title_elem, strip=True)
+            
+            # 提取价格
+            price_elem = self._find_by_class(link, 'p-card__price')
+            if price_elem is not None:
+                product_price = self._text(price_elem, strip=True)
+            
+            # 提取发布日期
+            date_elem = self._find_by_class(link, 'p-card_date')
+            if date_elem is not None:
+                product_release_date = self._text(date_elem, strip=True)
+            
+            print(f"产品信息: {product_name} | {product_price} | {product_release_date}")
+            
+            # 查找列表头像图（p-card__img 下的 img）
+            avatar_url = None
+            for img_wrapper in self._find_all_by_class(link, 'p-card__img'):
+                img_tags = self._find_all_tag(img_wrapper, 'img')
+                if img_tags:
+                    avatar_url = self._attr(img_tags[0], 'src') or None
+                    break
+            
+            # 创建产品链接对象（附带 avatar 链接）
+            product_link = ProductLink(
+                href=href,
+                text=product_name,
+                avatar=avatar_url
+            )
+            cards.append((product_link, product_price, product_release_date))
+        
+        return cards
+    
     def sanitize_folder_name(self, folder_name: str) -> str:
         """
         清理文件夹名称，移除非法字符
         
         Args:
             folder_name: 原始文件夹名称
-            
+        
         Returns:
             str: 清理后的文件夹名称
         """
@@ -220,3 +590,24 @@ class DataExtractor:
         if len(folder_name) > 100:
             folder_name = folder_name[:100]
         return folder_name
+
+
+def create_data_extractor(backend: str = PARSER_BACKEND) -> DataExtractor:
+    """
+    按名称创建数据提取器
+
+    Args:
+        backend: 解析后端，'html.parser'（默认）、'lxml' 或 'selectolax'
+
+    Returns:
+        DataExtractor: 对应后端的数据提取器
+    """
+    if backend == 'html.parser':
+        return DataExtractor()
+    if backend == 'lxml':
+        from lxml_extractor import LxmlDataExtractor
+        return LxmlDataExtractor()
+    if backend == 'selectolax':
+        from selectolax_extractor import SelectolaxDataExtractor
+        return SelectolaxDataExtractor()
+    raise ValueError(f"未知的解析后端: {backend}（可选: {', '.join(PARSER_BACKENDS)}）")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分面倒排索引模块
+为产品目录库的 brand / series / product_tag（';' 拼接的多个值）建立倒排索引：
+每个 (字段, 值) 对应一个位图，第 n 位表示 products 表中ID为 n 的产品。
+位图以 Python 整数做与/或运算，zlib 压缩后保存在目录库的 facet_postings 表中，
+查询只读取相关位图和命中的产品行，不加载整个目录库。
+"""
+
+import sqlite3
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# 建索引的字段；series 与 product_tag 为 ';' 拼接的多个值
+FACET_FIELDS = ('brand', 'series', 'product_tag')
+
+# SQL 中 IN (...) 一次使用的参数个数上限
+IN_CHUNK_SIZE = 500
+
+Facet = Tuple[str, str]
+
+
+def product_facets(brand: Optional[str], series: Optional[str], product_tag: Optional[str]) -> Set[Facet]:
+    """产品的全部 (字段, 值)"""
+    facets = {('brand', brand)} if brand else set()
+    for field, value in (('series', series), ('product_tag', product_tag)):
+        facets.update((field, part) for part in (value or '').split(';') if part)
+    return facets
+
+
+def encode_bitmap(bitmap: int) -> bytes:
+    return zlib.compress(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little'))
+
+
+def decode_bitmap(data: bytes) -> int:
+    return int.from_bytes(zlib.decompress(data), 'little')
+
+
+def bitmap_ids(bitmap: int, limit: Optional[int] = None) -> List[int]:
+    """位图中置位的产品ID（从小到大，最多 limit 个）；逐字节扫描，避免对大整数逐位运算"""
+    ids = []
+    for offset, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')):
+        while byte:
+            low = byte & -byte
+            ids.append(offset * 8 + low.bit_length() - 1)
+            if limit is not None and len(ids) >= limit:
+                return ids
+            byte ^= low
+    return ids
+
+
+class FacetIndex:
+    """
+    保存在目录库连接中的分面倒排索引
+
+    不缓存位图：更新在调用方的写事务中读出并改写相关位图，多个进程共用目录库时也不会覆盖彼此的修改。
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def init_table(self) -> bool:
+        """创建位图表，返回是否为新建（新建时需调用 rebuild() 为已有产品建索引）"""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'facet_postings'").fetchone()
+        if exists:
+            return False
+        self._conn.execute('''
+            CREATE TABLE facet_postings (
+                field TEXT NOT NULL,
+                value TEXT NOT NULL,
+                product_count INTEGER NOT NULL,
+                bitmap BLOB NOT NULL,
+                PRIMARY KEY (field, value)
+            ) WITHOUT ROWID
+        ''')
+        return True
+
+    def snapshot(self, urls: Iterable[str]) -> Dict[str, Tuple[int, Set[Facet]]]:
+        """读取这些URL当前的产品ID与分面值（不存在的URL不在结果中）"""
+        urls = list(urls)
+        result = {}
+        for start in range(0, len(urls), IN_CHUNK_SIZE):
+            chunk = urls[start:start + IN_CHUNK_SIZE]
+            rows = self._conn.execute(f'''
+                SELECT id, url, brand, series, product_tag FROM products
+                WHERE url IN ({', '.join('?' for _ in chunk)})
+            ''', chunk).fetchall()
+            for product_id, url, brand, series, product_tag in rows:
+                result[url] = (product_id, product_facets(brand, series, product_tag))
+        return result
+
+    def apply(self, before: Dict[str, Tuple[int, Set[Facet]]], after: Dict[str, Tuple[int, Set[Facet]]]):
+        """
+        按写入前后的快照增量更新位图（须在写入 products 的同一事务中调用）
+
+        Args:
+            before: 写入前的 snapshot()
+            after: 写入后的 snapshot()
+        """
+        changes: Dict[Facet, List[Tuple[int, bool]]] = {}
+        for url, (product_id, new_facets) in after.items():
+            old_id, old_facets = before.get(url, (product_id, set()))
+            for facet in old_facets - new_facets:
+                changes.setdefault(facet, []).append((old_id, False))
+            for facet in new_facets - old_facets:
+                changes.setdefault(facet, []).append((product_id, True))
+        if not changes:
+            return
+
+        bitmaps = self._load(changes)
+        for facet, bits in changes.items():
+            bitmap = bitmaps.get(facet, 0)
+            for product_id, present in bits:
+                bitmap = bitmap | (1 << product_id) if present else bitmap & ~(1 << product_id)
+            bitmaps[facet] = bitmap
+        self._store(bitmaps)
+
+    def rebuild(self, batch_size: int = 5000) -> int:
+        """按 products 表重建全部位图（逐批读取），返回索引的 (字段, 值) 数量"""
+        bitmaps: Dict[Facet, int] = {}
+        last_id = 0
+        while True:
+            rows = self._conn.execute('''
+                SELECT id, brand, series, product_tag FROM products
+                WHERE id > ? ORDER BY id LIMIT ?
+            ''', (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            for product_id, brand, series, product_tag in rows:
+                for facet in product_facets(brand, series, product_tag):
+                    bitmaps[facet] = bitmaps.get(facet, 0) | (1 << product_id)
+        self._conn.execute('DELETE FROM facet_postings')
+        self._store(bitmaps)
+        return len(bitmaps)
+
+    def _load(self, facets: Iterable[Facet]) -> Dict[Facet, int]:
+        bitmaps = {}
+        for field, value in facets:
+            row = self._conn.execute(
+                'SELECT bitmap FROM facet_postings WHERE field = ? AND value = ?', (field, value)).fetchone()
+            if row:
+                bitmaps[(field, value)] = decode_bitmap(row[0])
+        return bitmaps
+
+    def _store(self, bitmaps: Dict[Facet, int]):
+        empty = [facet for facet, bitmap in bitmaps.items() if not bitmap]
+        self._conn.executemany('DELETE FROM facet_postings WHERE field = ? AND value = ?', empty)
+        self._conn.executemany('''
+            INSERT OR REPLACE INTO facet_postings (field, value, product_count, bitmap) VALUES (?, ?, ?, ?)
+        ''', [(field, value, bin(bitmap).count('1'), encode_bitmap(bitmap))
+              for (field, value), bitmap in bitmaps.items() if bitmap])
+
+    def match(self, conditions: Dict[str, Iterable[str]]) -> int:
+        """
+        求同时满足全部条件的产品位图
+
+        Args:
+            conditions: 字段 -> 值列表；同一字段的多个值须全部具有（brand 给多个值时结果为空）
+
+        Returns:
+            int: 命中产品的位图（没有条件时为0）
+        """
+        result = None
+        for field, values in conditions.items():
+            if field not in FACET_FIELDS:
+                raise ValueError(f"未知的分面字段: {field}（可选: {', '.join(FACET_FIELDS)}）")
+            for value in values:
+                bitmap = self._load([(field, value)]).get((field, value), 0)
+                result = bitmap if result is None else result & bitmap
+                if not result:
+                    return 0
+        return result or 0
+
+    def values(self, field: str) -> List[Tuple[str, int]]:
+        """字段的全部取值及各自的产品数（按产品数从多到少）"""
+        return self._conn.execute('''
+            SELECT value, product_count FROM facet_postings WHERE field = ?
+            ORDER BY product_count DESC, value
+        ''', (field,)).fetchall()
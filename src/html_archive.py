@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原始HTML归档模块
+按内容哈希压缩保存抓取到的列表页/详情页，支持离线重放提取
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from config import HTML_ARCHIVE_DIR
+
+try:
+    import zstandard
+except ImportError:  # 未安装 zstandard 时使用 gzip
+    zstandard = None
+
+
+class ArchiveMiss(LookupError):
+    """重放模式下归档中没有该URL的页面"""
+
+
+class HtmlArchive:
+    """内容寻址的HTML归档（objects/<哈希前两位>/<哈希>.html.zst|.html.gz + SQLite索引）"""
+
+    def __init__(self, archive_dir: str = HTML_ARCHIVE_DIR):
+        """
+        初始化归档
+
+        Args:
+            archive_dir: 归档根目录
+        """
+        self.archive_dir = archive_dir
+        self.objects_dir = os.path.join(archive_dir, 'objects')
+        self.db_path = os.path.join(archive_dir, 'index.db')
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        """初始化索引表：同一URL的每个不同内容版本一行"""
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS page_versions (
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                kind TEXT,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (url, content_hash)
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_page_versions_url_time ON page_versions (url, fetched_at)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_page_versions_kind ON page_versions (kind)')
+        conn.commit()
+        conn.close()
+
+    def _object_path(self, content_hash: str, ext: str) -> str:
+        return os.path.join(self.objects_dir, content_hash[:2], f"{content_hash}{ext}")
+
+    def put(self, url: str, body: bytes, kind: str = 'page') -> str:
+        """
+        归档一个页面；相同内容只保存一份
+
+        Args:
+            url: 页面URL
+            body: 原始响应内容
+            kind: 页面类型（'list' / 'detail' / 'page'）
+
+        Returns:
+            str: 内容哈希（sha256）
+        """
+        content_hash = hashlib.sha256(body).hexdigest()
+        if not self._find_object(content_hash):
+            if zstandard is not None:
+                path = self._object_path(content_hash, '.html.zst')
+                data = zstandard.ZstdCompressor(level=10).compress(body)
+            else:
+                path = self._object_path(content_hash, '.html.gz')
+                data = gzip.compress(body, compresslevel=6)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再改名，避免中断时留下不完整的对象
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            conn = self._connect()
+            conn.execute('''
+                INSERT INTO page_versions (url, content_hash, kind, fetched_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(url, content_hash) DO UPDATE SET fetched_at = excluded.fetched_at
+            ''', (url, content_hash, kind, time.time()))
+            conn.commit()
+            conn.close()
+        return content_hash
+
+    def _find_object(self, content_hash: str) -> Optional[str]:
+        """查找内容对象文件，不存在时返回None"""
+        for ext in ('.html.zst', '.html.gz'):
+            path = self._object_path(content_hash, ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def read_object(self, content_hash: str) -> bytes:
+        """读取并解压内容对象"""
+        path = self._find_object(content_hash)
+        if path is None:
+            raise ArchiveMiss(f"归档对象不存在: {content_hash}")
+        with open(path, 'rb') as f:
+            data = f.read()
+        if path.endswith('.zst'):
+            if zstandard is None:
+                raise RuntimeError("读取 .zst 归档需要安装 zstandard")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def latest_hash(self, url: str) -> Optional[str]:
+        """URL最近一次抓取到的内容哈希，未归档时返回None"""
+        conn = self._connect()
+        row = conn.execute('''
+            SELECT content_hash FROM page_versions
+            WHERE url = ?
+            ORDER BY fetched_at DESC
+            LIMIT 1
+        ''', (url,)).fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def get(self, url: str) -> bytes:
+        """
+        读取URL最近一次归档的页面内容
+
+        Raises:
+            ArchiveMiss: 归档中没有该URL
+        """
+        content_hash = self.latest_hash(url)
+        if content_hash is None:
+            raise ArchiveMiss(f"归档中没有该页面: {url}")
+        return self.read_object(content_hash)
+
+    def list_urls(self, kind: Optional[str] = None) -> List[str]:
+        """列出已归档的URL（可按页面类型过滤）"""
+        conn = self._connect()
+        if kind:
+            rows = conn.execute('SELECT DISTINCT url FROM page_versions WHERE kind = ? ORDER BY url', (kind,)).fetchall()
+        else:
+            rows = conn.execute('SELECT DISTINCT url FROM page_versions ORDER BY url').fetchall()
+        conn.close()
+        return [r[0] for r in rows]
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP缓存模块
+在磁盘上保存响应校验信息（ETag/Last-Modified）与页面内容，用于条件请求
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from config import HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_ACCESS_FLUSH_ITEMS
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目"""
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: Optional[bytes]
+    extracted_path: Optional[str] = None  # 该页面最近一次提取结果所在的产品文件夹
+
+
+class HttpCache:
+    """
+    基于SQLite的持久化HTTP缓存，超出容量时按LRU淘汰
+
+    各线程共用一个连接（WAL 日志模式，通过锁串行使用）。读取不写数据库：访问时间先记在内存，
+    攒够 access_flush_items 条、写入新条目（淘汰之前）或 close() 时一次写入。
+    """
+
+    def __init__(self, cache_dir: str = HTTP_CACHE_DIR, max_bytes: int = HTTP_CACHE_MAX_BYTES,
+                 access_flush_items: int = HTTP_CACHE_ACCESS_FLUSH_ITEMS):
+        """
+        初始化HTTP缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存内容的总字节数上限
+            access_flush_items: 内存中的访问时间攒够多少条后写入
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.access_flush_items = max(1, access_flush_items)
+        self.db_path = os.path.join(cache_dir, 'http_cache.db')
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._accessed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._init_db()
+        self._total_bytes = self._compute_total_bytes()
+
+    def _init_db(self):
+        """初始化缓存表"""
+        conn = self._conn
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB,
+                size INTEGER NOT NULL DEFAULT 0,
+                extracted_path TEXT,
+                last_access REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_http_cache_last_access ON http_cache (last_access)')
+        conn.commit()
+
+    def _compute_total_bytes(self) -> int:
+        return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM http_cache').fetchone()[0]
+
+    def close(self):
+        """写入内存中的访问时间并关闭连接"""
+        with self._lock:
+            self._flush_accessed()
+            self._conn.commit()
+            self._conn.close()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """获取缓存条目（LRU访问时间记在内存，攒够一批后写入），不存在时返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, last_modified, body, extracted_path FROM http_cache WHERE url = ?', (url,)
+            ).fetchone()
+            if row:
+                self._accessed[url] = time.time()
+                if len(self._accessed) >= self.access_flush_items:
+                    self._flush_accessed()
+                    self._conn.commit()
+        if not row:
+            return None
+        return CacheEntry(url=url, etag=row[0], last_modified=row[1], body=row[2], extracted_path=row[3])
+
+    def conditional_headers(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """
+        根据缓存条目生成条件请求头
+
+        Args:
+            entry: 缓存条目
+
+        Returns:
+            Dict[str, str]: If-None-Match / If-Modified-Since 请求头，无校验信息时为空
+        """
+        headers = {}
+        if entry:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, url: str, headers, body: Optional[bytes] = None):
+        """
+        保存响应的校验信息与内容；响应没有 ETag/Last-Modified 时不缓存
+
+        Args:
+            url: 请求URL
+            headers: 响应头（大小写不敏感的映射）
+            body: 响应内容，为None时只保存校验信息（如图片，内容已落盘）
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        size = len(body) if body else 0
+        with self._lock:
+            conn = self._conn
+            self._accessed.pop(url, None)
+            old = conn.execute('SELECT size FROM http_cache WHERE url = ?', (url,)).fetchone()
+            conn.execute('''
+                INSERT INTO http_cache (url, etag, last_modified, body, size, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    body = excluded.body,
+                    size = excluded.size,
+                    extracted_path = NULL,
+                    last_access = excluded.last_access
+            ''', (url, etag, last_modified, body, size, time.time()))
+            self._total_bytes += size - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                # 淘汰按访问时间排序，先写入内存中的访问时间
+                self._flush_accessed()
+                self._evict(conn)
+            conn.commit()
+
+    def mark_extracted(self, url: str, extracted_path: str):
+        """记录该页面的提取结果已保存到指定产品文件夹"""
+        with self._lock:
+            self._conn.execute('UPDATE http_cache SET extracted_path = ? WHERE url = ?', (extracted_path, url))
+            self._conn.commit()
+
+    def _flush_accessed(self):
+        """把内存中的访问时间写入数据库（调用方需持有锁并负责提交）"""
+        if self._accessed:
+            self._conn.executemany('UPDATE http_cache SET last_access = ? WHERE url = ?',
+                                   [(accessed_at, url) for url, accessed_at in self._accessed.items()])
+            self._accessed.clear()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """按最近访问时间淘汰条目，直到总大小不超过上限（调用方需持有锁）"""
+        while self._total_bytes > self.max_bytes:
+            rows = conn.execute(
+                'SELECT url, size FROM http_cache ORDER BY last_access LIMIT 100'
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for url, size in rows:
+                conn.execute('DELETE FROM http_cache WHERE url = ?', (url,))
+                self._total_bytes -= size
+                self.evictions += 1
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def record_hit(self):
+        """记录一次命中（服务端返回304）"""
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        """记录一次未命中（无缓存或内容已变化）"""
+        with self._lock:
+            self.misses += 1
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计信息"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+            'size_bytes': self._total_bytes,
+        }
+
+    def report(self):
+        """打印缓存统计信息"""
+        stats = self.get_stats()
+        print(f"HTTP缓存: 命中 {stats['hits']}, 未命中 {stats['misses']}, "
+              f"命中率 {stats['hit_rate']:.1%}, 淘汰 {stats['evictions']}, "
+              f"占用 {stats['size_bytes'] / 1024 / 1024:.1f} MB")
@@ -6,58 +6,200 @@
 """
 
 import os
+import re
+import json
 import time
+import hashlib
+import tempfile
+import threading
 import requests
+from collections import Counter
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
 from urllib.parse import urlparse
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterable, List, Mapping, Optional, Tuple
 
-from config import IMAGE_TIMEOUT
+from config import (
+    IMAGE_TIMEOUT, IMAGE_ADAPTIVE_INITIAL_RATE, IMAGE_ADAPTIVE_MAX_RATE,
+    IMAGE_DOWNLOAD_WORKERS, IMAGE_CHUNK_SIZE
+)
+from rate_controller import AdaptiveRateController
+from http_cache import CacheEntry, HttpCache
+
+if TYPE_CHECKING:
+    from image_manifest import ImageManifest
+    from image_store import ImageStore
+
+# 下载中的临时文件（与最终文件同目录，完成后原子重命名）
+TEMP_PREFIX = '.download-'
+TEMP_SUFFIX = '.tmp'
+# 中断时保留的部分下载（按URL命名，重试时以 Range 请求续传），旁边的 .json 记录校验信息
+PART_SUFFIX = '.part'
+CONTENT_RANGE_PATTERN = re.compile(r'bytes (\d+)-\d+/(\d+|\*)')
+
+
+class IncompleteDownload(IOError):
+    """收到的字节数与 Content-Length 不一致"""
+    pass
+
+
+@dataclass
+class PartialDownload:
+    """已认领的部分下载：.part 文件已重命名为临时文件，续传时在其后追加"""
+    temp_path: str
+    part_path: str
+    offset: int      # 已下载的字节数
+    validator: str   # 首次下载时的 ETag 或 Last-Modified，用作 If-Range
+
+
+def format_latencies(latencies: List[float]) -> str:
+    """
+    格式化单张图片耗时，用于日志输出
+    
+    Args:
+        latencies: 按图片顺序排列的耗时（秒）
+        
+    Returns:
+        str: 如 "#1 0.21s, #2 0.25s（平均 0.23s，最慢 0.25s）"
+    """
+    if not latencies:
+        return "无"
+    per_image = ", ".join(f"#{i} {latency:.2f}s" for i, latency in enumerate(latencies, 1))
+    return f"{per_image}（平均 {sum(latencies) / len(latencies):.2f}s，最慢 {max(latencies):.2f}s）"
 
 
 class ImageDownloader:
     """图片下载器类"""
     
-    def __init__(self, session: requests.Session):
+    def __init__(self, session: requests.Session, rate_controller: Optional[AdaptiveRateController] = None, http_cache: Optional[HttpCache] = None,
+                 max_workers: int = IMAGE_DOWNLOAD_WORKERS, image_store: Optional['ImageStore'] = None,
+                 image_manifest: Optional['ImageManifest'] = None):
         """
         初始化图片下载器
         
         Args:
             session: 用于下载的requests会话
+            rate_controller: 图片请求的自适应速率控制器，默认新建一个
+            http_cache: HTTP缓存，提供时对本地已有的图片发条件请求
+            max_workers: 并发下载线程数，线程池由同时处理的各产品共用；为1时逐张下载
+            image_store: 图片内容寻址存储，提供时已存储的URL不再请求，同一URL同时只下载一次
+            image_manifest: 图片清单，提供时登记每张下载完成的图片
         """
         self.session = session
+        self.http_cache = http_cache
+        self.image_store = image_store
+        self.image_manifest = image_manifest
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self.rate_controller = rate_controller or AdaptiveRateController(
+            name="image",
+            initial_rate=IMAGE_ADAPTIVE_INITIAL_RATE,
+            max_rate=IMAGE_ADAPTIVE_MAX_RATE
+        )
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
     
-    def download_images(self, image_links: List[str], referer_url: str, output_path: str) -> Tuple[List[str], bool]:
+    def download_images(self, image_links: List[str], referer_url: str, output_path: str,
+                        filenames: Optional[Dict[str, str]] = None) -> Tuple[List[str], bool]:
         """
         下载图片列表
         
+        max_workers 大于1时并发下载，否则逐张下载；任一图片失败即停止其余下载，整体视为失败。
+        已下载成功的图片登记到图片清单，重试时只需下载其余图片。
+        
         Args:
             image_links: 图片链接列表
             referer_url: 引用页面URL
             output_path: 输出目录路径
+            filenames: URL -> 文件名（见 expected_filenames），未给出的按响应确定
             
         Returns:
             tuple: (downloaded_files: List[str], success: bool)
-                - downloaded_files: 成功下载的文件路径列表
-                - success: 是否至少成功下载了一张图片
+                - downloaded_files: 成功下载的文件路径列表（按图片链接顺序）
+                - success: 是否全部图片都下载成功
         """
         print("开始下载图片...")
-        downloaded_files = []
+        self.remove_stale_temp_files(output_path)
+        filenames = filenames or {}
+        if self.max_workers > 1 and len(image_links) > 1:
+            results = self._download_concurrent(image_links, referer_url, output_path, filenames)
+        else:
+            results = self._download_sequential(image_links, referer_url, output_path, filenames)
         
-        for i, img_url in enumerate(image_links):
-            print(f"下载图片 {i+1}/{len(image_links)}: {img_url[:50]}...")
-            file_path = self.download_single_image(img_url, referer_url, output_path)
-            
-            if file_path:
-                downloaded_files.append(file_path)
-            else:
-                print(f"  ✗ 图片下载失败，终止本次下载任务")
-                return downloaded_files, False
+        if self.image_manifest:
+            for img_url, (file_path, _) in zip(image_links, results):
+                if file_path:
+                    self.image_manifest.record(output_path, img_url, file_path)
         
+        downloaded_files = [file_path for file_path, _ in results if file_path]
+        latencies = [latency for file_path, latency in results if file_path]
         success = len(downloaded_files) == len(image_links)
         print(f"成功下载 {len(downloaded_files)} / {len(image_links)} 张图片")
+        print(f"单张耗时: {format_latencies(latencies)}")
         
         return downloaded_files, success
     
+    def _download_sequential(self, image_links: List[str], referer_url: str, output_path: str,
+                             filenames: Dict[str, str]) -> List[Tuple[Optional[str], float]]:
+        """逐张下载，遇到失败即终止，返回已尝试图片的 (文件路径, 耗时)"""
+        results = []
+        for i, img_url in enumerate(image_links):
+            print(f"下载图片 {i+1}/{len(image_links)}: {img_url[:50]}...")
+            file_path, latency = self._fetch_image(img_url, referer_url, output_path, filename=filenames.get(img_url))
+            results.append((file_path, latency))
+            if not file_path:
+                print(f"  ✗ 图片下载失败，终止本次下载任务")
+                break
+        return results
+    
+    def _download_concurrent(self, image_links: List[str], referer_url: str, output_path: str,
+                             filenames: Dict[str, str]) -> List[Tuple[Optional[str], float]]:
+        """
+        并发下载，遇到失败即取消尚未发出的请求，并等待进行中的下载结束后返回
+        
+        Returns:
+            List[Tuple[Optional[str], float]]: 按图片链接顺序的 (文件路径, 耗时)，未完成的为 (None, 0.0)
+        """
+        executor = self._get_executor()
+        abort = threading.Event()
+        futures = {}
+        for i, img_url in enumerate(image_links):
+            print(f"下载图片 {i+1}/{len(image_links)}: {img_url[:50]}...")
+            futures[executor.submit(self._fetch_image, img_url, referer_url, output_path, abort, filenames.get(img_url))] = i
+        
+        results: List[Tuple[Optional[str], float]] = [(None, 0.0)] * len(image_links)
+        for future in as_completed(futures):
+            file_path, latency = future.result()
+            results[futures[future]] = (file_path, latency)
+            if not file_path:
+                print(f"  ✗ 图片下载失败，终止本次下载任务")
+                abort.set()
+                for pending in futures:
+                    pending.cancel()
+                break
+        
+        # 等待已开始的下载结束，避免返回后仍有线程写入该产品目录
+        wait(futures)
+        for future, index in futures.items():
+            if not future.cancelled():
+                results[index] = future.result()
+        return results
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """获取共用的下载线程池（首次使用时创建）"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="image")
+            return self._executor
+    
+    def close(self):
+        """关闭下载线程池"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+    
     def download_single_image(self, image_url: str, referer_url: str, output_path: str) -> Optional[str]:
         """
         下载单个图片
@@ -70,56 +212,468 @@ class ImageDownloader:
         Returns:
             str: 成功下载的文件路径，失败时返回None
         """
+        return self._fetch_image(image_url, referer_url, output_path)[0]
+    
+    def _fetch_image(self, image_url: str, referer_url: str, output_path: str,
+                     abort: Optional[threading.Event] = None, filename: Optional[str] = None) -> Tuple[Optional[str], float]:
+        """
+        获取单个图片并计时：已在存储中的直接链接；同一URL正在被其他线程下载时等待其结果
+        
+        Args:
+            image_url: 图片URL
+            referer_url: 引用页面URL
+            output_path: 输出目录路径
+            abort: 所在批次的终止标志，限速等待结束后已置位则不再发出请求
+            filename: 保存的文件名，为None时按URL与响应确定
+            
+        Returns:
+            tuple: (文件路径, 耗时秒数)，失败时文件路径为None
+        """
+        if self.image_store is None:
+            return self._download_image(image_url, referer_url, output_path, abort, filename)
+        
+        start = time.monotonic()
+        try:
+            file_path = self.link_stored(image_url, output_path, filename)
+            if file_path:
+                return file_path, time.monotonic() - start
+            
+            with self._inflight_lock:
+                inflight = self._inflight.get(image_url)
+                if inflight is None:
+                    inflight = self._inflight[image_url] = Future()
+                    leader = True
+                else:
+                    leader = False
+            
+            if not leader:
+                print(f"  ⏳ 同一图片正在下载，等待完成: {image_url[:50]}...")
+                inflight.result()
+                file_path = self.link_stored(image_url, output_path, filename)
+                if file_path:
+                    return file_path, time.monotonic() - start
+                # 先行的下载失败，自行下载一次
+                return self._download_image(image_url, referer_url, output_path, abort, filename)
+            
+            try:
+                return self._download_image(image_url, referer_url, output_path, abort, filename)
+            finally:
+                with self._inflight_lock:
+                    del self._inflight[image_url]
+                inflight.set_result(None)
+        
+        except Exception as e:
+            print(f"  ✗ 图片下载失败: {str(e)[:100]}...")
+            return None, time.monotonic() - start
+    
+    def link_stored(self, image_url: str, output_path: str, filename: Optional[str] = None) -> Optional[str]:
+        """
+        URL已在图片存储中时，链接到输出目录而不发请求
+        
+        Args:
+            image_url: 图片URL
+            output_path: 输出目录路径
+            filename: 链接的文件名，为None时沿用首次下载时的文件名
+            
+        Returns:
+            str: 输出目录中的文件路径，存储中没有该URL时返回None
+        """
+        if self.image_store is None:
+            return None
+        stored = self.image_store.lookup(image_url)
+        if stored is None:
+            return None
+        blob_path, stored_filename = stored
+        file_path = os.path.join(output_path, filename or stored_filename)
+        self.image_store.link(blob_path, file_path)
+        self.image_store.reused += 1
+        print(f"  ✓ 图片已在存储中，链接到: {file_path}")
+        return file_path
+    
+    def _download_image(self, image_url: str, referer_url: str, output_path: str,
+                        abort: Optional[threading.Event] = None, filename: Optional[str] = None) -> Tuple[Optional[str], float]:
+        """
+        下载单个图片并计时
+        
+        Returns:
+            tuple: (文件路径, 耗时秒数)，耗时从发出请求到保存完成，不含限速等待；失败时文件路径为None
+        """
+        start = time.monotonic()
+        partial = None
         try:
             # 创建输出目录
             os.makedirs(output_path, exist_ok=True)
             
-            # 设置图片下载请求头
-            headers = {
-                'Referer': referer_url,
-                'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
-                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Sec-Fetch-Dest': 'image',
-                'Sec-Fetch-Mode': 'no-cors',
-                'Sec-Fetch-Site': 'cross-site',
-                'Cache-Control': 'no-cache',
-                'Pragma': 'no-cache',
-            }
+            # 设置图片下载请求头（本地已有文件时带上校验信息，否则有上次中断的部分下载时续传）
+            headers = self.build_headers(referer_url)
+            cache_entry, existing_path = self.cached_image(image_url, output_path, filename)
+            if cache_entry:
+                headers.update(self.http_cache.conditional_headers(cache_entry))
+            else:
+                partial = self.claim_partial(output_path, image_url)
+                if partial:
+                    headers.update(self.range_headers(partial))
             
             # 单次请求下载图片，失败即返回None
-            response = self.session.get(image_url, headers=headers, timeout=IMAGE_TIMEOUT)
-            response.raise_for_status()
-            
-            # 检查响应内容类型
-            content_type = response.headers.get('content-type', '')
-            if not content_type.startswith('image/'):
-                print(f"  ✗ 响应不是图片格式: {content_type}")
-                return None
-            
-            # 生成文件名
-            parsed_url = urlparse(image_url)
-            filename = os.path.basename(parsed_url.path)
-            if not filename or '.' not in filename:
-                # 从content-type获取扩展名
-                ext = 'jpg'
-                if 'png' in content_type:
-                    ext = 'png'
-                elif 'webp' in content_type:
-                    ext = 'webp'
-                filename = f"image_{int(time.time())}.{ext}"
-            
-            # 保存文件
-            file_path = os.path.join(output_path, filename)
-            with open(file_path, 'wb') as f:
-                f.write(response.content)
+            self.rate_controller.before_request()
+            if abort is not None and abort.is_set():
+                return None, 0.0
+            start = time.monotonic()
+            try:
+                response = self.session.get(image_url, headers=headers, timeout=self.rate_controller.timeout(IMAGE_TIMEOUT), stream=True)
+            except requests.exceptions.Timeout:
+                self.rate_controller.record(time.monotonic() - start, timed_out=True)
+                raise
+            
+            with response:
+                self.rate_controller.record(time.monotonic() - start, response.status_code, response.headers.get('Retry-After'))
+                if response.status_code == 416 and partial:
+                    # 部分内容已不对应服务器上的文件，丢弃后完整下载
+                    self.discard_partial(partial)
+                    partial = None
+                    return self._download_image(image_url, referer_url, output_path, abort, filename)
+                if response.status_code == 304 and cache_entry:
+                    self.http_cache.record_hit()
+                    print(f"  ✓ 图片未修改，沿用本地文件: {existing_path}")
+                    return existing_path, time.monotonic() - start
+                response.raise_for_status()
+                
+                # 检查响应内容类型
+                content_type = response.headers.get('content-type', '')
+                if not content_type.startswith('image/'):
+                    print(f"  ✗ 响应不是图片格式: {content_type}")
+                    return None, time.monotonic() - start
+                
+                # 生成文件名
+                filename = filename or self.resolve_filename(image_url, content_type)
+                
+                # 分块写入临时文件（续传时追加到部分内容之后），校验长度后重命名为最终文件
+                file_path = os.path.join(output_path, filename)
+                stream_partial, partial = partial, None
+                self._save_stream(response.iter_content(IMAGE_CHUNK_SIZE), file_path, response.status_code,
+                                  response.headers, image_url, stream_partial)
+            
+            if self.http_cache:
+                self.http_cache.record_miss()
+                self.http_cache.store(image_url, response.headers)
             
             print(f"  ✓ 图片已保存: {file_path}")
-            return file_path
+            return file_path, time.monotonic() - start
         
         except Exception as e:
             print(f"  ✗ 图片下载失败: {str(e)[:100]}...")
+            return None, time.monotonic() - start
+        finally:
+            # 未用上的部分下载放回原处，留给下次重试
+            if partial:
+                self.restore_partial(partial)
+    
+    def _save_stream(self, chunks: Iterable[bytes], file_path: str, status: int, headers: Mapping[str, str],
+                     image_url: str, partial: Optional[PartialDownload] = None):
+        """将响应分块写入临时文件，校验完整后保存为 file_path；中断时保留为 .part 文件供续传"""
+        output_path = os.path.dirname(file_path)
+        temp_file, temp_path, digest = self.open_stream_file(output_path, status, headers, partial)
+        try:
+            written = 0
+            with temp_file:
+                for chunk in chunks:
+                    temp_file.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+            self.commit_temp_file(temp_path, file_path, written, headers, image_url, digest.hexdigest())
+        except BaseException:
+            self.keep_partial(temp_path, self.part_path(output_path, image_url), headers)
+            raise
+    
+    def part_path(self, output_path: str, image_url: str) -> str:
+        """图片URL对应的 .part 文件路径"""
+        url_hash = hashlib.md5(image_url.encode('utf-8')).hexdigest()
+        return os.path.join(output_path, f"{TEMP_PREFIX}{url_hash}{PART_SUFFIX}")
+    
+    def claim_partial(self, output_path: str, image_url: str) -> Optional[PartialDownload]:
+        """
+        认领上次中断保留的部分下载：将 .part 文件重命名为本次的临时文件，避免并发任务同时续传
+        
+        Args:
+            output_path: 输出目录路径
+            image_url: 图片URL
+            
+        Returns:
+            PartialDownload: 可续传的部分下载，没有时返回None
+        """
+        part_path = self.part_path(output_path, image_url)
+        if not os.path.exists(part_path):
             return None
+        temp_file, temp_path = self.open_temp_file(output_path)
+        temp_file.close()
+        try:
+            os.replace(part_path, temp_path)
+        except FileNotFoundError:
+            # 已被其他任务认领
+            self.discard_temp_file(temp_path)
+            return None
+        
+        try:
+            with open(part_path + '.json', 'r', encoding='utf-8') as f:
+                validator = json.load(f).get('validator')
+        except (OSError, ValueError):
+            validator = None
+        offset = os.path.getsize(temp_path)
+        if not validator or offset == 0:
+            self.discard_temp_file(temp_path)
+            self.discard_temp_file(part_path + '.json')
+            return None
+        print(f"  ↻ 续传图片，已有 {offset / 1024:.0f} KB")
+        return PartialDownload(temp_path, part_path, offset, validator)
+    
+    def range_headers(self, partial: PartialDownload) -> Dict[str, str]:
+        """
+        续传请求头：服务器上的文件已变化（If-Range 不匹配）或不支持 Range 时返回完整内容；
+        续传时不接受压缩，保证字节偏移对应原始内容
+        """
+        return {
+            'Range': f"bytes={partial.offset}-",
+            'If-Range': partial.validator,
+            'Accept-Encoding': 'identity',
+        }
+    
+    def open_stream_file(self, output_path: str, status: int, headers: Mapping[str, str],
+                         partial: Optional[PartialDownload] = None):
+        """
+        打开本次响应的写入目标：206 且起始位置与部分下载一致时在其后追加，否则新建临时文件
+        
+        Args:
+            output_path: 输出目录路径
+            status: 响应状态码
+            headers: 响应头
+            partial: 本次请求续传的部分下载
+            
+        Returns:
+            tuple: (已打开的二进制文件, 临时文件路径, 已包含部分内容的sha256对象)
+        """
+        digest = hashlib.sha256()
+        if partial is None:
+            if status == 206:
+                raise IncompleteDownload("未请求续传却收到部分内容")
+            temp_file, temp_path = self.open_temp_file(output_path)
+            return temp_file, temp_path, digest
+        
+        self.discard_temp_file(partial.part_path + '.json')
+        match = CONTENT_RANGE_PATTERN.match(headers.get('Content-Range', ''))
+        if status == 206 and match and int(match.group(1)) == partial.offset:
+            with open(partial.temp_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(IMAGE_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            return open(partial.temp_path, 'ab'), partial.temp_path, digest
+        
+        self.discard_temp_file(partial.temp_path)
+        if status == 206:
+            raise IncompleteDownload(f"续传位置不一致: {headers.get('Content-Range')}")
+        print("  ↻ 服务器返回完整内容，重新下载")
+        temp_file, temp_path = self.open_temp_file(output_path)
+        return temp_file, temp_path, digest
+    
+    def keep_partial(self, temp_path: str, part_path: str, headers: Mapping[str, str]):
+        """
+        下载中断时将已写入的内容保留为 .part 文件；响应没有可用作 If-Range 的校验信息时删除
+        
+        Args:
+            temp_path: 临时文件路径
+            part_path: .part 文件路径
+            headers: 本次响应的响应头
+        """
+        etag = headers.get('ETag')
+        validator = etag if etag and not etag.startswith('W/') else headers.get('Last-Modified')
+        try:
+            size = os.path.getsize(temp_path)
+        except OSError:
+            return
+        if not validator or size == 0 or headers.get('Content-Encoding'):
+            self.discard_temp_file(temp_path)
+            return
+        try:
+            with open(part_path + '.json', 'w', encoding='utf-8') as f:
+                json.dump({'validator': validator}, f)
+            os.replace(temp_path, part_path)
+            print(f"  💾 已保留 {size / 1024:.0f} KB，重试时续传")
+        except OSError:
+            self.discard_temp_file(temp_path)
+    
+    def restore_partial(self, partial: PartialDownload):
+        """将未用上的部分下载放回 .part 文件"""
+        try:
+            os.replace(partial.temp_path, partial.part_path)
+        except OSError:
+            self.discard_partial(partial)
+    
+    def discard_partial(self, partial: PartialDownload):
+        """删除部分下载及其校验信息"""
+        self.discard_temp_file(partial.temp_path)
+        self.discard_temp_file(partial.part_path + '.json')
+    
+    def open_temp_file(self, output_path: str) -> Tuple[BinaryIO, str]:
+        """
+        在输出目录中创建下载用的临时文件
+        
+        Args:
+            output_path: 输出目录路径
+            
+        Returns:
+            tuple: (已打开的二进制文件, 临时文件路径)
+        """
+        fd, temp_path = tempfile.mkstemp(dir=output_path, prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX)
+        # mkstemp 创建的文件仅所有者可读，改为与普通写入的图片相同的权限
+        os.fchmod(fd, 0o644)
+        return os.fdopen(fd, 'wb'), temp_path
+    
+    def commit_temp_file(self, temp_path: str, file_path: str, written: int, headers: Mapping[str, str],
+                         image_url: Optional[str] = None, content_hash: Optional[str] = None):
+        """
+        校验临时文件长度并保存为最终文件
+        
+        响应未压缩且带有 Content-Length 时，写入字节数必须与之相等，否则抛出 IncompleteDownload
+        （临时文件由调用方删除）。启用图片存储时临时文件移入存储，file_path 为指向它的链接；
+        否则原子重命名为 file_path。
+        
+        Args:
+            temp_path: 临时文件路径
+            file_path: 最终文件路径
+            written: 已写入的字节数
+            headers: 响应头
+            image_url: 图片URL（写入存储索引）
+            content_hash: 文件内容的sha256
+        """
+        expected = headers.get('Content-Length')
+        if expected and expected.isdigit() and not headers.get('Content-Encoding') and int(expected) != written:
+            raise IncompleteDownload(f"图片不完整: 收到 {written} / {expected} 字节")
+        if self.image_store is not None and image_url and content_hash:
+            blob_path = self.image_store.add(image_url, temp_path, content_hash, os.path.basename(file_path))
+            self.image_store.link(blob_path, file_path)
+        else:
+            os.replace(temp_path, file_path)
+    
+    def discard_temp_file(self, temp_path: str):
+        """删除临时文件（不存在时忽略）"""
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+    
+    def remove_stale_temp_files(self, output_path: str) -> int:
+        """
+        删除上次中断遗留的临时文件
+        
+        Args:
+            output_path: 输出目录路径
+            
+        Returns:
+            int: 删除的文件数
+        """
+        if not os.path.isdir(output_path):
+            return 0
+        removed = 0
+        for name in os.listdir(output_path):
+            if name.startswith(TEMP_PREFIX) and name.endswith(TEMP_SUFFIX):
+                self.discard_temp_file(os.path.join(output_path, name))
+                removed += 1
+        if removed:
+            print(f"🧹 已清理 {removed} 个中断遗留的临时文件")
+        return removed
+    
+    def cached_image(self, image_url: str, output_path: str,
+                     filename: Optional[str] = None) -> Tuple[Optional[CacheEntry], Optional[str]]:
+        """
+        查找可用于条件请求的缓存条目
+        
+        Args:
+            image_url: 图片URL
+            output_path: 输出目录路径
+            filename: 本地文件名，为None时取URL中的文件名
+            
+        Returns:
+            tuple: (缓存条目, 本地文件路径)，本地文件不存在或没有缓存时为 (None, None)
+        """
+        if not self.http_cache:
+            return None, None
+        filename = filename or os.path.basename(urlparse(image_url).path)
+        if not filename or '.' not in filename:
+            return None, None
+        existing_path = os.path.join(output_path, filename)
+        if not os.path.exists(existing_path):
+            return None, None
+        entry = self.http_cache.get(image_url)
+        if not entry:
+            return None, None
+        return entry, existing_path
+    
+    def build_headers(self, referer_url: str) -> dict:
+        """
+        构建图片下载请求头
+        
+        Args:
+            referer_url: 引用页面URL
+            
+        Returns:
+            dict: 请求头
+        """
+        return {
+            'Referer': referer_url,
+            'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
+            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Connection': 'keep-alive',
+            'Sec-Fetch-Dest': 'image',
+            'Sec-Fetch-Mode': 'no-cors',
+            'Sec-Fetch-Site': 'cross-site',
+            'Cache-Control': 'no-cache',
+            'Pragma': 'no-cache',
+        }
+    
+    def resolve_filename(self, image_url: str, content_type: str) -> str:
+        """
+        根据图片URL生成文件名，URL中没有文件名时按content-type生成
+        
+        Args:
+            image_url: 图片URL
+            content_type: 响应的content-type
+            
+        Returns:
+            str: 文件名
+        """
+        parsed_url = urlparse(image_url)
+        filename = os.path.basename(parsed_url.path)
+        if not filename or '.' not in filename:
+            # 从content-type获取扩展名
+            ext = 'jpg'
+            if 'png' in content_type:
+                ext = 'png'
+            elif 'webp' in content_type:
+                ext = 'webp'
+            # 按URL生成固定文件名，并发下载时不会相互覆盖
+            filename = f"image_{hashlib.md5(image_url.encode('utf-8')).hexdigest()[:12]}.{ext}"
+        return filename
+    
+    def expected_filenames(self, image_links: List[str]) -> Dict[str, str]:
+        """
+        按URL确定产品内各图片的文件名：一般为URL中的文件名，不同URL文件名相同时附加URL哈希避免相互覆盖；
+        URL中没有带扩展名的文件名时不在结果中（由响应的content-type决定）
+        
+        Args:
+            image_links: 产品的全部图片链接
+            
+        Returns:
+            Dict[str, str]: URL -> 文件名
+        """
+        basenames = {url: os.path.basename(urlparse(url).path) for url in dict.fromkeys(image_links)}
+        counts = Counter(basenames.values())
+        filenames = {}
+        for url, filename in basenames.items():
+            if not filename or '.' not in filename:
+                continue
+            if counts[filename] > 1:
+                stem, ext = os.path.splitext(filename)
+                filename = f"{stem}_{hashlib.md5(url.encode('utf-8')).hexdigest()[:8]}{ext}"
+            filenames[url] = filename
+        return filenames
     
     # 刷新/重新获取链接相关逻辑已删除，下载失败即失败
\ No newline at end of file
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片清单模块
+按产品图片目录记录每个图片URL对应的文件名、大小与哈希，用于判断哪些图片还需要下载
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import IMAGE_MANIFEST_DIR, IMAGE_CHUNK_SIZE
+
+
+class ImageManifest:
+    """基于SQLite的图片清单：每个产品图片目录的 URL -> 文件名/大小/sha256"""
+
+    def __init__(self, manifest_dir: str = IMAGE_MANIFEST_DIR):
+        """
+        初始化图片清单
+
+        Args:
+            manifest_dir: 清单数据库所在目录
+        """
+        self.manifest_dir = manifest_dir
+        self.db_path = os.path.join(manifest_dir, 'image_manifest.db')
+        self._lock = threading.Lock()
+        os.makedirs(manifest_dir, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        """初始化清单表：产品需要的每个图片一行，下载完成前文件信息为空"""
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS image_manifest (
+                images_dir TEXT NOT NULL,
+                url TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                filename TEXT,
+                size INTEGER,
+                content_hash TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (images_dir, url)
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_image_manifest_pending ON image_manifest (images_dir) WHERE filename IS NULL')
+        conn.commit()
+        conn.close()
+
+    def missing(self, images_dir: str, image_links: List[str], candidates: Optional[Dict[str, str]] = None) -> List[str]:
+        """
+        更新产品需要的图片链接，返回还需要下载的链接（按原顺序）
+
+        已记录的图片只检查记录的文件本身（不列目录）：文件丢失或大小不符时重新下载。
+        不在链接列表中的旧记录被删除。尚无记录的图片若 candidates 给出的文件已存在，
+        直接登记（兼容清单出现之前下载的图片）。
+
+        Args:
+            images_dir: 产品图片目录
+            image_links: 产品的图片链接列表
+            candidates: 尚无记录时用于登记已有文件的 URL -> 文件名
+
+        Returns:
+            List[str]: 需要下载的图片链接
+        """
+        images_dir = os.path.normpath(images_dir)
+        links = list(dict.fromkeys(image_links))
+        with self._lock:
+            conn = self._connect()
+            rows = {
+                url: (filename, size)
+                for url, filename, size in conn.execute(
+                    'SELECT url, filename, size FROM image_manifest WHERE images_dir = ?', (images_dir,))
+            }
+            now = time.time()
+            link_set = set(links)
+            stale = [url for url in rows if url not in link_set]
+            conn.executemany('DELETE FROM image_manifest WHERE images_dir = ? AND url = ?',
+                             [(images_dir, url) for url in stale])
+
+            missing = []
+            for position, url in enumerate(links):
+                filename, size = rows.get(url, (None, None))
+                if filename and self._file_size(os.path.join(images_dir, filename)) == size:
+                    conn.execute('UPDATE image_manifest SET position = ? WHERE images_dir = ? AND url = ?',
+                                 (position, images_dir, url))
+                    continue
+
+                record = None
+                candidate = (candidates or {}).get(url)
+                if not filename and candidate and os.path.isfile(os.path.join(images_dir, candidate)):
+                    record = self._file_record(os.path.join(images_dir, candidate))
+                conn.execute('''
+                    INSERT INTO image_manifest (images_dir, url, position, filename, size, content_hash, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(images_dir, url) DO UPDATE SET
+                        position = excluded.position,
+                        filename = excluded.filename,
+                        size = excluded.size,
+                        content_hash = excluded.content_hash,
+                        updated_at = excluded.updated_at
+                ''', (images_dir, url, position, *(record or (None, None, None)), now))
+                if record is None:
+                    missing.append(url)
+            conn.commit()
+            conn.close()
+        return missing
+
+    def record(self, images_dir: str, url: str, file_path: str):
+        """
+        登记下载完成的图片
+
+        Args:
+            images_dir: 产品图片目录
+            url: 图片URL
+            file_path: 保存的文件路径（位于 images_dir 中）
+        """
+        images_dir = os.path.normpath(images_dir)
+        filename, size, content_hash = self._file_record(file_path)
+        with self._lock:
+            conn = self._connect()
+            conn.execute('''
+                INSERT INTO image_manifest (images_dir, url, position, filename, size, content_hash, updated_at)
+                VALUES (?, ?, (SELECT COUNT(*) FROM image_manifest WHERE images_dir = ?), ?, ?, ?, ?)
+                ON CONFLICT(images_dir, url) DO UPDATE SET
+                    filename = excluded.filename,
+                    size = excluded.size,
+                    content_hash = excluded.content_hash,
+                    updated_at = excluded.updated_at
+            ''', (images_dir, url, images_dir, filename, size, content_hash, time.time()))
+            conn.commit()
+            conn.close()
+
+    def pending(self) -> Dict[str, List[str]]:
+        """
+        全部产品中尚未下载的图片（只查询清单，不访问图片目录）
+
+        Returns:
+            Dict[str, List[str]]: 产品图片目录 -> 待下载的图片链接
+        """
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT images_dir, url FROM image_manifest
+            WHERE filename IS NULL
+            ORDER BY images_dir, position
+        ''').fetchall()
+        conn.close()
+        result: Dict[str, List[str]] = {}
+        for images_dir, url in rows:
+            result.setdefault(images_dir, []).append(url)
+        return result
+
+    def _file_size(self, file_path: str) -> Optional[int]:
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return None
+
+    def _file_record(self, file_path: str):
+        """返回 (文件名, 大小, sha256)"""
+        digest = hashlib.sha256()
+        size = 0
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(IMAGE_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                size += len(chunk)
+        return os.path.basename(file_path), size, digest.hexdigest()
+
+    def get_stats(self) -> Dict:
+        """获取清单统计信息"""
+        conn = self._connect()
+        products, images, downloaded, total_bytes = conn.execute('''
+            SELECT COUNT(DISTINCT images_dir), COUNT(*), COUNT(filename), COALESCE(SUM(size), 0)
+            FROM image_manifest
+        ''').fetchone()
+        pending_products = conn.execute(
+            'SELECT COUNT(DISTINCT images_dir) FROM image_manifest WHERE filename IS NULL').fetchone()[0]
+        conn.close()
+        return {
+            'products': products,
+            'images': images,
+            'downloaded': downloaded,
+            'pending': images - downloaded,
+            'pending_products': pending_products,
+            'total_bytes': total_bytes,
+        }
+
+    def report(self):
+        """打印清单统计信息"""
+        stats = self.get_stats()
+        print(f"图片清单: {stats['products']} 个产品 / {stats['images']} 张图片, "
+              f"已下载 {stats['downloaded']} ({stats['total_bytes'] / 1024 / 1024:.1f} MB), "
+              f"待下载 {stats['pending']} 张（{stats['pending_products']} 个产品）")
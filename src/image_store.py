@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片内容寻址存储模块
+按内容哈希保存图片（同一内容只存一份），产品目录中的图片为指向存储对象的硬链接
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+from config import IMAGE_STORE_DIR
+from image_downloader import TEMP_PREFIX, TEMP_SUFFIX
+
+
+class ImageStore:
+    """内容寻址的图片存储（objects/<哈希前两位>/<哈希><扩展名> + SQLite URL索引）"""
+
+    def __init__(self, store_dir: str = IMAGE_STORE_DIR):
+        """
+        初始化图片存储
+
+        Args:
+            store_dir: 存储根目录
+        """
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, 'objects')
+        self.db_path = os.path.join(store_dir, 'index.db')
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._init_db()
+
+        # 统计信息
+        self.stored = 0       # 新增的存储对象
+        self.deduplicated = 0  # 下载后发现内容已存在
+        self.reused = 0       # URL已在存储中，未发请求
+        self.linked = 0       # 创建的硬链接
+        self.copied = 0       # 无法硬链接时复制的文件
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        """初始化索引表：每个图片URL对应一个内容对象"""
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS url_blobs (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_url_blobs_hash ON url_blobs (content_hash)')
+        conn.commit()
+        conn.close()
+
+    def _object_path(self, content_hash: str, filename: str) -> str:
+        ext = os.path.splitext(filename)[1].lower()
+        return os.path.join(self.objects_dir, content_hash[:2], f"{content_hash}{ext}")
+
+    def lookup(self, url: str) -> Optional[Tuple[str, str]]:
+        """
+        查找URL已保存的图片
+
+        Args:
+            url: 图片URL
+
+        Returns:
+            Tuple[str, str]: (存储对象路径, 首次下载时的文件名)，未保存或对象已丢失时返回None
+        """
+        conn = self._connect()
+        row = conn.execute('SELECT content_hash, filename FROM url_blobs WHERE url = ?', (url,)).fetchone()
+        conn.close()
+        if not row:
+            return None
+        blob_path = self._object_path(row[0], row[1])
+        if not os.path.exists(blob_path):
+            return None
+        return blob_path, row[1]
+
+    def add(self, url: str, temp_path: str, content_hash: str, filename: str) -> str:
+        """
+        将下载完成的临时文件存入存储；内容已存在时删除临时文件
+
+        Args:
+            url: 图片URL
+            temp_path: 已校验完整的临时文件
+            content_hash: 文件内容的sha256
+            filename: 图片文件名（决定存储对象的扩展名）
+
+        Returns:
+            str: 存储对象路径
+        """
+        blob_path = self._object_path(content_hash, filename)
+        size = os.path.getsize(temp_path)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        with self._lock:
+            if os.path.exists(blob_path):
+                os.remove(temp_path)
+                self.deduplicated += 1
+            else:
+                os.replace(temp_path, blob_path)
+                self.stored += 1
+
+            conn = self._connect()
+            conn.execute('''
+                INSERT INTO url_blobs (url, content_hash, filename, size, stored_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    filename = excluded.filename,
+                    size = excluded.size,
+                    stored_at = excluded.stored_at
+            ''', (url, content_hash, filename, size, time.time()))
+            conn.commit()
+            conn.close()
+        return blob_path
+
+    def link(self, blob_path: str, file_path: str):
+        """
+        让 file_path 指向存储对象：优先硬链接，跨文件系统等无法链接时复制；原子替换已有文件
+
+        Args:
+            blob_path: 存储对象路径
+            file_path: 产品目录中的目标文件路径
+        """
+        if os.path.exists(file_path) and os.path.samefile(blob_path, file_path):
+            return
+        directory = os.path.dirname(file_path)
+        os.makedirs(directory, exist_ok=True)
+        # 与下载临时文件同名规则，中断遗留时由 ImageDownloader.remove_stale_temp_files 清理
+        temp_path = os.path.join(directory, f"{TEMP_PREFIX}{uuid.uuid4().hex}{TEMP_SUFFIX}")
+        try:
+            try:
+                os.link(blob_path, temp_path)
+                linked = True
+            except OSError:
+                shutil.copyfile(blob_path, temp_path)
+                linked = False
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        with self._lock:
+            if linked:
+                self.linked += 1
+            else:
+                self.copied += 1
+
+    def get_stats(self) -> Dict:
+        """获取存储统计信息"""
+        conn = self._connect()
+        urls, logical_bytes = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM url_blobs').fetchone()
+        blobs, stored_bytes = conn.execute('''
+            SELECT COUNT(*), COALESCE(SUM(size), 0)
+            FROM (SELECT content_hash, MAX(size) AS size FROM url_blobs GROUP BY content_hash)
+        ''').fetchone()
+        conn.close()
+        return {
+            'urls': urls,
+            'blobs': blobs,
+            'stored_bytes': stored_bytes,
+            'logical_bytes': logical_bytes,
+            'stored': self.stored,
+            'deduplicated': self.deduplicated,
+            'reused': self.reused,
+            'linked': self.linked,
+            'copied': self.copied,
+        }
+
+    def report(self):
+        """打印存储统计信息"""
+        stats = self.get_stats()
+        print(f"图片存储: {stats['urls']} 个URL / {stats['blobs']} 个对象, "
+              f"占用 {stats['stored_bytes'] / 1024 / 1024:.1f} MB（按URL计 {stats['logical_bytes'] / 1024 / 1024:.1f} MB）; "
+              f"本次新增 {stats['stored']}, 内容去重 {stats['deduplicated']}, URL复用 {stats['reused']}, "
+              f"硬链接 {stats['linked']}, 复制 {stats['copied']}")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+lxml 解析后端
+用 lxml.html 解析并以 XPath 查找元素，文本拼接规则与 BeautifulSoup 保持一致
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from lxml import etree
+from lxml import html as lxml_html
+
+from data_extractor import PRESERVE_WHITESPACE_TAGS, SKIPPED_TEXT_TAGS, DataExtractor, collapse_whitespace
+
+
+class LxmlDataExtractor(DataExtractor):
+    """基于 lxml 的数据提取器"""
+
+    backend = 'lxml'
+
+    def __init__(self):
+        super().__init__()
+        self._xpath_cache: Dict[Tuple[str, Optional[str], bool], etree.XPath] = {}
+
+    def parse(self, html: str) -> Any:
+        if not html or not html.strip():
+            return lxml_html.document_fromstring('<html></html>')
+        try:
+            return lxml_html.document_fromstring(html)
+        except ValueError:
+            # 带有XML编码声明的字符串需以字节形式解析
+            return lxml_html.document_fromstring(html.encode('utf-8'))
+
+    def parse_list_page(self, html: str) -> Any:
+        # C实现的整页建树已足够快，不做部分解析
+        return self.parse(html)
+
+    def _iter_elements(self, doc: Any) -> Iterator[Any]:
+        return doc.iter(etree.Element)
+
+    def _tag_name(self, node: Any) -> str:
+        return node.tag
+
+    def _class_xpath(self, class_name: str, tag: Optional[str], first: bool) -> etree.XPath:
+        """
+        编译class匹配的XPath：单个class按token匹配，含空格的class按整串（规范化空白后）匹配，
+        与 BeautifulSoup 的 class_ 规则一致
+        """
+        key = (class_name, tag, first)
+        xpath = self._xpath_cache.get(key)
+        if xpath is None:
+            if ' ' in class_name.strip():
+                predicate = "normalize-space(@class)=$name"
+            else:
+                predicate = "contains(concat(' ', normalize-space(@class), ' '), concat(' ', $name, ' '))"
+            expression = f".//{tag or '*'}[{predicate}]"
+            if first:
+                expression = f"({expression})[1]"
+            xpath = etree.XPath(expression)
+            self._xpath_cache[key] = xpath
+        return xpath
+
+    def _find_by_class(self, node: Any, class_name: str, tag: Optional[str] = None) -> Any:
+        result = self._class_xpath(class_name, tag, True)(node, name=' '.join(class_name.split()))
+        return result[0] if result else None
+
+    def _find_all_by_class(self, node: Any, class_name: str, tag: Optional[str] = None) -> List[Any]:
+        return self._class_xpath(class_name, tag, False)(node, name=' '.join(class_name.split()))
+
+    def _find_all_class_contains(self, node: Any, fragment: str) -> List[Any]:
+        return [
+            element for element in node.iterdescendants(etree.Element)
+            if any(fragment in class_name for class_name in (element.get('class') or '').split())
+        ]
+
+    def _find_all_tag(self, node: Any, tag: str) -> List[Any]:
+        return list(node.iterdescendants(tag))
+
+    def _next_sibling_by_class(self, node: Any, tag: str, class_name: str) -> Any:
+        target = class_name.split()
+        for sibling in node.itersiblings(tag):
+            classes = (sibling.get('class') or '').split()
+            if classes == target or (len(target) == 1 and target[0] in classes):
+                return sibling
+        return None
+
+    def _attr(self, node: Any, name: str) -> Optional[str]:
+        return node.get(name)
+
+    def _class_list(self, node: Any) -> List[str]:
+        return (node.get('class') or '').split()
+
+    def _strings(self, node: Any, preserve: bool = False) -> Iterator[str]:
+        """按文档顺序产出元素内的文本节点（跳过注释与脚本/样式，纯空白文本按 BeautifulSoup 规则折叠）"""
+        if not isinstance(node.tag, str) or node.tag in SKIPPED_TEXT_TAGS:
+            return
+        preserve = preserve or node.tag in PRESERVE_WHITESPACE_TAGS
+        if node.text:
+            yield node.text if preserve else collapse_whitespace(node.text)
+        for child in node:
+            yield from self._strings(child, preserve)
+            if child.tail:
+                yield child.tail if preserve else collapse_whitespace(child.tail)
+
+    def _text(self, node: Any, separator: str = '', strip: bool = False) -> str:
+        strings = self._strings(node)
+        if strip:
+            strings = (s.strip() for s in strings)
+            strings = (s for s in strings if s)
+        return separator.join(strings)
+
+    def _article_strings(self, node: Any, preserve: bool = False) -> Iterator[str]:
+        """
+        产出文章区域的文本片段：同一父元素下相邻的文本与无属性的 <br> 合并为一段，
+        <br> 计为一个空格（与默认后端规则一致）
+        """
+        if not isinstance(node.tag, str) or node.tag in SKIPPED_TEXT_TAGS:
+            return
+        preserve = preserve or node.tag in PRESERVE_WHITESPACE_TAGS
+        fold = (lambda text: text) if preserve else collapse_whitespace
+        run = fold(node.text) if node.text else ''
+        for child in node:
+            if child.tag == 'br' and not child.attrib:
+                run += ' '
+            else:
+                if run:
+                    yield fold(run)
+                    run = ''
+                yield from self._article_strings(child, preserve)
+            if child.tail:
+                run += fold(child.tail)
+        if run:
+            yield fold(run)
+
+    def _article_text(self, node: Any) -> str:
+        return '\n'.join(self._article_strings(node))
@@ -48,6 +48,21 @@ class ProductDetails:
             'avatar': self.avatar,
             'brand': self.brand
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ProductDetails':
+        """从 to_dict() 格式的字典创建对象"""
+        return cls(
+            name=data.get('product_name', ''),
+            image_links=data.get('image_links') or [],
+            product_info=data.get('product_info') or {},
+            article_content=data.get('article_content', ''),
+            url=data.get('url', ''),
+            product_tag=data.get('product_tag', ''),
+            series=data.get('series', ''),
+            avatar=data.get('avatar') or '',
+            brand=data.get('brand', '')
+        )
 
 
 @dataclass
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parquet 导出模块（需安装 pyarrow）
+把产品目录库中的全部产品流式写成按品牌分区的 Parquet 数据集（<输出目录>/brand=<品牌>/*.parquet），
+product_info 中的常见项（価格 / 発売日 / 対象年齢）展开为带类型的列，
+series / product_tag 按 ';' 拆分为字符串列表；每次只在内存中保留一批记录
+"""
+
+import os
+import re
+import shutil
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from catalog_store import CatalogStore
+from config import CATALOG_PARQUET_DIR, PARQUET_BATCH_ROWS
+
+# product_info 中展开为独立列的项：键 -> 原文列名（由原文再解析出 price_yen / release_* / min_age 等数值列），
+# 其余项保存在 product_info_other 中
+INFO_TEXT_COLUMNS = {
+    '価格': 'price_text',
+    '発売日': 'release_text',
+    '対象年齢': 'age_text',
+}
+
+PRICE_PATTERN = re.compile(r'(\d[\d,]*)\s*円')
+RELEASE_PATTERN = re.compile(r'(\d{4})\s*年\s*(?:(\d{1,2})\s*月)?\s*(?:(\d{1,2})\s*日)?')
+AGE_PATTERN = re.compile(r'(\d+)\s*歳')
+
+SCHEMA = pa.schema([
+    ('url', pa.string()),
+    ('product_dir', pa.string()),
+    ('brand', pa.string()),
+    ('product_name', pa.string()),
+    ('series', pa.list_(pa.string())),
+    ('product_tag', pa.list_(pa.string())),
+    ('avatar', pa.string()),
+    ('image_count', pa.int32()),
+    ('image_links', pa.list_(pa.string())),
+    ('article_content', pa.string()),
+    ('price_text', pa.string()),
+    ('price_yen', pa.int64()),
+    ('tax_included', pa.bool_()),
+    ('release_text', pa.string()),
+    ('release_year', pa.int16()),
+    ('release_month', pa.int8()),
+    ('release_day', pa.int8()),
+    ('age_text', pa.string()),
+    ('min_age', pa.int8()),
+    ('product_info_other', pa.map_(pa.string(), pa.string())),
+])
+# 分区文件中不含 brand 列（由目录名 brand=<品牌> 给出）
+FILE_SCHEMA = SCHEMA.remove(SCHEMA.get_field_index('brand'))
+# 无品牌产品所在的分区（Hive 分区的空值约定）
+DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+PART_FILE = 'part-0.parquet'
+
+
+def split_joined(value: Optional[str]) -> list:
+    """把 ';' 拼接的字符串（series / product_tag）拆为列表"""
+    return [part for part in (value or '').split(';') if part]
+
+
+def parse_price(text: Optional[str]) -> Tuple[Optional[int], Optional[bool]]:
+    """解析价格文本（如 '5,500 円 (税10%込)'），返回 (日元金额, 是否含税)"""
+    if not text:
+        return None, None
+    match = PRICE_PATTERN.search(text)
+    amount = int(match.group(1).replace(',', '')) if match else None
+    tax_included = True if '税' in text and '込' in text else (False if '税抜' in text or '税別' in text else None)
+    return amount, tax_included
+
+
+def parse_release(text: Optional[str]) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """解析发售日文本（如 '2025年 3月'），返回 (年, 月, 日)，缺少的部分为 None"""
+    match = RELEASE_PATTERN.search(text or '')
+    if not match:
+        return None, None, None
+    year, month, day = (int(group) if group else None for group in match.groups())
+    return year, month, day
+
+
+def parse_min_age(text: Optional[str]) -> Optional[int]:
+    """解析对象年龄文本（如 '15歳以上'），返回最低年龄"""
+    match = AGE_PATTERN.search(text or '')
+    return int(match.group(1)) if match else None
+
+
+def record_to_row(record: Dict) -> Dict:
+    """把目录库记录转换为一行 Parquet 数据（与 SCHEMA 对应）"""
+    info = record.get('product_info') if isinstance(record.get('product_info'), dict) else {}
+    row = {column: info.get(key) for key, column in INFO_TEXT_COLUMNS.items()}
+    row['price_yen'], row['tax_included'] = parse_price(row['price_text'])
+    row['release_year'], row['release_month'], row['release_day'] = parse_release(row['release_text'])
+    row['min_age'] = parse_min_age(row['age_text'])
+    row['product_info_other'] = [(str(key), str(value)) for key, value in info.items()
+                                 if key not in INFO_TEXT_COLUMNS] or None
+
+    image_links = record.get('image_links') or []
+    row.update({
+        'url': record['url'],
+        'product_dir': record.get('product_dir'),
+        'brand': record.get('brand') or None,
+        'product_name': record.get('product_name'),
+        'series': split_joined(record.get('series')),
+        'product_tag': split_joined(record.get('product_tag')),
+        'avatar': record.get('avatar'),
+        'image_count': len(image_links),
+        'image_links': image_links,
+        'article_content': record.get('article_content'),
+    })
+    return row
+
+
+def iter_row_batches(catalog: CatalogStore, batch_rows: int = PARQUET_BATCH_ROWS,
+                     brand: Optional[str] = None) -> Iterator[List[Dict]]:
+    """逐批读取目录库并转换为 Parquet 行，每批最多 batch_rows 行"""
+    rows = []
+    for record in catalog.iter_records(brand=brand, batch_size=batch_rows):
+        rows.append(record_to_row(record))
+        if len(rows) >= batch_rows:
+            yield rows
+            rows = []
+    if rows:
+        yield rows
+
+
+def export_parquet(catalog: CatalogStore, output_dir: str = CATALOG_PARQUET_DIR,
+                   batch_rows: int = PARQUET_BATCH_ROWS, brand: Optional[str] = None) -> int:
+    """
+    把目录库导出为按品牌分区的 Parquet 数据集（替换输出目录中对应品牌分区的旧数据）
+
+    每个品牌分区一个写入器，每批记录按品牌拆开后各写为一个行组，内存中最多只有一批记录；
+    各分区先写临时文件，全部写完后再替换旧文件，中途出错时删除临时文件、保留旧数据。
+    导出全部品牌时，目录库中已没有产品的品牌分区一并删除。
+
+    Args:
+        catalog: 产品目录库
+        output_dir: 数据集输出目录
+        batch_rows: 每批读取/写入的行数，决定内存占用上限
+        brand: 只导出该品牌
+
+    Returns:
+        int: 导出的产品数量
+    """
+    writers: Dict[str, pq.ParquetWriter] = {}
+    exported = 0
+    completed = False
+    try:
+        for rows in iter_row_batches(catalog, batch_rows, brand):
+            by_brand: Dict[str, List[Dict]] = {}
+            for row in rows:
+                by_brand.setdefault(row.pop('brand') or DEFAULT_PARTITION, []).append(row)
+            for partition, partition_rows in by_brand.items():
+                writer = writers.get(partition)
+                if writer is None:
+                    partition_dir = os.path.join(output_dir, f'brand={partition}')
+                    os.makedirs(partition_dir, exist_ok=True)
+                    writer = writers[partition] = pq.ParquetWriter(
+                        os.path.join(partition_dir, PART_FILE + '.tmp'), FILE_SCHEMA, compression='zstd')
+                writer.write_batch(pa.RecordBatch.from_pylist(partition_rows, schema=FILE_SCHEMA))
+            exported += len(rows)
+        completed = True
+    finally:
+        for writer in writers.values():
+            writer.close()
+        if not completed:
+            for partition in writers:
+                temp_path = os.path.join(output_dir, f'brand={partition}', PART_FILE + '.tmp')
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+    # 写完后替换：分区中的旧文件换成新文件
+    for partition in writers:
+        partition_dir = os.path.join(output_dir, f'brand={partition}')
+        for name in os.listdir(partition_dir):
+            if name.endswith('.parquet'):
+                os.remove(os.path.join(partition_dir, name))
+        os.replace(os.path.join(partition_dir, PART_FILE + '.tmp'), os.path.join(partition_dir, PART_FILE))
+
+    # 全量导出时删除不再有产品的品牌分区
+    if brand is None and os.path.isdir(output_dir):
+        for name in os.listdir(output_dir):
+            if name.startswith('brand=') and name[len('brand='):] not in writers:
+                shutil.rmtree(os.path.join(output_dir, name))
+
+    print(f"✅ 已导出 {exported} 个产品到 Parquet 数据集: {output_dir}（{len(writers)} 个品牌分区）")
+    return exported
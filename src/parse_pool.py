@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析进程池模块
+将详情页HTML交给子进程中的 DataExtractor 解析，抓取线程/协程不再被CPU密集的解析阻塞；
+并统计流水线各阶段的排队深度
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from config import PARSE_WORKERS, PARSER_BACKEND
+from data_extractor import DataExtractor, create_data_extractor
+
+# 子进程内的提取器（由 _init_worker 创建，每个进程一个）
+_worker_extractor: Optional[DataExtractor] = None
+
+
+def _init_worker(backend: str):
+    """子进程初始化：创建提取器，并静默提取过程的逐项日志"""
+    global _worker_extractor
+    _worker_extractor = create_data_extractor(backend)
+    sys.stdout = open(os.devnull, 'w')
+
+
+def _extract_detail(body: bytes) -> Dict[str, Any]:
+    """在子进程中解析详情页，返回 extract_product_details() 的字段字典"""
+    html = body.decode('utf-8', errors='replace')
+    return _worker_extractor.extract_product_details(_worker_extractor.parse(html))
+
+
+class ParsePool:
+    """
+    详情页解析进程池
+    
+    输入为原始HTML字节，输出为与 ProductDetails 字段对应的普通字典
+    （name、product_info、article_content、product_tag、series、image_links）。
+    """
+    
+    def __init__(self, workers: int = PARSE_WORKERS, backend: str = PARSER_BACKEND):
+        """
+        初始化解析进程池
+        
+        Args:
+            workers: 进程数，默认等于CPU核数
+            backend: 子进程使用的解析后端
+        """
+        self.workers = max(1, workers)
+        self.backend = backend
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(backend,)
+        )
+        print(f"🧩 解析进程池已启动: {self.workers} 个进程（{backend}）")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def submit(self, body: bytes) -> Future:
+        """提交一个详情页，返回结果为字段字典的 Future"""
+        return self._executor.submit(_extract_detail, body)
+    
+    def extract_detail(self, body: bytes) -> Dict[str, Any]:
+        """提交并等待解析结果"""
+        return self.submit(body).result()
+    
+    async def extract_detail_async(self, body: bytes) -> Dict[str, Any]:
+        """提交并异步等待解析结果，不阻塞事件循环"""
+        return await asyncio.wrap_future(self.submit(body))
+    
+    def close(self):
+        """关闭进程池（等待已提交的任务完成）"""
+        self._executor.shutdown(wait=True)
+
+
+class PipelineStats:
+    """
+    流水线各阶段的排队深度统计
+    
+    深度为某一时刻处于该阶段（排队或执行中）的任务数，记录峰值与按时间加权的平均值。
+    """
+    
+    STAGE_LABELS = {'fetch': '抓取', 'parse': '解析', 'images': '图片'}
+    
+    def __init__(self, stages: Iterable[str] = ('fetch', 'parse', 'images')):
+        self._lock = threading.Lock()
+        self._stages = list(stages)
+        self._start = time.monotonic()
+        self._last = self._start
+        self._depth = {stage: 0 for stage in self._stages}
+        self._peak = {stage: 0 for stage in self._stages}
+        self._area = {stage: 0.0 for stage in self._stages}
+        self._completed = {stage: 0 for stage in self._stages}
+    
+    def _advance(self, now: float):
+        """累计上次变化以来各阶段的 深度×时间"""
+        elapsed = now - self._last
+        for stage, depth in self._depth.items():
+            self._area[stage] += depth * elapsed
+        self._last = now
+    
+    def enter(self, stage: str):
+        with self._lock:
+            self._advance(time.monotonic())
+            self._depth[stage] += 1
+            self._peak[stage] = max(self._peak[stage], self._depth[stage])
+    
+    def leave(self, stage: str):
+        with self._lock:
+            self._advance(time.monotonic())
+            self._depth[stage] -= 1
+            self._completed[stage] += 1
+    
+    @contextmanager
+    def track(self, stage: str) -> Iterator[None]:
+        """在 with 块内将一个任务计入指定阶段"""
+        self.enter(stage)
+        try:
+            yield
+        finally:
+            self.leave(stage)
+    
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        获取各阶段统计
+        
+        Returns:
+            Dict[str, Dict[str, float]]: 阶段 -> {depth, peak, avg, completed}
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._advance(now)
+            total = max(now - self._start, 1e-9)
+            return {
+                stage: {
+                    'depth': self._depth[stage],
+                    'peak': self._peak[stage],
+                    'avg': self._area[stage] / total,
+                    'completed': self._completed[stage],
+                }
+                for stage in self._stages
+            }
+    
+    def report(self) -> str:
+        """格式化各阶段队列深度，用于日志输出"""
+        parts = []
+        for stage, stats in self.snapshot().items():
+            label = self.STAGE_LABELS.get(stage, stage)
+            parts.append(f"{label} 当前 {stats['depth']} / 峰值 {stats['peak']} / 平均 {stats['avg']:.1f}（完成 {stats['completed']}）")
+        return "，".join(parts)
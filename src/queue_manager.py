@@ -2,22 +2,232 @@
 # -*- coding: utf-8 -*-
 """
 队列管理模块
-管理待处理队列和失败队列
+管理待处理队列和失败队列：QueueBackend 定义队列接口，QueueManager 为默认的SQLite实现，
+RedisQueueManager（redis_queue.py）可让多台机器共用一个队列
 """
 
+import abc
 import sqlite3
-import json
 import os
-from datetime import datetime
-from typing import List, Dict, Optional
+import re
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+
+from config import (
+    QUEUE_DB_SYNCHRONOUS, QUEUE_DB_BUSY_TIMEOUT, QUEUE_FLUSH_ITEMS, QUEUE_FLUSH_INTERVAL_MS,
+    QUEUE_LEASE_SECONDS, FAILED_RETRY_BASE_SECONDS, FAILED_RETRY_MAX_SECONDS, PERMANENT_ERROR_STATUS_CODES,
+    QUEUE_BACKEND, QUEUE_BACKENDS, Config
+)
 from models import ProductLink
 
+# 失败队列读取的列（顺序与 QueueManager._failed_row 一致）
+FAILED_COLUMNS = 'id, url, product_name, error_message, retry_count, created_at, last_retry_at, permanent, next_attempt_at'
+
+# SQLite 行ID的上限，倒序分页首页的起点
+MAX_ROWID = 2 ** 63 - 1
+
+# 错误信息中的HTTP状态码（爬虫记录失败原因时写成 "HTTP 404: ..."）
+HTTP_STATUS_PATTERN = re.compile(r'\bHTTP (\d{3})\b')
+# 不会因重试而改变的失败原因
+PERMANENT_ERROR_MARKERS = ('不支持的URL格式',)
+
+# 写入失败队列：同一URL只保留一条，再次失败时累加重试次数并按指数退避推迟下次重试。
+# 参数依次为 url, product_name, error_message, permanent, 当前时间, 退避基数, 退避上限；
+# 永久失败的 next_attempt_at 为空，不会被 get_due_failed 取出
+UPSERT_FAILED_SQL = '''
+    INSERT INTO failed_queue (url, product_name, error_message, retry_count, permanent, next_attempt_at)
+    VALUES (?1, ?2, ?3, 1, ?4, CASE WHEN ?4 THEN NULL ELSE ?5 + MIN(?6, ?7) END)
+    ON CONFLICT(url) DO UPDATE SET
+        product_name = COALESCE(excluded.product_name, product_name),
+        error_message = excluded.error_message,
+        retry_count = retry_count + 1,
+        last_retry_at = CURRENT_TIMESTAMP,
+        permanent = excluded.permanent,
+        next_attempt_at = CASE WHEN excluded.permanent THEN NULL
+                               ELSE ?5 + MIN(?6 << MIN(retry_count, 20), ?7) END
+'''
+
+
+def is_permanent_error(error_message: Optional[str]) -> bool:
+    """
+    判断失败是否为永久性的（页面不存在、URL不受支持等，重试也不会成功）
+
+    超时、连接错误、限流（429/503）等其余失败都视为暂时性的
+    """
+    if not error_message:
+        return False
+    match = HTTP_STATUS_PATTERN.search(error_message)
+    if match and int(match.group(1)) in PERMANENT_ERROR_STATUS_CODES:
+        return True
+    return any(marker in error_message for marker in PERMANENT_ERROR_MARKERS)
+
+
+def failed_retry_delay(retry_count: int) -> float:
+    """第 retry_count 次失败后距下次重试的等待秒数（与 UPSERT_FAILED_SQL 中的计算一致）"""
+    return min(FAILED_RETRY_BASE_SECONDS * 2 ** min(retry_count - 1, 20), FAILED_RETRY_MAX_SECONDS)
+
+
+class QueueBackend(abc.ABC):
+    """
+    队列接口：待处理队列（带租约的领取）与失败队列（按URL去重、指数退避重试）
+
+    产品记录的字段为 id（按加入顺序递增）、url、product_name、page_number、created_at；
+    失败记录的字段见 QueueManager._failed_row。子类须实现全部抽象方法（缺少时无法实例化），
+    其余方法基于它们实现。
+    """
+
+    worker_id: str
+    lease_seconds: float
+
+    @abc.abstractmethod
+    def add_to_pending_queue(self, product_links: List[ProductLink], page_number: int = 0) -> int:
+        """添加产品链接到待处理队列（已存在的URL忽略），返回新增数量"""
+
+    @abc.abstractmethod
+    def get_pending_page(self, after_id: int = 0, limit: int = 20, status: str = 'pending') -> List[Dict]:
+        """按ID分页读取待处理队列中指定状态的产品（从 after_id 之后取 limit 个）"""
+
+    @abc.abstractmethod
+    def claim_pending_products(self, limit: int = 10) -> List[Dict]:
+        """原子地领取待处理产品（含租约到期的处理中产品），按加入队列的顺序返回"""
+
+    @abc.abstractmethod
+    def renew_leases(self, queue_ids: Iterable[int]) -> int:
+        """延长本进程所领取产品的租约，返回成功续约的数量"""
+
+    @abc.abstractmethod
+    def mark_many_processing(self, queue_ids: Iterable[int]):
+        """批量标记为处理中（由本进程持有租约）"""
+
+    @abc.abstractmethod
+    def apply_status_changes(self, completed_ids: List[int], failed_items: List[Tuple[str, str, str]]):
+        """一次写入一批状态变更：completed_ids 标记为已完成，failed_items 加入失败队列"""
 
-class QueueManager:
-    """队列管理器"""
+    @abc.abstractmethod
+    def get_queue_stats(self) -> Dict:
+        """获取队列统计信息：pending / processing / completed / failed 的数量"""
+
+    @abc.abstractmethod
+    def reset_processing_to_pending(self) -> int:
+        """重置租约到期的处理中任务为待处理状态，返回重置数量"""
+
+    @abc.abstractmethod
+    def clear_completed(self) -> int:
+        """清理已完成的项目，返回清理数量"""
+
+    @abc.abstractmethod
+    def get_failed_page(self, after_id: Optional[int] = None, limit: int = 50,
+                        newest_first: bool = False) -> List[Dict]:
+        """按ID分页读取失败队列"""
+
+    @abc.abstractmethod
+    def get_due_failed(self, limit: int = 50) -> List[Dict]:
+        """获取已到重试时间的失败产品（不含永久失败），最早到期的在前"""
+
+    @abc.abstractmethod
+    def increment_failed_retry(self, failed_id: int, error_message: Optional[str] = None):
+        """失败记录重试计数+1，按指数退避推迟下次重试"""
+
+    @abc.abstractmethod
+    def remove_failed(self, failed_id: int):
+        """从失败队列删除记录（重试成功后调用）"""
+
+    @abc.abstractmethod
+    def clear_failed(self) -> int:
+        """清空失败队列，返回删除数量"""
+
+    def close(self):
+        """释放连接"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get_pending_products(self, limit: int = 10) -> List[Dict]:
+        """获取待处理的产品（按加入队列的顺序）"""
+        return self.get_pending_page(limit=limit)
+
+    def mark_as_processing(self, queue_id: int):
+        """标记为处理中（由本进程持有租约）"""
+        self.mark_many_processing([queue_id])
+
+    def mark_as_completed(self, queue_id: int):
+        """标记为已完成"""
+        self.mark_many_completed([queue_id])
+
+    def mark_many_completed(self, queue_ids: Iterable[int]):
+        """批量标记为已完成（一个事务）"""
+        self.apply_status_changes(list(queue_ids), [])
     
-    def __init__(self, db_path: str = "database/bandai_hobby.db"):
+    def add_many_failed(self, items: Iterable[Tuple[str, str, str]]):
+        """
+        批量添加失败的产品到失败队列（一个事务）
+        
+        Args:
+            items: (url, product_name, error_message) 列表
+        """
+        self.apply_status_changes([], list(items))
+    
+    def add_to_failed_queue(self, url: str, product_name: str, error_message: str):
+        """添加失败的产品到失败队列（URL已在队列中时累加重试次数并推迟下次重试）"""
+        self.apply_status_changes([], [(url, product_name, error_message)])
+
+        print(f"❌ 已添加失败产品到失败队列: {product_name}")
+
+    def get_failed_products(self, limit: int = 50) -> List[Dict]:
+        """获取失败队列的产品列表（按加入顺序）"""
+        return self.get_failed_page(limit=limit)
+
+    def write_buffer(self, max_items: int = QUEUE_FLUSH_ITEMS, interval_ms: float = QUEUE_FLUSH_INTERVAL_MS,
+                     before_flush: Optional[Callable[[], None]] = None) -> 'QueueWriteBuffer':
+        """
+        创建写缓冲：状态变更攒够 max_items 条或最早一条等待 interval_ms 毫秒后一次性提交
+
+        before_flush 在每次提交状态之前调用（如先提交产品目录库，保证标记为已完成的产品详情已落盘）
+        """
+        return QueueWriteBuffer(self, max_items, interval_ms, before_flush)
+
+
+def create_queue_manager(backend: str = QUEUE_BACKEND, **kwargs) -> QueueBackend:
+    """
+    按名称创建队列
+
+    Args:
+        backend: 队列后端，'sqlite'（默认，本地数据库文件）或 'redis'（多台机器共用）
+        **kwargs: 传给对应实现的参数（如 db_path、redis_url、worker_id）
+
+    Returns:
+        QueueBackend: 对应后端的队列
+    """
+    if backend == 'sqlite':
+        kwargs.setdefault('db_path', Config.DATABASE_PATH)
+        return QueueManager(**kwargs)
+    if backend == 'redis':
+        from redis_queue import RedisQueueManager
+        return RedisQueueManager(**kwargs)
+    raise ValueError(f"未知的队列后端: {backend}（可选: {', '.join(QUEUE_BACKENDS)}）")
+
+
+class QueueManager(QueueBackend):
+    """
+    队列管理器（SQLite实现）
+
+    多个爬虫进程可共用同一个数据库：claim_pending_products 原子地领取产品并附带租约，
+    租约到期仍未完成的产品（进程崩溃或卡住）会被其他进程重新领取。
+    """
+
+    def __init__(self, db_path: str = "database/bandai_hobby.db", worker_id: Optional[str] = None,
+                 lease_seconds: float = QUEUE_LEASE_SECONDS):
         self.db_path = db_path
+        # 领取产品时记录的工作进程标识与租约时长
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
         # 确保数据库目录存在
         try:
             db_dir = os.path.dirname(self.db_path)
@@ -25,13 +235,100 @@ class QueueManager:
                 os.makedirs(db_dir, exist_ok=True)
         except Exception as e:
             print(f"创建数据库目录失败: {e}")
+        
+        # 整个生命周期共用一个连接（各线程通过锁串行使用），语句按SQL文本缓存在连接上重复使用
+        self._lock = threading.RLock()
+        self._conn = self._connect()
         self.init_queues()
     
+    def _connect(self) -> sqlite3.Connection:
+        """打开队列数据库连接：WAL 日志模式，读写互不阻塞"""
+        conn = sqlite3.connect(self.db_path, timeout=QUEUE_DB_BUSY_TIMEOUT, check_same_thread=False,
+                               cached_statements=64)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={QUEUE_DB_SYNCHRONOUS}')
+        return conn
+    
+    @contextmanager
+    def _transaction(self, immediate: bool = False) -> Iterator[sqlite3.Cursor]:
+        """
+        在共享连接上执行一个事务：正常结束时提交，出错时回滚
+
+        immediate 为True时事务开始即取得写锁，先读后写的操作不会与其他进程交错
+        """
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                if immediate:
+                    cursor.execute('BEGIN IMMEDIATE')
+                yield cursor
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            finally:
+                cursor.close()
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+    
     def init_queues(self):
-        """初始化队列表"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        """初始化队列表，并按顺序执行尚未执行的结构迁移（已执行到的版本记录在 PRAGMA user_version）"""
+        migrations = [self._add_lease_columns, self._add_indexes, self._dedupe_failed_queue]
+        with self._transaction(immediate=True) as cursor:
+            self._create_tables(cursor)
+            cursor.execute('PRAGMA user_version')
+            version = cursor.fetchone()[0]
+            for target, migrate in enumerate(migrations, 1):
+                if version < target:
+                    print(f"队列数据库结构迁移 v{target}: {migrate.__doc__}")
+                    migrate(cursor)
+            if version < len(migrations):
+                cursor.execute(f'PRAGMA user_version = {len(migrations)}')
+
+    def _add_lease_columns(self, cursor: sqlite3.Cursor):
+        """为待处理队列补充租约列"""
+        cursor.execute('PRAGMA table_info(pending_queue)')
+        columns = {row[1] for row in cursor.fetchall()}
+        if 'worker_id' not in columns:
+            cursor.execute('ALTER TABLE pending_queue ADD COLUMN worker_id TEXT')
+        if 'lease_expires_at' not in columns:
+            cursor.execute('ALTER TABLE pending_queue ADD COLUMN lease_expires_at REAL')
+
+    def _add_indexes(self, cursor: sqlite3.Cursor):
+        """为队列表建立索引"""
+        # 按状态取数（领取、分页、统计）只需在索引中定位；同一状态内按 id（即加入顺序）有序，无需排序
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pending_queue_status ON pending_queue (status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_failed_queue_url ON failed_queue (url)')
+
+    def _dedupe_failed_queue(self, cursor: sqlite3.Cursor):
+        """失败队列按URL去重，并补充重试调度列"""
+        cursor.execute('PRAGMA table_info(failed_queue)')
+        columns = {row[1] for row in cursor.fetchall()}
+        if 'permanent' not in columns:
+            cursor.execute('ALTER TABLE failed_queue ADD COLUMN permanent INTEGER NOT NULL DEFAULT 0')
+        if 'next_attempt_at' not in columns:
+            cursor.execute('ALTER TABLE failed_queue ADD COLUMN next_attempt_at REAL')
+        # 同一URL保留最新的一条，重试次数累加
+        cursor.execute('''
+            UPDATE failed_queue
+            SET retry_count = (SELECT SUM(retry_count) FROM failed_queue AS f WHERE f.url = failed_queue.url)
+            WHERE id IN (SELECT MAX(id) FROM failed_queue GROUP BY url HAVING COUNT(*) > 1)
+        ''')
+        cursor.execute('DELETE FROM failed_queue WHERE id NOT IN (SELECT MAX(id) FROM failed_queue GROUP BY url)')
+        # 旧记录没有调度信息，立即到期
+        cursor.execute('UPDATE failed_queue SET next_attempt_at = 0 WHERE next_attempt_at IS NULL AND permanent = 0')
+        cursor.execute('DROP INDEX IF EXISTS idx_failed_queue_url')
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_failed_queue_url ON failed_queue (url)')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_failed_queue_due ON failed_queue (next_attempt_at)
+            WHERE permanent = 0
+        ''')
+
+    def _create_tables(self, cursor: sqlite3.Cursor):
+        """创建待处理队列与失败队列表"""
         # 待处理队列表
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS pending_queue (
@@ -40,7 +337,9 @@ class QueueManager:
                 product_name TEXT,
                 page_number INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status TEXT DEFAULT 'pending'
+                status TEXT DEFAULT 'pending',
+                worker_id TEXT,
+                lease_expires_at REAL
             )
         ''')
         
@@ -53,51 +352,49 @@ class QueueManager:
                 error_message TEXT,
                 retry_count INTEGER DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_retry_at TIMESTAMP
+                last_retry_at TIMESTAMP,
+                permanent INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL
             )
         ''')
-        
-        conn.commit()
-        conn.close()
     
     def add_to_pending_queue(self, product_links: List[ProductLink], page_number: int = 0):
-        """添加产品链接到待处理队列"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        added_count = 0
-        for link in product_links:
-            try:
-                # 不再依据 products 表过滤；是否执行详情由下游逻辑决定
-                cursor.execute('''
-                    INSERT OR IGNORE INTO pending_queue (url, product_name, page_number)
-                    VALUES (?, ?, ?)
-                ''', (link.href, link.text, page_number))
-                if cursor.rowcount > 0:
-                    added_count += 1
-            except Exception as e:
-                print(f"添加链接到待处理队列失败: {link.href} - {e}")
+        """添加产品链接到待处理队列（一条语句批量插入，已存在的URL忽略）"""
+        with self._transaction() as cursor:
+            # 不再依据 products 表过滤；是否执行详情由下游逻辑决定
+            cursor.executemany('''
+                INSERT OR IGNORE INTO pending_queue (url, product_name, page_number)
+                VALUES (?, ?, ?)
+            ''', [(link.href, link.text, page_number) for link in product_links])
+            added_count = max(cursor.rowcount, 0)
         
-        conn.commit()
-        conn.close()
         print(f"✅ 已添加 {added_count} 个产品到待处理队列")
         return added_count
     
-    def get_pending_products(self, limit: int = 10) -> List[Dict]:
-        """获取待处理的产品"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, url, product_name, page_number, created_at
-            FROM pending_queue 
-            WHERE status = 'pending'
-            ORDER BY created_at
-            LIMIT ?
-        ''', (limit,))
+    def get_pending_page(self, after_id: int = 0, limit: int = 20, status: str = 'pending') -> List[Dict]:
+        """
+        按ID分页（keyset）读取待处理队列：从 after_id 之后取 limit 个，耗时与翻到第几页无关
+
+        Args:
+            after_id: 上一页最后一项的ID，首页为0
+            limit: 每页数量
+            status: 队列状态（pending / processing / completed）
+
+        Returns:
+            List[Dict]: 产品列表，按ID（即加入队列的顺序）排列
+        """
+        with self._transaction() as cursor:
+            cursor.execute('''
+                SELECT id, url, product_name, page_number, created_at
+                FROM pending_queue
+                WHERE status = ? AND id > ?
+                ORDER BY id
+                LIMIT ?
+            ''', (status, after_id, limit))
+            rows = cursor.fetchall()
         
         products = []
-        for row in cursor.fetchall():
+        for row in rows:
             products.append({
                 'id': row[0],
                 'url': row[1],
@@ -106,69 +403,109 @@ class QueueManager:
                 'created_at': row[4]
             })
         
-        conn.close()
         return products
     
-    def mark_as_processing(self, queue_id: int):
-        """标记为处理中"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE pending_queue 
-            SET status = 'processing'
-            WHERE id = ?
-        ''', (queue_id,))
-        
-        conn.commit()
-        conn.close()
+    def claim_pending_products(self, limit: int = 10) -> List[Dict]:
+        """
+        原子地领取待处理产品：标记为处理中并记录本进程的工作标识与租约到期时间
+
+        租约已到期的处理中产品视同待处理，一并参与领取。多个进程同时调用时不会领到同一产品。
+
+        Args:
+            limit: 最多领取的数量
+
+        Returns:
+            List[Dict]: 领取到的产品（字段同 get_pending_products），按加入队列的顺序排列
+        """
+        now = time.time()
+        with self._transaction(immediate=True) as cursor:
+            # 两部分分别走状态索引：待处理的只取前 limit 个，处理中的只有各进程手上的少量任务
+            cursor.execute('''
+                UPDATE pending_queue
+                SET status = 'processing', worker_id = ?, lease_expires_at = ?
+                WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id FROM pending_queue
+                        WHERE status = 'processing' AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+                        UNION ALL
+                        SELECT id FROM (
+                            SELECT id FROM pending_queue WHERE status = 'pending' ORDER BY id LIMIT ?
+                        )
+                    )
+                    ORDER BY id
+                    LIMIT ?
+                )
+                RETURNING id, url, product_name, page_number, created_at
+            ''', (self.worker_id, now + self.lease_seconds, now, limit, limit))
+            rows = cursor.fetchall()
+
+        rows.sort(key=lambda row: row[0])
+        return [
+            {'id': row[0], 'url': row[1], 'product_name': row[2], 'page_number': row[3], 'created_at': row[4]}
+            for row in rows
+        ]
+
+    def renew_leases(self, queue_ids: Iterable[int]) -> int:
+        """
+        延长本进程所领取产品的租约（处理耗时可能超过租约时长时定期调用）
+
+        Returns:
+            int: 成功续约的数量（已被其他进程重新领取的不计）
+        """
+        with self._transaction() as cursor:
+            cursor.executemany('''
+                UPDATE pending_queue SET lease_expires_at = ?
+                WHERE id = ? AND status = 'processing' AND worker_id = ?
+            ''', [(time.time() + self.lease_seconds, queue_id, self.worker_id) for queue_id in queue_ids])
+            return max(cursor.rowcount, 0)
+
+    def mark_many_processing(self, queue_ids: Iterable[int]):
+        """批量标记为处理中（一个事务，由本进程持有租约）"""
+        lease_expires_at = time.time() + self.lease_seconds
+        with self._transaction() as cursor:
+            cursor.executemany('''
+                UPDATE pending_queue SET status = 'processing', worker_id = ?, lease_expires_at = ?
+                WHERE id = ?
+            ''', [(self.worker_id, lease_expires_at, queue_id) for queue_id in queue_ids])
     
-    def mark_as_completed(self, queue_id: int):
-        """标记为已完成"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def apply_status_changes(self, completed_ids: List[int], failed_items: List[Tuple[str, str, str]]):
+        """
+        在一个事务中写入一批状态变更
         
-        cursor.execute('''
-            UPDATE pending_queue 
-            SET status = 'completed'
-            WHERE id = ?
-        ''', (queue_id,))
-        
-        conn.commit()
-        conn.close()
+        Args:
+            completed_ids: 标记为已完成的队列ID
+            failed_items: 加入失败队列的 (url, product_name, error_message)
+        """
+        with self._transaction() as cursor:
+            self._upsert_failed(cursor, failed_items)
+            cursor.executemany('''
+                UPDATE pending_queue SET status = 'completed', worker_id = NULL, lease_expires_at = NULL
+                WHERE id = ?
+            ''', [(queue_id,) for queue_id in completed_ids])
     
-    def add_to_failed_queue(self, url: str, product_name: str, error_message: str):
-        """添加失败的产品到失败队列"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO failed_queue (url, product_name, error_message, retry_count)
-            VALUES (?, ?, ?, 1)
-        ''', (url, product_name, error_message))
-        
-        conn.commit()
-        conn.close()
-        print(f"❌ 已添加失败产品到失败队列: {product_name}")
+    def _upsert_failed(self, cursor: sqlite3.Cursor, items: Iterable[Tuple[str, str, str]]):
+        """按URL写入失败记录：分类永久/暂时失败，并计算下次重试时间"""
+        now = time.time()
+        cursor.executemany(UPSERT_FAILED_SQL, [
+            (url, product_name, error_message, is_permanent_error(error_message),
+             now, FAILED_RETRY_BASE_SECONDS, FAILED_RETRY_MAX_SECONDS)
+            for url, product_name, error_message in items
+        ])
     
     def get_queue_stats(self) -> Dict:
         """获取队列统计信息"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 待处理队列统计
-        cursor.execute('''
-            SELECT status, COUNT(*) 
-            FROM pending_queue 
-            GROUP BY status
-        ''')
-        pending_stats = dict(cursor.fetchall())
-        
-        # 失败队列统计
-        cursor.execute('SELECT COUNT(*) FROM failed_queue')
-        failed_count = cursor.fetchone()[0]
-        
-        conn.close()
+        with self._transaction() as cursor:
+            # 待处理队列统计
+            cursor.execute('''
+                SELECT status, COUNT(*) 
+                FROM pending_queue 
+                GROUP BY status
+            ''')
+            pending_stats = dict(cursor.fetchall())
+            
+            # 失败队列统计
+            cursor.execute('SELECT COUNT(*) FROM failed_queue')
+            failed_count = cursor.fetchone()[0]
         
         return {
             'pending': pending_stats.get('pending', 0),
@@ -178,84 +515,221 @@ class QueueManager:
         }
     
     def reset_processing_to_pending(self):
-        """重置所有处理中的任务为待处理状态"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 查找处理中的任务数量
-        cursor.execute('SELECT COUNT(*) FROM pending_queue WHERE status = "processing"')
-        processing_count = cursor.fetchone()[0]
-        
-        if processing_count > 0:
-            print(f"发现 {processing_count} 个处理中的任务，重置为待处理状态")
+        """
+        重置失去租约的处理中任务为待处理状态
+
+        只重置租约已到期或没有租约（旧版本遗留）的任务，其他进程正在处理的任务保持不变
+        """
+        with self._transaction(immediate=True) as cursor:
             cursor.execute('''
-                UPDATE pending_queue 
-                SET status = 'pending'
-                WHERE status = 'processing'
-            ''')
-            conn.commit()
-            print(f"✅ 已重置 {processing_count} 个任务为待处理状态")
+                UPDATE pending_queue
+                SET status = 'pending', worker_id = NULL, lease_expires_at = NULL
+                WHERE status = 'processing' AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+            ''', (time.time(),))
+            processing_count = cursor.rowcount
+            cursor.execute("SELECT COUNT(*) FROM pending_queue WHERE status = 'processing'")
+            active_count = cursor.fetchone()[0]
+
+        if processing_count > 0:
+            print(f"✅ 已重置 {processing_count} 个租约到期的处理中任务为待处理状态")
         else:
-            print("没有发现处理中的任务")
-        
-        conn.close()
+            print("没有发现租约到期的处理中任务")
+        if active_count:
+            print(f"其他进程正在处理 {active_count} 个任务（租约有效），保持不变")
+
         return processing_count
 
     def clear_completed(self):
         """清理已完成的项目"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM pending_queue WHERE status = "completed"')
-        deleted_count = cursor.rowcount
+        with self._transaction() as cursor:
+            cursor.execute("DELETE FROM pending_queue WHERE status = 'completed'")
+            deleted_count = cursor.rowcount
         
-        conn.commit()
-        conn.close()
         print(f"✅ 已清理 {deleted_count} 个已完成的项目")
         return deleted_count
 
-    def get_failed_products(self, limit: int = 50) -> List[Dict]:
-        """获取失败队列的产品列表"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id, url, product_name, error_message, retry_count, created_at, last_retry_at
-            FROM failed_queue
-            ORDER BY created_at
-            LIMIT ?
-        ''', (limit,))
-        rows = cursor.fetchall()
-        conn.close()
-        results: List[Dict] = []
-        for r in rows:
-            results.append({
-                'id': r[0],
-                'url': r[1],
-                'product_name': r[2],
-                'error_message': r[3],
-                'retry_count': r[4],
-                'created_at': r[5],
-                'last_retry_at': r[6],
-            })
-        return results
+    def get_failed_page(self, after_id: Optional[int] = None, limit: int = 50,
+                        newest_first: bool = False) -> List[Dict]:
+        """
+        按ID分页（keyset）读取失败队列
 
-    def increment_failed_retry(self, failed_id: int):
-        """失败记录重试计数+1并更新时间"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE failed_queue
-            SET retry_count = retry_count + 1,
-                last_retry_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (failed_id,))
-        conn.commit()
-        conn.close()
+        Args:
+            after_id: 上一页最后一项的ID，首页为None
+            limit: 每页数量
+            newest_first: 为True时从最新的记录往前翻
+
+        Returns:
+            List[Dict]: 失败记录列表
+        """
+        if newest_first:
+            condition, order = 'id < ?', 'DESC'
+            bound = after_id if after_id is not None else MAX_ROWID
+        else:
+            condition, order = 'id > ?', 'ASC'
+            bound = after_id or 0
+        with self._transaction() as cursor:
+            cursor.execute(f'''
+                SELECT {FAILED_COLUMNS}
+                FROM failed_queue
+                WHERE {condition}
+                ORDER BY id {order}
+                LIMIT ?
+            ''', (bound, limit))
+            rows = cursor.fetchall()
+        return [self._failed_row(r) for r in rows]
+
+    def get_due_failed(self, limit: int = 50) -> List[Dict]:
+        """
+        获取已到重试时间的失败产品（不含永久失败），最早到期的在前
+
+        Args:
+            limit: 最多返回的数量
+
+        Returns:
+            List[Dict]: 失败记录列表（字段同 get_failed_page）
+        """
+        with self._transaction() as cursor:
+            cursor.execute(f'''
+                SELECT {FAILED_COLUMNS}
+                FROM failed_queue
+                WHERE permanent = 0 AND next_attempt_at <= ?
+                ORDER BY next_attempt_at
+                LIMIT ?
+            ''', (time.time(), limit))
+            rows = cursor.fetchall()
+        return [self._failed_row(r) for r in rows]
+
+    def _failed_row(self, r: tuple) -> Dict:
+        return {
+            'id': r[0],
+            'url': r[1],
+            'product_name': r[2],
+            'error_message': r[3],
+            'retry_count': r[4],
+            'created_at': r[5],
+            'last_retry_at': r[6],
+            'permanent': bool(r[7]),
+            'next_attempt_at': r[8],
+        }
+
+    def increment_failed_retry(self, failed_id: int, error_message: Optional[str] = None):
+        """
+        失败记录重试计数+1并更新时间，按指数退避推迟下次重试
+
+        Args:
+            failed_id: 失败记录ID
+            error_message: 本次失败原因，传入时更新记录并重新判断是否为永久失败
+        """
+        with self._transaction() as cursor:
+            cursor.execute('''
+                UPDATE failed_queue
+                SET retry_count = retry_count + 1,
+                    last_retry_at = CURRENT_TIMESTAMP,
+                    error_message = COALESCE(?1, error_message),
+                    permanent = COALESCE(?2, permanent),
+                    next_attempt_at = CASE WHEN COALESCE(?2, permanent) THEN NULL
+                                           ELSE ?3 + MIN(?4 << MIN(retry_count, 20), ?5) END
+                WHERE id = ?6
+            ''', (error_message, None if error_message is None else is_permanent_error(error_message),
+                  time.time(), FAILED_RETRY_BASE_SECONDS, FAILED_RETRY_MAX_SECONDS, failed_id))
 
     def remove_failed(self, failed_id: int):
         """从失败队列删除记录（重试成功后调用）"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM failed_queue WHERE id = ?', (failed_id,))
-        conn.commit()
-        conn.close()
+        with self._transaction() as cursor:
+            cursor.execute('DELETE FROM failed_queue WHERE id = ?', (failed_id,))
+
+    def clear_failed(self) -> int:
+        """清空失败队列"""
+        with self._transaction() as cursor:
+            cursor.execute('DELETE FROM failed_queue')
+            return max(cursor.rowcount, 0)
+
+
+class QueueWriteBuffer:
+    """
+    队列状态的写缓冲（write-behind）：完成/失败先记在内存，
+    攒够 max_items 条或最早一条等待超过 interval_ms 毫秒时在一个事务中提交
+
+    后台线程负责按时间提交；flush() 立即提交，close()（或退出 with 块）提交剩余变更。
+    进程意外退出时未提交的变更丢失，对应产品保持处理中状态，下次启动时重新处理。
+    before_flush 在每次提交之前调用（后台线程提交时也一样），出错时本次不提交状态。
+    """
+
+    def __init__(self, queue_manager: QueueBackend, max_items: int = QUEUE_FLUSH_ITEMS,
+                 interval_ms: float = QUEUE_FLUSH_INTERVAL_MS, before_flush: Optional[Callable[[], None]] = None):
+        self.queue_manager = queue_manager
+        self.before_flush = before_flush
+        self.max_items = max(1, max_items)
+        self.interval = interval_ms / 1000
+        self.flushes = 0
+        self._completed: List[int] = []
+        self._failed: List[Tuple[str, str, str]] = []
+        self._oldest: Optional[float] = None
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="queue-write-buffer", daemon=True)
+        self._thread.start()
+
+    def complete(self, queue_id: int):
+        """记录产品处理完成"""
+        self._add(queue_id, None)
+
+    def fail(self, queue_id: int, url: str, product_name: str, error_message: str):
+        """记录产品处理失败：加入失败队列，并将其队列项标记为已完成，避免重复处理"""
+        self._add(queue_id, (url, product_name, error_message))
+
+    def _add(self, queue_id: int, failed_item: Optional[Tuple[str, str, str]]):
+        with self._condition:
+            self._completed.append(queue_id)
+            if failed_item:
+                self._failed.append(failed_item)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                self._condition.notify()
+            if len(self._completed) >= self.max_items:
+                self._flush_locked()
+
+    def flush(self):
+        """立即提交缓冲中的全部变更"""
+        with self._condition:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._completed:
+            return
+        if self.before_flush is not None:
+            self.before_flush()
+        self.queue_manager.apply_status_changes(self._completed, self._failed)
+        self._completed, self._failed, self._oldest = [], [], None
+        self.flushes += 1
+
+    def _run(self):
+        """后台线程：最早一条变更等待满 interval 后提交"""
+        with self._condition:
+            while not self._closed:
+                if self._oldest is None:
+                    self._condition.wait()
+                    continue
+                remaining = self._oldest + self.interval - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                try:
+                    self._flush_locked()
+                except Exception as e:
+                    print(f"队列状态写入失败，稍后重试: {e}")
+                    self._oldest = time.monotonic()
+
+    def close(self):
+        """提交剩余变更并停止后台线程"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应速率控制模块
+根据响应延迟与 429/503 状态码按 AIMD（加性增、乘性减）调整请求速率
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from config import (
+    ADAPTIVE_INITIAL_RATE, ADAPTIVE_MIN_RATE, ADAPTIVE_MAX_RATE,
+    ADAPTIVE_INCREASE_STEP, ADAPTIVE_DECREASE_FACTOR, ADAPTIVE_LATENCY_WINDOW,
+    ADAPTIVE_P95_RISE_FACTOR, ADAPTIVE_MAX_TIMEOUT
+)
+from rate_limiter import TokenBucket
+
+# 视为服务端限流信号的状态码
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value: 秒数或 HTTP 日期格式的 Retry-After 值
+
+    Returns:
+        float: 需要等待的秒数，无法解析时返回None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class AdaptiveRateController:
+    """AIMD 自适应速率控制器（线程安全，同步/异步均可使用）"""
+
+    def __init__(self, name: str = "html", initial_rate: float = ADAPTIVE_INITIAL_RATE,
+                 min_rate: float = ADAPTIVE_MIN_RATE, max_rate: float = ADAPTIVE_MAX_RATE,
+                 increase_step: float = ADAPTIVE_INCREASE_STEP,
+                 decrease_factor: float = ADAPTIVE_DECREASE_FACTOR,
+                 latency_window: int = ADAPTIVE_LATENCY_WINDOW,
+                 p95_rise_factor: float = ADAPTIVE_P95_RISE_FACTOR):
+        """
+        初始化速率控制器
+
+        Args:
+            name: 控制器名称（用于日志）
+            initial_rate: 初始速率（次/秒）
+            min_rate: 速率下限
+            max_rate: 速率上限
+            increase_step: 每个健康响应增加的速率
+            decrease_factor: 遇到限流信号时速率乘以的系数
+            latency_window: 计算 p95 延迟的滑动窗口大小
+            p95_rise_factor: p95 超过基线的倍数时视为延迟上升
+        """
+        self.name = name
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.p95_rise_factor = p95_rise_factor
+
+        self.bucket = TokenBucket(initial_rate, burst=1)
+        self._latencies = deque(maxlen=latency_window)
+        self._baseline_p95: Optional[float] = None
+        self._pause_until = 0.0
+        self._last_decrease_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def current_rate(self) -> float:
+        """当前请求速率（次/秒）"""
+        return self.bucket.rate
+
+    @property
+    def p95_latency(self) -> Optional[float]:
+        """滑动窗口内的 p95 延迟（秒），样本不足时返回None"""
+        with self._lock:
+            return self._p95()
+
+    def _p95(self) -> Optional[float]:
+        """计算 p95 延迟（调用方需持有锁）"""
+        if len(self._latencies) < 5:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def timeout(self, default: float) -> float:
+        """
+        根据当前 p95 延迟给出请求超时时间
+
+        Args:
+            default: 配置的默认超时（作为下限）
+
+        Returns:
+            float: 超时秒数，介于 default 与 ADAPTIVE_MAX_TIMEOUT 之间
+        """
+        p95 = self.p95_latency
+        if p95 is None:
+            return default
+        return min(max(default, p95 * 4), max(default, ADAPTIVE_MAX_TIMEOUT))
+
+    def _wait_time(self) -> float:
+        """计算发出下一个请求前需要等待的时间"""
+        pause = self._pause_until - time.monotonic()
+        return max(0.0, pause)
+
+    def before_request(self):
+        """发出请求前调用：遵守 Retry-After 暂停并按当前速率限速"""
+        pause = self._wait_time()
+        if pause > 0:
+            time.sleep(pause)
+        self.bucket.acquire()
+
+    async def before_request_async(self):
+        """before_request 的异步版本"""
+        pause = self._wait_time()
+        if pause > 0:
+            await asyncio.sleep(pause)
+        await self.bucket.acquire_async()
+
+    def record(self, latency: float, status_code: Optional[int] = None,
+               retry_after: Optional[str] = None, timed_out: bool = False):
+        """
+        记录一次请求结果并调整速率
+
+        Args:
+            latency: 请求耗时（秒）
+            status_code: 响应状态码（超时时为None）
+            retry_after: 响应中的 Retry-After 头
+            timed_out: 请求是否超时
+        """
+        with self._lock:
+            if timed_out or status_code in THROTTLE_STATUS_CODES:
+                reason = "超时" if timed_out else f"HTTP {status_code}"
+                delay = parse_retry_after(retry_after)
+                if delay:
+                    self._pause_until = max(self._pause_until, time.monotonic() + delay)
+                    print(f"⏸️ [{self.name}] 服务端要求 {delay:.1f} 秒后重试")
+                self._decrease(reason)
+                return
+
+            self._latencies.append(latency)
+            p95 = self._p95()
+            if p95 is not None and self._baseline_p95 is not None and p95 > self._baseline_p95 * self.p95_rise_factor:
+                self._decrease(f"p95延迟上升至 {p95:.2f}s")
+                return
+
+            if p95 is not None:
+                # 基线只在健康时缓慢跟随，避免被拥塞期间的延迟带偏
+                self._baseline_p95 = p95 if self._baseline_p95 is None else 0.9 * self._baseline_p95 + 0.1 * p95
+            self._set_rate(self.current_rate + self.increase_step)
+
+    def _decrease(self, reason: str):
+        """乘性降速，同一冷却期内只降一次（调用方需持有锁）"""
+        now = time.monotonic()
+        cooldown = max(1.0, self._baseline_p95 or 0.0)
+        if now - self._last_decrease_at < cooldown:
+            return
+        self._last_decrease_at = now
+        self._set_rate(self.current_rate * self.decrease_factor)
+        # 降速后重新积累延迟样本
+        self._latencies.clear()
+        print(f"⚠️ [{self.name}] {reason}，速率降至 {self.current_rate:.2f} 次/秒")
+
+    def _set_rate(self, rate: float):
+        """在上下限之间设置速率"""
+        self.bucket.set_rate(min(self.max_rate, max(self.min_rate, rate)))
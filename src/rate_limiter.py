@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+限速模块
+令牌桶限速器，可在多线程与 asyncio 中共享
+"""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """令牌桶限速器"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数（即长期平均请求速率）
+            burst: 桶容量，允许的瞬时突发请求数
+        """
+        if rate <= 0:
+            raise ValueError("rate 必须大于0")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate: float):
+        """调整补充速率（已累积的令牌保持不变）"""
+        if rate <= 0:
+            raise ValueError("rate 必须大于0")
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+    def _refill(self, now: float):
+        """按经过的时间补充令牌（调用方需持有锁）"""
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+    def reserve(self) -> float:
+        """
+        预订一个令牌
+
+        Returns:
+            float: 调用方在发出请求前需要等待的秒数（0 表示立即可用）
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """阻塞直到获得一个令牌"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """异步等待直到获得一个令牌"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Redis 队列后端（需安装 redis）
+多台机器上的爬虫进程连接同一个 Redis 即可共用队列；行为与 SQLite 实现（QueueManager）一致
+
+键（均以 prefix 开头）:
+  {prefix}:next_id                     产品ID计数
+  {prefix}:urls                        URL -> 产品ID（去重）
+  {prefix}:item:{id}                   产品记录（url / product_name / page_number / created_at / worker_id）
+  {prefix}:pending|processing|completed  各状态的产品ID有序集合（分值为ID，即加入顺序）
+  {prefix}:leases                      处理中产品的租约到期时间
+  {prefix}:failed:next_id / :urls / :item:{id} / :ids   失败队列（按URL去重）
+  {prefix}:failed:due                  暂时失败的下次重试时间（永久失败不在其中）
+
+读-改-写的操作都在 WATCH/MULTI 事务中执行：期间相关键被其他进程修改时整体重试，
+多个进程同时领取不会领到同一产品。
+"""
+
+import os
+import socket
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import redis
+
+from config import REDIS_URL, REDIS_QUEUE_PREFIX, QUEUE_LEASE_SECONDS
+from models import ProductLink
+from queue_manager import QueueBackend, failed_retry_delay, is_permanent_error
+
+# 产品状态（各对应一个有序集合）
+STATUSES = ('pending', 'processing', 'completed')
+# 清理时每批处理的记录数
+CLEAR_CHUNK_SIZE = 1000
+
+
+def utc_timestamp() -> str:
+    """与 SQLite CURRENT_TIMESTAMP 格式相同的UTC时间"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+
+
+class RedisQueueManager(QueueBackend):
+    """基于 Redis 的队列管理器"""
+
+    def __init__(self, redis_url: str = REDIS_URL, prefix: str = REDIS_QUEUE_PREFIX,
+                 worker_id: Optional[str] = None, lease_seconds: float = QUEUE_LEASE_SECONDS,
+                 client: Optional[redis.Redis] = None):
+        """
+        初始化Redis队列
+
+        Args:
+            redis_url: Redis 连接地址
+            prefix: 键名前缀，不同前缀的队列互不影响
+            worker_id: 领取产品时记录的工作进程标识，默认由主机名、进程号生成
+            lease_seconds: 领取产品的租约时长（秒）
+            client: 已创建的客户端（需 decode_responses=True），传入时忽略 redis_url
+        """
+        self.redis = client or redis.Redis.from_url(redis_url, decode_responses=True)
+        self.prefix = prefix
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+
+    def _key(self, *parts) -> str:
+        return ':'.join((self.prefix,) + tuple(str(part) for part in parts))
+
+    def close(self):
+        """关闭连接"""
+        self.redis.close()
+
+    def _product(self, queue_id: int, data: Dict[str, str]) -> Dict:
+        return {
+            'id': queue_id,
+            'url': data.get('url'),
+            'product_name': data.get('product_name'),
+            'page_number': int(data['page_number']) if data.get('page_number') else None,
+            'created_at': data.get('created_at'),
+        }
+
+    def _load_products(self, queue_ids: List[int]) -> List[Dict]:
+        """按ID读取产品记录（保持给定顺序，已被删除的跳过）"""
+        pipe = self.redis.pipeline(transaction=False)
+        for queue_id in queue_ids:
+            pipe.hgetall(self._key('item', queue_id))
+        return [self._product(queue_id, data) for queue_id, data in zip(queue_ids, pipe.execute()) if data]
+
+    def add_to_pending_queue(self, product_links: List[ProductLink], page_number: int = 0) -> int:
+        """添加产品链接到待处理队列（一个事务，已存在的URL忽略）"""
+        # 没有链接的卡片无法入队（SQLite 实现同样忽略），在事务前滤掉，避免整页写入失败
+        links = list({link.href: link for link in product_links if link.href}.values())
+        if not links:
+            print("✅ 已添加 0 个产品到待处理队列")
+            return 0
+        urls_key, next_id_key = self._key('urls'), self._key('next_id')
+
+        def add(pipe) -> int:
+            existing = pipe.hmget(urls_key, [link.href for link in links])
+            new_links = [link for link, queue_id in zip(links, existing) if queue_id is None]
+            next_id = int(pipe.get(next_id_key) or 0)
+            created_at = utc_timestamp()
+            pipe.multi()
+            for offset, link in enumerate(new_links, 1):
+                queue_id = next_id + offset
+                item = {'url': link.href, 'page_number': page_number, 'created_at': created_at}
+                if link.text is not None:
+                    item['product_name'] = link.text
+                pipe.hset(self._key('item', queue_id), mapping=item)
+                pipe.hset(urls_key, link.href, queue_id)
+                pipe.zadd(self._key('pending'), {queue_id: queue_id})
+            pipe.set(next_id_key, next_id + len(new_links))
+            return len(new_links)
+
+        added_count = self.redis.transaction(add, urls_key, next_id_key, value_from_callable=True)
+        print(f"✅ 已添加 {added_count} 个产品到待处理队列")
+        return added_count
+
+    def get_pending_page(self, after_id: int = 0, limit: int = 20, status: str = 'pending') -> List[Dict]:
+        """按ID分页读取指定状态的产品（从 after_id 之后取 limit 个）"""
+        if status not in STATUSES:
+            raise ValueError(f"未知的队列状态: {status}（可选: {', '.join(STATUSES)}）")
+        queue_ids = self.redis.zrangebyscore(self._key(status), f'({after_id}', '+inf', start=0, num=limit)
+        return self._load_products([int(queue_id) for queue_id in queue_ids])
+
+    def claim_pending_products(self, limit: int = 10) -> List[Dict]:
+        """
+        原子地领取待处理产品：移入处理中并记录本进程的工作标识与租约到期时间
+
+        租约已到期的处理中产品优先重新领取，其余名额从待处理产品中按加入顺序领取。
+        """
+        pending_key, leases_key = self._key('pending'), self._key('leases')
+
+        def claim(pipe) -> List[int]:
+            now = time.time()
+            expired = [int(i) for i in pipe.zrangebyscore(leases_key, '-inf', now, start=0, num=limit)]
+            fresh = [int(i) for i in pipe.zrange(pending_key, 0, limit - len(expired) - 1)] \
+                if len(expired) < limit else []
+            queue_ids = sorted(expired + fresh)
+            pipe.multi()
+            if queue_ids:
+                self._queue_processing(pipe, queue_ids, now + self.lease_seconds)
+            return queue_ids
+
+        queue_ids = self.redis.transaction(claim, pending_key, leases_key, value_from_callable=True)
+        return self._load_products(queue_ids) if queue_ids else []
+
+    def _queue_processing(self, pipe, queue_ids: List[int], lease_expires_at: float):
+        """在事务中把产品移入处理中并设置租约"""
+        pipe.zrem(self._key('pending'), *queue_ids)
+        pipe.zadd(self._key('processing'), {queue_id: queue_id for queue_id in queue_ids})
+        pipe.zadd(self._key('leases'), {queue_id: lease_expires_at for queue_id in queue_ids})
+        for queue_id in queue_ids:
+            pipe.hset(self._key('item', queue_id), 'worker_id', self.worker_id)
+
+    def renew_leases(self, queue_ids: Iterable[int]) -> int:
+        """延长本进程所领取产品的租约，返回成功续约的数量（已被其他进程重新领取的不计）"""
+        queue_ids = list(queue_ids)
+        if not queue_ids:
+            return 0
+        leases_key = self._key('leases')
+
+        def renew(pipe) -> int:
+            owned = [
+                queue_id for queue_id in queue_ids
+                if pipe.zscore(leases_key, queue_id) is not None
+                and pipe.hget(self._key('item', queue_id), 'worker_id') == self.worker_id
+            ]
+            pipe.multi()
+            if owned:
+                lease_expires_at = time.time() + self.lease_seconds
+                pipe.zadd(leases_key, {queue_id: lease_expires_at for queue_id in owned})
+            return len(owned)
+
+        return self.redis.transaction(renew, leases_key, value_from_callable=True)
+
+    def mark_many_processing(self, queue_ids: Iterable[int]):
+        """批量标记为处理中（一个事务，由本进程持有租约）"""
+        queue_ids = list(queue_ids)
+        if not queue_ids:
+            return
+        pipe = self.redis.pipeline()
+        self._queue_processing(pipe, queue_ids, time.time() + self.lease_seconds)
+        pipe.execute()
+
+    def apply_status_changes(self, completed_ids: List[int], failed_items: List[Tuple[str, str, str]]):
+        """
+        在一个事务中写入一批状态变更
+
+        Args:
+            completed_ids: 标记为已完成的队列ID
+            failed_items: 加入失败队列的 (url, product_name, error_message)，同一URL累加重试次数
+        """
+        failed_urls_key, failed_next_id_key = self._key('failed', 'urls'), self._key('failed', 'next_id')
+
+        def apply(pipe):
+            updates, next_id = self._failed_updates(pipe, failed_items) if failed_items else ({}, None)
+            pipe.multi()
+            for failed_id, (fields, removed, due_at) in updates.items():
+                item_key = self._key('failed', 'item', failed_id)
+                pipe.hset(item_key, mapping=fields)
+                if removed:
+                    pipe.hdel(item_key, *removed)
+                pipe.hset(failed_urls_key, fields['url'], failed_id)
+                pipe.zadd(self._key('failed', 'ids'), {failed_id: failed_id})
+                if due_at is None:
+                    pipe.zrem(self._key('failed', 'due'), failed_id)
+                else:
+                    pipe.zadd(self._key('failed', 'due'), {failed_id: due_at})
+            if next_id is not None:
+                pipe.set(failed_next_id_key, next_id)
+            if completed_ids:
+                pipe.zrem(self._key('pending'), *completed_ids)
+                pipe.zrem(self._key('processing'), *completed_ids)
+                pipe.zrem(self._key('leases'), *completed_ids)
+                pipe.zadd(self._key('completed'), {queue_id: queue_id for queue_id in completed_ids})
+                for queue_id in completed_ids:
+                    pipe.hdel(self._key('item', queue_id), 'worker_id')
+
+        self.redis.transaction(apply, failed_urls_key, failed_next_id_key)
+
+    def _failed_updates(self, pipe, failed_items: List[Tuple[str, str, str]]) -> Tuple[Dict, int]:
+        """
+        计算失败记录的写入内容（WATCH 阶段调用，读取已有记录）
+
+        Returns:
+            Tuple[Dict, int]: (失败记录ID -> (要写入的字段, 要删除的字段, 下次重试时间（永久失败为None）),
+                新的失败记录ID计数)
+        """
+        urls = list(dict.fromkeys(url for url, _, _ in failed_items))
+        known = dict(zip(urls, pipe.hmget(self._key('failed', 'urls'), urls)))
+        item_keys = [self._key('failed', 'item', failed_id) for failed_id in known.values() if failed_id]
+        if item_keys:
+            pipe.watch(*item_keys)
+        next_id = int(pipe.get(self._key('failed', 'next_id')) or 0)
+
+        now, timestamp = time.time(), utc_timestamp()
+        updates: Dict[int, Tuple[Dict, List[str], Optional[float]]] = {}
+        records: Dict[str, Tuple[int, Dict]] = {}
+        for url, product_name, error_message in failed_items:
+            if url in records:
+                failed_id, fields = records[url]
+                retry_count = int(fields['retry_count']) + 1
+            elif known[url]:
+                failed_id = int(known[url])
+                fields = pipe.hgetall(self._key('failed', 'item', failed_id))
+                retry_count = int(fields.get('retry_count') or 0) + 1
+            else:
+                next_id += 1
+                failed_id, fields, retry_count = next_id, {'url': url, 'created_at': timestamp}, 1
+            if retry_count > 1:
+                fields['last_retry_at'] = timestamp
+            if product_name is not None:
+                fields['product_name'] = product_name
+            permanent = is_permanent_error(error_message)
+            due_at = None if permanent else now + failed_retry_delay(retry_count)
+            fields.update(error_message=error_message or '', retry_count=retry_count, permanent=int(permanent))
+            removed = []
+            if due_at is None:
+                fields.pop('next_attempt_at', None)
+                removed.append('next_attempt_at')
+            else:
+                fields['next_attempt_at'] = due_at
+            records[url] = (failed_id, fields)
+            updates[failed_id] = (fields, removed, due_at)
+        return updates, next_id
+
+    def get_queue_stats(self) -> Dict:
+        """获取队列统计信息"""
+        pipe = self.redis.pipeline(transaction=False)
+        for status in STATUSES:
+            pipe.zcard(self._key(status))
+        pipe.zcard(self._key('failed', 'ids'))
+        pending, processing, completed, failed = pipe.execute()
+        return {'pending': pending, 'processing': processing, 'completed': completed, 'failed': failed}
+
+    def reset_processing_to_pending(self) -> int:
+        """重置租约到期的处理中任务为待处理状态，其他进程正在处理的任务保持不变"""
+        leases_key = self._key('leases')
+
+        def reset(pipe) -> int:
+            expired = [int(i) for i in pipe.zrangebyscore(leases_key, '-inf', time.time())]
+            pipe.multi()
+            if expired:
+                pipe.zrem(self._key('processing'), *expired)
+                pipe.zrem(leases_key, *expired)
+                pipe.zadd(self._key('pending'), {queue_id: queue_id for queue_id in expired})
+                for queue_id in expired:
+                    pipe.hdel(self._key('item', queue_id), 'worker_id')
+            return len(expired)
+
+        processing_count = self.redis.transaction(reset, leases_key, value_from_callable=True)
+        active_count = self.redis.zcard(self._key('processing'))
+
+        if processing_count > 0:
+            print(f"✅ 已重置 {processing_count} 个租约到期的处理中任务为待处理状态")
+        else:
+            print("没有发现租约到期的处理中任务")
+        if active_count:
+            print(f"其他进程正在处理 {active_count} 个任务（租约有效），保持不变")
+
+        return processing_count
+
+    def clear_completed(self) -> int:
+        """清理已完成的项目（同时删除URL记录，之后可重新加入队列）"""
+        completed_key = self._key('completed')
+        deleted_count = 0
+        while True:
+            queue_ids = self.redis.zrange(completed_key, 0, CLEAR_CHUNK_SIZE - 1)
+            if not queue_ids:
+                break
+            pipe = self.redis.pipeline(transaction=False)
+            for queue_id in queue_ids:
+                pipe.hget(self._key('item', queue_id), 'url')
+            urls = [url for url in pipe.execute() if url]
+            pipe = self.redis.pipeline()
+            pipe.delete(*(self._key('item', queue_id) for queue_id in queue_ids))
+            if urls:
+                pipe.hdel(self._key('urls'), *urls)
+            pipe.zrem(completed_key, *queue_ids)
+            pipe.execute()
+            deleted_count += len(queue_ids)
+
+        print(f"✅ 已清理 {deleted_count} 个已完成的项目")
+        return deleted_count
+
+    def _failed_record(self, failed_id: int, data: Dict[str, str]) -> Dict:
+        return {
+            'id': failed_id,
+            'url': data.get('url'),
+            'product_name': data.get('product_name'),
+            'error_message': data.get('error_message'),
+            'retry_count': int(data.get('retry_count') or 0),
+            'created_at': data.get('created_at'),
+            'last_retry_at': data.get('last_retry_at'),
+            'permanent': data.get('permanent') == '1',
+            'next_attempt_at': float(data['next_attempt_at']) if data.get('next_attempt_at') else None,
+        }
+
+    def _load_failed(self, failed_ids: List[str]) -> List[Dict]:
+        pipe = self.redis.pipeline(transaction=False)
+        for failed_id in failed_ids:
+            pipe.hgetall(self._key('failed', 'item', failed_id))
+        return [
+            self._failed_record(int(failed_id), data)
+            for failed_id, data in zip(failed_ids, pipe.execute()) if data
+        ]
+
+    def get_failed_page(self, after_id: Optional[int] = None, limit: int = 50,
+                        newest_first: bool = False) -> List[Dict]:
+        """按ID分页读取失败队列（newest_first 为True时从最新的记录往前翻）"""
+        ids_key = self._key('failed', 'ids')
+        if newest_first:
+            upper = f'({after_id}' if after_id is not None else '+inf'
+            failed_ids = self.redis.zrevrangebyscore(ids_key, upper, '-inf', start=0, num=limit)
+        else:
+            failed_ids = self.redis.zrangebyscore(ids_key, f'({after_id or 0}', '+inf', start=0, num=limit)
+        return self._load_failed(failed_ids)
+
+    def get_due_failed(self, limit: int = 50) -> List[Dict]:
+        """获取已到重试时间的失败产品（不含永久失败），最早到期的在前"""
+        failed_ids = self.redis.zrangebyscore(self._key('failed', 'due'), '-inf', time.time(), start=0, num=limit)
+        return self._load_failed(failed_ids)
+
+    def increment_failed_retry(self, failed_id: int, error_message: Optional[str] = None):
+        """
+        失败记录重试计数+1并更新时间，按指数退避推迟下次重试
+
+        Args:
+            failed_id: 失败记录ID
+            error_message: 本次失败原因，传入时更新记录并重新判断是否为永久失败
+        """
+        item_key, due_key = self._key('failed', 'item', failed_id), self._key('failed', 'due')
+
+        def increment(pipe):
+            data = pipe.hgetall(item_key)
+            pipe.multi()
+            if not data:
+                return
+            retry_count = int(data.get('retry_count') or 0) + 1
+            permanent = is_permanent_error(error_message) if error_message is not None else data.get('permanent') == '1'
+            fields = {'retry_count': retry_count, 'last_retry_at': utc_timestamp(), 'permanent': int(permanent)}
+            if error_message is not None:
+                fields['error_message'] = error_message
+            if permanent:
+                pipe.hdel(item_key, 'next_attempt_at')
+                pipe.zrem(due_key, failed_id)
+            else:
+                fields['next_attempt_at'] = time.time() + failed_retry_delay(retry_count)
+                pipe.zadd(due_key, {failed_id: fields['next_attempt_at']})
+            pipe.hset(item_key, mapping=fields)
+
+        self.redis.transaction(increment, item_key)
+
+    def remove_failed(self, failed_id: int):
+        """从失败队列删除记录（重试成功后调用）"""
+        item_key = self._key('failed', 'item', failed_id)
+        url = self.redis.hget(item_key, 'url')
+        pipe = self.redis.pipeline()
+        pipe.delete(item_key)
+        if url:
+            pipe.hdel(self._key('failed', 'urls'), url)
+        pipe.zrem(self._key('failed', 'ids'), failed_id)
+        pipe.zrem(self._key('failed', 'due'), failed_id)
+        pipe.execute()
+
+    def clear_failed(self) -> int:
+        """清空失败队列"""
+        count = self.redis.zcard(self._key('failed', 'ids'))
+        keys = list(self.redis.scan_iter(match=self._key('failed', '*'), count=CLEAR_CHUNK_SIZE))
+        for start in range(0, len(keys), CLEAR_CHUNK_SIZE):
+            self.redis.delete(*keys[start:start + CLEAR_CHUNK_SIZE])
+        return count
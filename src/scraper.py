@@ -8,29 +8,63 @@ import requests
 import json
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from config import (
-    PRODUCT_LIST_URL,  DEFAULT_HEADERS, 
-    REQUEST_TIMEOUT, SCRAPED_DATA_FILE, CSS_SELECTORS, BRAND_CODE_TO_SLUG
+    BASE_URL, PRODUCT_LIST_URL,  DEFAULT_HEADERS, 
+    REQUEST_TIMEOUT, SCRAPED_DATA_FILE, CSS_SELECTORS, BRAND_CODE_TO_SLUG,
+    LIST_RATE_PER_SEC, LIST_RATE_BURST, LIST_CRAWL_WORKERS, HTML_ARCHIVE_ENABLED, PARSER_BACKEND,
+    IMAGE_STORE_ENABLED
 )
+from catalog_store import CatalogStore
 from models import ProductLink, ProductDetails, ScrapingResult
-from data_extractor import DataExtractor
+from data_extractor import create_data_extractor
 from image_downloader import ImageDownloader
-from bs4 import BeautifulSoup
+from image_manifest import ImageManifest
+from image_store import ImageStore
+from rate_limiter import TokenBucket
+from rate_controller import AdaptiveRateController
+from http_cache import HttpCache
+from html_archive import HtmlArchive
 
 
 class BandaiScraper:
     """万代模型爬虫类"""
     
-    def __init__(self):
+    def __init__(self, replay: bool = False, parser_backend: str = PARSER_BACKEND):
+        """
+        初始化爬虫
+        
+        Args:
+            replay: 重放模式，页面从HTML归档读取而不访问网络，且不下载图片
+            parser_backend: HTML解析后端（'html.parser' / 'lxml' / 'selectolax'）
+        """
+        self.replay = replay
         self.session = requests.Session()
         self.session.headers.update(DEFAULT_HEADERS)
     
         # 初始化各个功能模块
-        self.data_extractor = DataExtractor()
-        self.image_downloader = ImageDownloader(self.session)
+        self.data_extractor = create_data_extractor(parser_backend)
+        self.rate_controller = AdaptiveRateController(name="html")
+        self.http_cache = HttpCache()
+        self.image_store = ImageStore() if IMAGE_STORE_ENABLED else None
+        self.image_manifest = ImageManifest()
+        self.image_downloader = ImageDownloader(self.session, http_cache=self.http_cache, image_store=self.image_store,
+                                                image_manifest=self.image_manifest)
+        self.html_archive = HtmlArchive() if (HTML_ARCHIVE_ENABLED or replay) else None
+        # 产品目录库：列表卡片与详情都写入这里，product_details.json 由 catalog.export_json() 生成
+        self.catalog = CatalogStore()
+        
+        # 列表页共享限速器（多线程抓取列表页时共用）
+        self.list_rate_limiter = TokenBucket(LIST_RATE_PER_SEC, LIST_RATE_BURST)
+        
+        # get_total_pages 解析过的列表页（URL -> 部分解析的文档），抓取同一页时直接复用
+        self._parsed_list_pages: Dict[str, Any] = {}
+        
+        # 详情抓取失败的原因（URL -> 错误信息），供调用方写入失败队列时区分永久/暂时失败
+        self.failure_reasons: Dict[str, str] = {}
     
     
     def get_total_pages(self, base_url: Optional[str] = None) -> int:
@@ -43,44 +77,12 @@ class BandaiScraper:
         try:
             target_url = base_url or PRODUCT_LIST_URL
             print(f"正在获取总页数: {target_url}")
-            response = self.session.get(target_url, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
-            response.encoding = 'utf-8'
-            
-            # 解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 查找分页链接
-            pagination_links = soup.find_all(class_=CSS_SELECTORS['pagination_links'])
-            print(f"找到 {len(pagination_links)} 个分页链接")
-            
-            if not pagination_links:
-                print("未找到分页链接，返回默认页数1")
-                return 1
-            
-            # 获取最后一个分页链接的页码
-            last_link = pagination_links[-1]
-            page_text = last_link.get_text(strip=True)
+            html = self._fetch_html(target_url, kind='list')
             
-            # 尝试提取页码数字
-            try:
-                total_pages = int(page_text)
-                print(f"总页数: {total_pages}")
-                return total_pages
-            except ValueError:
-                # 如果无法转换为数字，尝试从href中提取
-                href = last_link.get('href', '')
-                if 'p=' in href:
-                    # 从URL参数中提取页码
-                    import re
-                    match = re.search(r'p=(\d+)', href)
-                    if match:
-                        total_pages = int(match.group(1))
-                        print(f"从URL中提取总页数: {total_pages}")
-                        return total_pages
-                
-                print(f"无法解析页码 '{page_text}'，返回默认页数1")
-                return 1
+            # 部分解析HTML，保留给随后抓取第1页时复用
+            doc = self.data_extractor.parse_list_page(html)
+            self._parsed_list_pages = {target_url: doc}
+            return self.data_extractor.extract_total_pages(doc)
                 
         except requests.exceptions.RequestException as e:
             print(f"获取总页数时请求错误: {e}")
@@ -116,124 +118,33 @@ class BandaiScraper:
                     current_url = f"{base_url}?p={page}"
                 
                 print(f"\n正在访问第 {page} 页: {current_url}")
-                response = self.session.get(current_url, timeout=REQUEST_TIMEOUT)
-                response.raise_for_status()
-                response.encoding = 'utf-8'
-                
-                print(f"响应状态码: {response.status_code}")
-                print(f"响应内容长度: {len(response.text)} 字符")
-                
-                # 解析HTML
-                soup = BeautifulSoup(response.text, 'html.parser')
+                doc = self._load_list_page(current_url)
                 
-                # 查找指定class的元素
-                target_elements = soup.find_all(class_=CSS_SELECTORS['product_cards'])
-                print(f"找到 {len(target_elements)} 个匹配的元素")
-                
-                if not target_elements:
+                cards = self.data_extractor.extract_product_cards(doc)
+                if cards is None:
                     print(f"第 {page} 页未找到产品卡片，可能已到最后一页")
                     break
                 
                 page_results = []
-                element = target_elements[0]  # 只处理第一个元素
-                
-                # 查找所有链接
-                links = element.find_all('a')
-                print(f"找到 {len(links)} 个链接")
-                
-                for link in links:
-                    href = link.get('href')
-                    
-                    # 精确提取产品信息
-                    product_name = ""
-                    product_price = ""
-                    product_release_date = ""
-                    
-                    # 提取产品名称
-                    title_elem = link.select_one('.p-card__tit')
-                    if title_elem:
-                        product_name = title_elem.get_text(strip=True)
-                    
-                    # 提取价格
-                    price_elem = link.select_one('.p-card__price')
-                    if price_elem:
-                        product_price = price_elem.get_text(strip=True)
-                    
-                    # 提取发布日期
-                    date_elem = link.select_one('.p-card_date')
-                    if date_elem:
-                        product_release_date = date_elem.get_text(strip=True)
-                    
-                    # 组合完整的产品信息
-                    # link_text = f"{product_name}-{product_price}-{product_release_date}"
-                    print(f"产品信息: {product_name} | {product_price} | {product_release_date}")
-
-                    # 查找列表头像图（p-card__img 下的 img）
-                    avatar_url = None
-                    img_tag = link.select_one('.p-card__img img')
-                    if img_tag and img_tag.get('src'):
-                        avatar_url = img_tag.get('src')
-
-                    # 创建产品链接对象（附带 avatar 链接）
-                    product_link = ProductLink(
-                        href=href,
-                        text=product_name,
-                        avatar=avatar_url
-                    )
+                for product_link, product_price, product_release_date in cards:
                     page_results.append(product_link)
-
-
+                    
                     # 若有头像，下载到产品根目录，并将下载链接写入产品JSON的 avatar 字段
                     try:
-                        if avatar_url and href:
-                            # 生成产品目录（基于产品名文本）
-                            safe_folder_name = self.data_extractor.sanitize_folder_name(product_name or 'product')
-                            # 若传入品牌代码，则在 data/<BRAND>/ 下保存
-                            brand_folder = None
-                            if brand_code and BRAND_CODE_TO_SLUG.get(brand_code.upper()):
-                                brand_folder = brand_code.upper()
-                            product_dir = os.path.join('data', brand_folder, safe_folder_name) if brand_folder else os.path.join('data', safe_folder_name)
-                            os.makedirs(product_dir, exist_ok=True)
-
+                        if product_link.avatar and product_link.href:
+                            product_dir = self._list_product_dir(product_link.text, brand_code)
+                            
                             # 通过图片下载器下载（Referer 使用当前列表页 URL）
                             # 若头像已存在则跳过下载
-                            avatar_filename = os.path.basename(urlparse(avatar_url).path)
-                            target_avatar_path = os.path.join(product_dir, avatar_filename) if avatar_filename else None
-                            if target_avatar_path and os.path.exists(target_avatar_path):
-                                saved_path = target_avatar_path
-                            else:
-                                saved_path = self.image_downloader.download_single_image(
-                                    image_url=avatar_url,
+                            target_avatar_path = self._avatar_target_path(product_link.avatar, product_dir)
+                            if not self.replay and not (target_avatar_path and os.path.exists(target_avatar_path)):
+                                self.image_downloader.download_single_image(
+                                    image_url=product_link.avatar,
                                     referer_url=current_url,
                                     output_path=product_dir
                                 )
-
-                            # 将 avatar 链接写入/更新产品 JSON（与后续详情逻辑兼容）
-                            json_path = os.path.join(product_dir, 'product_details.json')
-                            existing = {}
-                            if os.path.exists(json_path):
-                                try:
-                                    with open(json_path, 'r', encoding='utf-8') as f:
-                                        existing = json.load(f)
-                                except Exception:
-                                    existing = {}
-
-                            # 最小字段填充，详情阶段会覆盖/补全
-                            existing.setdefault('product_name', product_name)
-                            existing.setdefault('product_info', {
-                                '価格': product_price, 
-                                '発売日': product_release_date,
-                                '対象年齢': '8歳以上'
-                            })
-                            existing.setdefault('article_content', '')
-                            existing.setdefault('image_links', [])
-                            existing.setdefault('product_tag', '')
-                            existing.setdefault('series', '')
-                            existing['url'] = href
-                            existing['avatar'] = avatar_url
-
-                            with open(json_path, 'w', encoding='utf-8') as f:
-                                json.dump(existing, f, ensure_ascii=False, indent=2)
+                            
+                            self._update_list_product_record(product_dir, product_link, product_price, product_release_date, brand_code)
                     except Exception as e:
                         print(f"  列表头像处理失败: {e}")
                 
@@ -246,9 +157,6 @@ class BandaiScraper:
                     break
                 
                 page += 1
-                
-                # 添加延迟避免请求过于频繁
-                time.sleep(1)
             
             print(f"\n总共收集到 {len(all_results)} 个产品链接（共 {page-1} 页）")
             
@@ -267,6 +175,30 @@ class BandaiScraper:
             print(error_msg)
             return ScrapingResult(success=False, error_message=error_msg)
     
+    def scrape_product_lists_concurrent(self, base_url: str, start_page: int, end_page: int, brand_code: str = None, max_workers: int = LIST_CRAWL_WORKERS) -> Dict[int, ScrapingResult]:
+        """
+        并发抓取多个列表页（总页数已知时使用）
+        
+        各页由线程池并行抓取，整体请求速率由共享的令牌桶限速器控制。
+        
+        Args:
+            base_url: 列表页基础URL
+            start_page: 起始页码
+            end_page: 结束页码（包含）
+            brand_code: 品牌代码
+            max_workers: 并发线程数
+            
+        Returns:
+            Dict[int, ScrapingResult]: 页码到该页爬取结果的映射（按页码排序）
+        """
+        pages = list(range(start_page, end_page + 1))
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = executor.map(
+                lambda page: self.scrape_product_list(num_pages=1, start_page=page, base_url=base_url, brand_code=brand_code),
+                pages
+            )
+            return dict(zip(pages, results))
+    
     def scrape_product_details(self, product_url: str, base_dir: str, queue_product_name: str) -> Optional[Tuple[ProductDetails, str]]:
         """
         抓取产品详情页面
@@ -286,141 +218,270 @@ class BandaiScraper:
             return self._scrape_p_bandai_details(url, base_dir, queue_product_name)
         
         # 常规bandai-hobby页面
-        if not url or not url.startswith('https://bandai-hobby.net/item'):
-            print(f"❌ 不支持的URL格式: {url}")
-            return None
+        if not url or not url.startswith(f'{BASE_URL}/item'):
+            return self._record_failure(url, f"不支持的URL格式: {url}")
         
         try:
             # 解析产品页面
             print(f"正在访问产品详情页: {url}")
-            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
-            response.encoding = 'utf-8'
+            html, not_modified = self._fetch_page(url, kind='detail')
             
-            print(f"响应状态码: {response.status_code}")
-            print(f"响应内容长度: {len(response.text)} 字符")
+            # 页面未修改且上次提取结果完整时，跳过解析
+            if not_modified:
+                unchanged = self._load_unchanged_details(url, base_dir)
+                if unchanged:
+                    return unchanged
             
             # 解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 1. 获取产品名称
-            product_name = self.data_extractor.extract_product_name(soup)
-            
-            # 构建产品文件夹路径
-            safe_folder_name = self.data_extractor.sanitize_folder_name(queue_product_name)
-            target_folder = os.path.join(base_dir, safe_folder_name)
+            doc = self.data_extractor.parse(html)
             
-            if os.path.exists(target_folder):
-                output_path = target_folder
-                print(f"找到对应文件夹: {output_path}")
-            else:
-                # 如果没找到，使用解析的产品名称创建新文件夹
-                safe_folder_name = self.data_extractor.sanitize_folder_name(product_name)
-                output_path = os.path.join(base_dir, safe_folder_name)
-                print(f"未找到对应文件夹，使用解析的产品名称: {output_path}")
+            # 1. 单次遍历提取全部详情字段
+            fields = self.data_extractor.extract_product_details(doc)
+            product_name = fields['name']
             
-            # 检查是否已存在产品文件夹和JSON文件
-            json_file_path = os.path.join(output_path, "product_details.json")
-            existing_data = None
+            # 构建产品文件夹路径，读取已存在的JSON
+            output_path = self._resolve_output_path(base_dir, queue_product_name, product_name)
+            existing_data = self._load_existing_details(output_path, url)
             
-            # 初始化数据
-            if os.path.exists(json_file_path):
-                print(f"发现已存在的产品文件夹: {output_path}")
-                # 读取现有的JSON文件
-                with open(json_file_path, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-            else:
-                existing_data = {}
+            # 2. 图片链接优先沿用已有记录
+            if existing_data.get('image_links'):
+                fields['image_links'] = existing_data['image_links']
+            image_links = fields['image_links']
             
-            # 1. 处理产品详细信息
-            product_info = self.data_extractor.extract_product_info(soup)
+            # 按图片清单找出缺少的图片（重放模式不访问网络）
+            missing_images = [] if self.replay else self._missing_images(output_path, image_links)
             
-            # 2. 处理产品文章内容
-            article_content = self.data_extractor.extract_article_content(soup)
-            
-            # 3. 处理产品标签
-            product_tag = self.data_extractor.extract_product_tag(soup)
-            
-            # 4. 处理系列链接
-            series = self.data_extractor.extract_series_links(soup)
-            
-            # 5. 处理图片链接
-            if existing_data.get('image_links') and existing_data['image_links']:
-                image_links = existing_data['image_links']
-            else:
-                image_links = self.data_extractor.extract_image_links(soup)
-            
-            # 更新或创建数据
-            existing_data.update({
-                'product_name': product_name,
-                'product_info': product_info,
-                'article_content': article_content,
-                'product_tag': product_tag,
-                'series': series,
-                'image_links': image_links,
-                'url': url
-            })
-            
-            # 检查是否需要下载图片
-            need_download_images = True
-            if image_links:
-                images_dir = os.path.join(output_path, "images")
-                existing_images = []
-                
-                if os.path.exists(images_dir):
-                    existing_images = [f for f in os.listdir(images_dir) if f.lower().endswith(('.jpg', '.jpeg', '.png', '.webp'))]
-                
-                # 比较图片链接数量和实际文件数量
-                if len(existing_images) == len(image_links):
-                    print(f"✅ 图片已完整下载 ({len(existing_images)}/{len(image_links)})，跳过图片下载")
-                    need_download_images = False
-                else:
-                    print(f"⚠️ 图片不完整 (现有:{len(existing_images)}, 需要:{len(image_links)})，需要下载图片")
-            else:
-                print(f"ℹ️ 没有图片链接，跳过图片下载")
-                need_download_images = False
-            
-            # 下载图片
-            download_success = False
-            if need_download_images and image_links:
+            # 只下载缺少的图片
+            if missing_images:
                 downloaded_files, download_success = self.image_downloader.download_images(
-                    image_links, url, os.path.join(output_path, "images")
+                    missing_images, url, os.path.join(output_path, "images"),
+                    self.image_downloader.expected_filenames(image_links)
                 )
                 if download_success:
                     print(f"✅ 图片下载成功，共下载 {len(downloaded_files)} 张图片")
                 else:
                     print(f"❌ 图片下载失败")
                     raise Exception("图片下载失败，任务失败")
-            else:
-                download_success = True
             
-            # 创建产品详情对象（保留已存在的 avatar）
-            existing_avatar = existing_data.get('avatar', '') if isinstance(existing_data, dict) else ''
-            # 从base_dir中提取brand信息 (data/HG -> HG)
-            brand = os.path.basename(base_dir) if base_dir else ""
-            product_details = ProductDetails(
-                name=product_name,
-                image_links=image_links,
-                product_info=product_info,
-                article_content=article_content,
-                url=url,
-                product_tag=product_tag,
-                series=series,
-                avatar=existing_avatar,
-                brand=brand
-            )
+            product_details = self._build_product_details(product_name, fields, url, base_dir, existing_data)
             
             # 保存结果
             self._save_product_details(product_details, output_path)
+            self.http_cache.mark_extracted(url, output_path)
             
             return product_details, output_path
             
         except requests.exceptions.RequestException as e:
-            print(f"请求产品页面时出错: {e}")
-            return None
+            response = getattr(e, 'response', None)
+            status = f"HTTP {response.status_code}: " if response is not None else ""
+            return self._record_failure(url, f"请求产品页面时出错: {status}{e}")
         except Exception as e:
-            print(f"处理产品详情时出错: {e}")
+            return self._record_failure(url, f"处理产品详情时出错: {e}")
+
+    def _record_failure(self, url: str, reason: str) -> None:
+        """打印并记录详情抓取失败的原因，返回None（作为抓取结果）"""
+        print(f"❌ {reason}")
+        self.failure_reasons[url] = reason
+        return None
+
+    def _load_list_page(self, url: str) -> Any:
+        """
+        获取部分解析的列表页，get_total_pages 已解析过的页面不再请求
+        
+        Args:
+            url: 列表页URL
+            
+        Returns:
+            data_extractor.parse_list_page() 返回的文档对象
+        """
+        doc = self._parsed_list_pages.pop(url, None)
+        if doc is not None:
+            print("复用获取总页数时解析的页面")
+            return doc
+        
+        # 按令牌桶速率限速，避免请求过于频繁
+        if not self.replay:
+            self.list_rate_limiter.acquire()
+        html = self._fetch_html(url, kind='list')
+        return self.data_extractor.parse_list_page(html)
+
+    def _fetch_html(self, url: str, kind: str = 'page') -> str:
+        """
+        请求页面并返回HTML文本
+        
+        Args:
+            url: 页面URL
+            kind: 页面类型（'list' / 'detail'），用于归档索引
+            
+        Returns:
+            str: 页面HTML文本（请求失败时抛出 requests 异常）
+        """
+        return self._fetch_page(url, kind)[0]
+
+    def _fetch_page(self, url: str, kind: str = 'page') -> Tuple[str, bool]:
+        """
+        请求页面，有缓存时发条件请求；重放模式下从归档读取
+        
+        Args:
+            url: 页面URL
+            kind: 页面类型（'list' / 'detail'），用于归档索引
+            
+        Returns:
+            Tuple[str, bool]: (页面HTML文本, 内容是否未修改)，请求失败时抛出 requests 异常，
+                重放模式下归档缺失时抛出 ArchiveMiss
+        """
+        if self.replay:
+            html = self.html_archive.get(url).decode('utf-8', errors='replace')
+            print(f"从归档读取页面: {len(html)} 字符")
+            return html, False
+        
+        cache_entry = self.http_cache.get(url)
+        if cache_entry and cache_entry.body is None:
+            cache_entry = None
+        headers = self.http_cache.conditional_headers(cache_entry)
+        
+        self.rate_controller.before_request()
+        start = time.monotonic()
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.rate_controller.timeout(REQUEST_TIMEOUT))
+        except requests.exceptions.Timeout:
+            self.rate_controller.record(time.monotonic() - start, timed_out=True)
+            raise
+        self.rate_controller.record(time.monotonic() - start, response.status_code, response.headers.get('Retry-After'))
+        
+        if response.status_code == 304 and cache_entry:
+            self.http_cache.record_hit()
+            print(f"响应状态码: 304（内容未修改，使用缓存）")
+            return cache_entry.body.decode('utf-8', errors='replace'), True
+        
+        response.raise_for_status()
+        response.encoding = 'utf-8'
+        self.http_cache.record_miss()
+        self.http_cache.store(url, response.headers, response.content)
+        if self.html_archive:
+            self.html_archive.put(url, response.content, kind)
+        
+        print(f"响应状态码: {response.status_code}")
+        print(f"响应内容长度: {len(response.text)} 字符")
+        return response.text, False
+
+    def _load_unchanged_details(self, url: str, base_dir: str) -> Optional[Tuple[ProductDetails, str]]:
+        """
+        页面未修改时读取上次的提取结果
+        
+        Returns:
+            Tuple[ProductDetails, str]: (产品详情信息, 产品文件夹路径)，
+                上次结果不在当前品牌目录下、已丢失或图片不完整时返回None
+        """
+        cache_entry = self.http_cache.get(url)
+        output_path = cache_entry.extracted_path if cache_entry else None
+        if not output_path or os.path.dirname(os.path.normpath(output_path)) != os.path.normpath(base_dir):
             return None
+        
+        existing_data = self.catalog.get(url) or {}
+        if os.path.normpath(existing_data.get('product_dir', '')) != os.path.normpath(output_path):
+            return None
+        
+        product_details = ProductDetails.from_dict(existing_data)
+        if self._missing_images(output_path, product_details.image_links):
+            return None
+        
+        print(f"✅ 页面未修改，沿用已有详情: {output_path}")
+        return product_details, output_path
+
+    def rate_summary(self) -> str:
+        """当前页面与图片请求速率，用于日志输出"""
+        return (f"页面 {self.rate_controller.current_rate:.2f} 次/秒, "
+                f"图片 {self.image_downloader.rate_controller.current_rate:.2f} 次/秒")
+
+    def _list_product_dir(self, product_name: str, brand_code: Optional[str]) -> str:
+        """生成并创建列表卡片对应的产品目录（data/<BRAND>/<产品名>）"""
+        # 生成产品目录（基于产品名文本）
+        safe_folder_name = self.data_extractor.sanitize_folder_name(product_name or 'product')
+        # 若传入品牌代码，则在 data/<BRAND>/ 下保存
+        brand_folder = None
+        if brand_code and BRAND_CODE_TO_SLUG.get(brand_code.upper()):
+            brand_folder = brand_code.upper()
+        product_dir = os.path.join('data', brand_folder, safe_folder_name) if brand_folder else os.path.join('data', safe_folder_name)
+        os.makedirs(product_dir, exist_ok=True)
+        return product_dir
+
+    def _avatar_target_path(self, avatar_url: str, product_dir: str) -> Optional[str]:
+        """头像在产品目录中的目标路径，无法从URL得到文件名时返回None"""
+        avatar_filename = os.path.basename(urlparse(avatar_url).path)
+        return os.path.join(product_dir, avatar_filename) if avatar_filename else None
+
+    def _update_list_product_record(self, product_dir: str, product_link: ProductLink, product_price: str,
+                                    product_release_date: str, brand_code: Optional[str] = None):
+        """将列表卡片信息（含 avatar 链接）写入产品目录库（与后续详情逻辑兼容）"""
+        self.catalog.merge_list_card(product_dir, product_link, product_price, product_release_date,
+                                     brand_code.upper() if brand_code else None)
+
+    def _resolve_output_path(self, base_dir: str, queue_product_name: str, product_name: str) -> str:
+        """优先使用队列产品名对应的已有文件夹，否则使用解析的产品名称"""
+        safe_folder_name = self.data_extractor.sanitize_folder_name(queue_product_name)
+        target_folder = os.path.join(base_dir, safe_folder_name)
+        
+        if os.path.exists(target_folder):
+            print(f"找到对应文件夹: {target_folder}")
+            return target_folder
+        
+        # 如果没找到，使用解析的产品名称创建新文件夹
+        safe_folder_name = self.data_extractor.sanitize_folder_name(product_name)
+        output_path = os.path.join(base_dir, safe_folder_name)
+        print(f"未找到对应文件夹，使用解析的产品名称: {output_path}")
+        return output_path
+
+    def _load_existing_details(self, output_path: str, url: Optional[str] = None) -> dict:
+        """
+        读取产品已有的记录：优先按URL、其次按产品文件夹查询产品目录库，
+        都没有时读取文件夹中（目录库之前保存的）product_details.json，均不存在时返回空字典
+        """
+        record = (self.catalog.get(url) if url else None) or self.catalog.get_by_dir(output_path)
+        if record:
+            return record
+        
+        json_file_path = os.path.join(output_path, "product_details.json")
+        if not os.path.exists(json_file_path):
+            return {}
+        
+        print(f"发现已存在的产品文件夹: {output_path}")
+        with open(json_file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _missing_images(self, output_path: str, image_links: List[str]) -> List[str]:
+        """按图片清单返回产品还需要下载的图片链接（没有图片链接时为空）"""
+        if not image_links:
+            print(f"ℹ️ 没有图片链接，跳过图片下载")
+            return []
+        
+        missing = self.image_manifest.missing(
+            os.path.join(output_path, "images"), image_links,
+            self.image_downloader.expected_filenames(image_links)
+        )
+        total = len(set(image_links))
+        if not missing:
+            print(f"✅ 图片已完整下载 ({total}/{total})，跳过图片下载")
+        else:
+            print(f"⚠️ 图片不完整 (缺少:{len(missing)}, 需要:{total})，需要下载图片")
+        return missing
+
+    def _build_product_details(self, product_name: str, fields: dict, url: str, base_dir: str, existing_data: dict) -> ProductDetails:
+        """创建产品详情对象（保留已存在的 avatar）"""
+        existing_avatar = existing_data.get('avatar', '') if isinstance(existing_data, dict) else ''
+        # 从base_dir中提取brand信息 (data/HG -> HG)
+        brand = os.path.basename(base_dir) if base_dir else ""
+        return ProductDetails(
+            name=product_name,
+            image_links=fields['image_links'],
+            product_info=fields['product_info'],
+            article_content=fields['article_content'],
+            url=url,
+            product_tag=fields['product_tag'],
+            series=fields['series'],
+            avatar=existing_avatar,
+            brand=brand
+        )
 
     def _scrape_p_bandai_details(self, url: str, base_dir: str, product_name: Optional[str]) -> Optional[Tuple[ProductDetails, str]]:
         """处理 Premium Bandai 商品页，基于待处理队列的产品名拆分信息。"""
@@ -457,17 +518,14 @@ class BandaiScraper:
             existing_avatar = ''
             existing_name = product_name
             existing_info = ""  # Premium Bandai 暂不处理产品信息
-            json_path = os.path.join(output_path, 'product_details.json')
-            if os.path.exists(json_path):
-                try:
-                    with open(json_path, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                    if isinstance(existing_data, dict):
-                        existing_avatar = existing_data.get('avatar', '')
-                        existing_name = existing_data.get('name', product_name)
-                        existing_info = existing_data.get('product_info', "")
-                except Exception:
-                    existing_avatar = ''
+            try:
+                existing_data = self._load_existing_details(output_path, url)
+                if isinstance(existing_data, dict):
+                    existing_avatar = existing_data.get('avatar', '')
+                    existing_name = existing_data.get('name', product_name)
+                    existing_info = existing_data.get('product_info', "")
+            except Exception:
+                existing_avatar = ''
 
             # 从base_dir中提取brand信息 (data/HG -> HG)
             brand = os.path.basename(base_dir) if base_dir else ""
@@ -483,7 +541,7 @@ class BandaiScraper:
                 brand=brand
             )
 
-            # 保存JSON
+            # 写入产品目录库
             self._save_product_details(details, output_path)
             return details, output_path
 
@@ -508,17 +566,11 @@ class BandaiScraper:
             json.dump(data, f, ensure_ascii=False, indent=2)
         print(f"产品列表已保存到: {SCRAPED_DATA_FILE}")
     
-    def _save_product_details(self, product_details: ProductDetails, output_path: str = None):
-        """保存产品详情到文件"""
-        if output_path:
-            # 确保文件夹存在
-            os.makedirs(output_path, exist_ok=True)
-            # 保存到产品文件夹
-            file_path = os.path.join(output_path, "product_details.json")
-            
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(product_details.to_dict(), f, ensure_ascii=False, indent=2)
-        print(f"产品详情已保存到: {file_path}")
+    def _save_product_details(self, product_details: ProductDetails, output_path: str):
+        """保存产品详情到产品目录库（批量提交；product_details.json 由导出步骤生成）"""
+        os.makedirs(output_path, exist_ok=True)
+        self.catalog.put(product_details.to_dict(), output_path)
+        print(f"产品详情已写入目录库: {output_path}")
 
     def test_scrape_product_list(self):
         """测试产品列表爬取功能"""
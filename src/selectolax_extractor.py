@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+selectolax 解析后端（需安装 selectolax）
+用 Lexbor 引擎解析并以CSS选择器查找元素，文本拼接规则与 BeautifulSoup 保持一致
+"""
+
+from typing import Any, Iterator, List, Optional
+
+from selectolax.lexbor import LexborHTMLParser
+
+from data_extractor import PRESERVE_WHITESPACE_TAGS, SKIPPED_TEXT_TAGS, DataExtractor, collapse_whitespace
+
+
+class SelectolaxDataExtractor(DataExtractor):
+    """基于 selectolax 的数据提取器"""
+
+    backend = 'selectolax'
+
+    def parse(self, html: str) -> Any:
+        return LexborHTMLParser(html or '').root
+
+    def parse_list_page(self, html: str) -> Any:
+        # C实现的整页建树已足够快，不做部分解析
+        return self.parse(html)
+
+    def _iter_elements(self, doc: Any) -> Iterator[Any]:
+        # traverse() 会产出注释节点（标签名以'-'开头）
+        return (n for n in doc.traverse() if not n.tag.startswith('-'))
+
+    def _tag_name(self, node: Any) -> str:
+        return node.tag
+
+    def _iter_plan_candidates(self, doc: Any, plan: Any) -> Iterator[Any]:
+        # Lexbor 一次遍历匹配选择器组，Python 侧只检查少量候选元素
+        return doc.css(plan.css_prefilter)
+
+    def _descendants(self, node: Any, selector: str) -> List[Any]:
+        """CSS查询并排除节点自身（selectolax 的 css() 会匹配节点自身）"""
+        return [n for n in node.css(selector) if n.mem_id != node.mem_id]
+
+    def _find_all_by_class(self, node: Any, class_name: str, tag: Optional[str] = None) -> List[Any]:
+        tokens = class_name.split()
+        if not tokens:
+            return []
+        selector = (tag or '') + ''.join(f'.{token}' for token in tokens)
+        candidates = self._descendants(node, selector)
+        if len(tokens) == 1:
+            return candidates
+        # 含空格的class需整串（规范化空白后）相等，与 BeautifulSoup 的 class_ 规则一致
+        target = ' '.join(tokens)
+        return [n for n in candidates if ' '.join(self._class_list(n)) == target]
+
+    def _find_by_class(self, node: Any, class_name: str, tag: Optional[str] = None) -> Any:
+        matches = self._find_all_by_class(node, class_name, tag)
+        return matches[0] if matches else None
+
+    def _find_all_class_contains(self, node: Any, fragment: str) -> List[Any]:
+        return [
+            n for n in self._descendants(node, f'[class*="{fragment}"]')
+            if any(fragment in class_name for class_name in self._class_list(n))
+        ]
+
+    def _find_all_tag(self, node: Any, tag: str) -> List[Any]:
+        return self._descendants(node, tag)
+
+    def _next_sibling_by_class(self, node: Any, tag: str, class_name: str) -> Any:
+        target = class_name.split()
+        sibling = node.next
+        while sibling is not None:
+            if sibling.tag == tag:
+                classes = self._class_list(sibling)
+                if classes == target or (len(target) == 1 and target[0] in classes):
+                    return sibling
+            sibling = sibling.next
+        return None
+
+    def _attr(self, node: Any, name: str) -> Optional[str]:
+        return node.attributes.get(name)
+
+    def _class_list(self, node: Any) -> List[str]:
+        return (node.attributes.get('class') or '').split()
+
+    def _strings(self, node: Any, preserve: bool = False) -> Iterator[str]:
+        """按文档顺序产出元素内的文本节点（跳过注释与脚本/样式，纯空白文本按 BeautifulSoup 规则折叠）"""
+        if node.tag in SKIPPED_TEXT_TAGS:
+            return
+        preserve = preserve or node.tag in PRESERVE_WHITESPACE_TAGS
+        for child in node.iter(include_text=True):
+            if child.tag == '-text':
+                text = child.text_content
+                if text:
+                    yield text if preserve else collapse_whitespace(text)
+            elif not child.tag.startswith('-'):
+                yield from self._strings(child, preserve)
+
+    def _text(self, node: Any, separator: str = '', strip: bool = False) -> str:
+        strings = self._strings(node)
+        if strip:
+            strings = (s.strip() for s in strings)
+            strings = (s for s in strings if s)
+        return separator.join(strings)
+
+    def _article_strings(self, node: Any, preserve: bool = False) -> Iterator[str]:
+        """
+        产出文章区域的文本片段：同一父元素下相邻的文本与无属性的 <br> 合并为一段，
+        <br> 计为一个空格（与默认后端规则一致）
+        """
+        if node.tag in SKIPPED_TEXT_TAGS:
+            return
+        preserve = preserve or node.tag in PRESERVE_WHITESPACE_TAGS
+        fold = (lambda text: text) if preserve else collapse_whitespace
+        run = ''
+        for child in node.iter(include_text=True):
+            if child.tag == '-text':
+                if child.text_content:
+                    run += fold(child.text_content)
+            elif child.tag == 'br' and not child.attributes:
+                run += ' '
+            else:
+                if run:
+                    yield fold(run)
+                    run = ''
+                if not child.tag.startswith('-'):
+                    yield from self._article_strings(child, preserve)
+        if run:
+            yield fold(run)
+
+    def _article_text(self, node: Any) -> str:
+        return '\n'.join(self._article_strings(node))
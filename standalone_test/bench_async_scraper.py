@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试：同步 BandaiScraper 与异步 AsyncBandaiScraper 抓取详情页的耗时对比。
+
+用法:
+  python bench_async_scraper.py [产品数量] [延迟毫秒] [每主机并发数] [解析进程数]
+
+说明：
+- 自动启动本地替身服务器（mock_bandai_server.py），不访问真实站点。
+- 输出写入临时目录，运行结束后删除。
+- 异步模式分别在事件循环内解析与使用解析进程池（默认进程数为CPU核数）各跑一次，并输出阶段队列深度。
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+if CURRENT_DIR not in sys.path:
+    sys.path.insert(0, CURRENT_DIR)
+
+from mock_bandai_server import start_server
+
+
+def unthrottle(scraper):
+    """放开速率控制，使基准只衡量抓取引擎本身"""
+    from rate_controller import AdaptiveRateController
+
+    scraper.rate_controller = AdaptiveRateController('html', initial_rate=10000, max_rate=10000)
+    scraper.image_downloader.rate_controller = AdaptiveRateController('image', initial_rate=10000, max_rate=10000)
+
+
+def main():
+    num_items = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    max_per_host = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    parse_workers = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+    server = start_server(0, latency_ms)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    work_dir = tempfile.mkdtemp(prefix='bandai_bench_')
+    # 必须在导入 config 之前设置；产品目录库放在临时目录，不混入正式数据
+    os.environ['BANDAI_BASE_URL'] = base_url
+    os.environ['CATALOG_DIR'] = os.path.join(work_dir, 'catalog')
+
+    from scraper import BandaiScraper
+    from async_scraper import AsyncBandaiScraper
+    from config import PARSE_WORKERS
+    from parse_pool import ParsePool
+
+    products = [
+        {'url': f"{base_url}/item/01_{i}/", 'product_name': f"bench-{i}"}
+        for i in range(1, num_items + 1)
+    ]
+
+    try:
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            scraper = BandaiScraper()
+            unthrottle(scraper)
+            start = time.perf_counter()
+            sync_ok = sum(
+                1 for p in products
+                if scraper.scrape_product_details(p['url'], os.path.join(work_dir, 'sync'), p['product_name'])
+            )
+            sync_elapsed = time.perf_counter() - start
+
+            async def run_async(output_name, parse_pool=None):
+                async with AsyncBandaiScraper(max_per_host=max_per_host, parse_pool=parse_pool) as async_scraper:
+                    unthrottle(async_scraper.scraper)
+                    results = await async_scraper.scrape_many_details(products, os.path.join(work_dir, output_name))
+                    return results, async_scraper.stage_stats.report()
+
+            start = time.perf_counter()
+            results, async_stages = asyncio.run(run_async('async'))
+            async_ok = sum(1 for r in results if r)
+            async_elapsed = time.perf_counter() - start
+
+            with ParsePool(parse_workers or PARSE_WORKERS) as parse_pool:
+                # 预热子进程，不计入耗时
+                parse_pool.extract_detail(b'<html></html>')
+                start = time.perf_counter()
+                results, pool_stages = asyncio.run(run_async('async_pool', parse_pool))
+                pool_ok = sum(1 for r in results if r)
+                pool_elapsed = time.perf_counter() - start
+                pool_workers = parse_pool.workers
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        server.shutdown()
+
+    print(f"产品数: {num_items}, 模拟延迟: {latency_ms}ms, 每主机并发: {max_per_host}")
+    print(f"同步: {sync_elapsed:.2f}s ({sync_ok}/{num_items} 成功, {num_items / sync_elapsed:.1f} 个/秒)")
+    print(f"异步: {async_elapsed:.2f}s ({async_ok}/{num_items} 成功, {num_items / async_elapsed:.1f} 个/秒)")
+    print(f"  阶段队列深度: {async_stages}")
+    print(f"异步+解析进程池({pool_workers}): {pool_elapsed:.2f}s ({pool_ok}/{num_items} 成功, {num_items / pool_elapsed:.1f} 个/秒)")
+    print(f"  阶段队列深度: {pool_stages}")
+    print(f"加速比: 异步 {sync_elapsed / async_elapsed:.1f}x，异步+解析进程池 {sync_elapsed / pool_elapsed:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
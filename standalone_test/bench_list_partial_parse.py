@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试：列表页整页解析与部分解析（parse_list_page）的CPU时间、峰值内存与结果一致性。
+
+用法:
+  python bench_list_partial_parse.py [最多页数] [重复次数]
+
+说明：
+- 样本与 bench_parser_backends.py 相同（优先HTML归档中的列表页）。
+- 峰值内存为 tracemalloc 统计的单页解析与提取期间Python堆分配峰值的平均值。
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+if CURRENT_DIR not in sys.path:
+    sys.path.insert(0, CURRENT_DIR)
+
+from bench_parser_backends import load_pages
+from data_extractor import DataExtractor
+
+
+def extract(extractor, doc):
+    cards = extractor.extract_product_cards(doc) or []
+    return extractor.extract_total_pages(doc), [(c.href, c.text, c.avatar, p, d) for c, p, d in cards]
+
+
+def measure(extractor, parse, pages, repeat: int):
+    """返回 (结果, 每页CPU毫秒, 平均每页峰值KB)"""
+    results = [extract(extractor, parse(html)) for html in pages]
+
+    start = time.process_time()
+    for _ in range(repeat):
+        for html in pages:
+            extract(extractor, parse(html))
+    cpu_ms = (time.process_time() - start) * 1000 / (repeat * len(pages))
+
+    peaks = []
+    for html in pages:
+        tracemalloc.start()
+        extract(extractor, parse(html))
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return results, cpu_ms, sum(peaks) / len(peaks) / 1024
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    _, list_pages = load_pages(limit)
+    print(f"样本: 列表页 {len(list_pages)} 个, 重复 {repeat} 次\n")
+
+    extractor = DataExtractor()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        full, full_ms, full_kb = measure(extractor, extractor.parse, list_pages, repeat)
+        partial, partial_ms, partial_kb = measure(extractor, extractor.parse_list_page, list_pages, repeat)
+
+    print(f"整页解析  {full_ms:8.2f} 毫秒/页   峰值 {full_kb:8.0f} KB/页")
+    print(f"部分解析  {partial_ms:8.2f} 毫秒/页   峰值 {partial_kb:8.0f} KB/页")
+    print(f"CPU 节省 {1 - partial_ms / full_ms:.0%}，峰值内存节省 {1 - partial_kb / full_kb:.0%}，"
+          + ("结果一致" if partial == full else "❌ 结果不一致"))
+    if partial != full:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
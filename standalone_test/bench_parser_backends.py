@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试：比较各解析后端（html.parser / lxml / selectolax）的提取速度与结果一致性。
+
+用法:
+  python bench_parser_backends.py [最多页数] [重复次数]
+
+说明：
+- 优先使用HTML归档（archive/html）中保存的列表页与详情页；
+  归档为空时使用替身服务器的页面模板生成样本。
+- 以 html.parser 的结果为基准，逐页比较 ProductDetails.to_dict() 与列表卡片是否完全一致。
+- 详情页分别计时逐字段提取（各 extract_* 各自查找）与单次遍历提取（extract_product_details），
+  以每页CPU时间（含解析）对比，并校验两者结果一致。
+"""
+
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+if CURRENT_DIR not in sys.path:
+    sys.path.insert(0, CURRENT_DIR)
+
+from data_extractor import PARSER_BACKENDS, create_data_extractor
+from html_archive import HtmlArchive
+from models import ProductDetails
+from mock_bandai_server import render_detail_page, render_list_page
+
+# 覆盖容易出现差异的结构：注释、带属性的<br>、脚本、实体、嵌套与空白
+EDGE_CASE_DETAIL = '''<html><body>
+<h1 class="p-heading__h1-product">  HG 1/144 <span>ガンダム</span>&amp;<!-- c --> 試作機 </h1>
+<div class="pg-products__tag -online -gbase"><i class="pg-products__tagIcon -new"></i></div>
+<div class="swiper-wrapper  pg-products__sliderThumbnailInner">
+  <img src="//example.com/a.jpg"><img alt="no src"><img src="/b.png">
+</div>
+<dl class="pg-products__detail">
+  <dt class="pg-products__label"><span class="pg-products__labelInner">価格</span></dt>
+  <dd class="pg-products__labelTxt note">2,420 円 ( 税10%込 )</dd>
+  <dt class="pg-products__label"><span class="pg-products__labelInner">発売日</span></dt>
+  <dd class="other">skip</dd><dd class="pg-products__labelTxt">2024年 12月</dd>
+  <dt class="pg-products__label"><span class="pg-products__labelInner"></span></dt>
+  <dd class="pg-products__labelTxt">無視</dd>
+</dl>
+<div class="pg-products__article">
+  前文<br>一行目<br/>二行目<br class="sp">三行目<!-- note --><br>四行目
+  <p>段落<b>太字</b><br>続き &lt;br/&gt; 文字列</p><br><br>
+  <script>var x = "<br/>";</script><style>.a{}</style>
+  <ul><li>項目1</li>
+      <li>項目2<br></li></ul>末尾
+  <pre>  整形済み
+
+   <br>  </pre>
+</div>
+<div class="pg-products__instructionTxt">注意<br>事項<span> 詳細 </span></div>
+<a class="c-card__flat p-card__flat" href="/series/g-reco/">R</a>
+<a class="p-card__flat c-card__flat" href="/series/ignored/">X</a>
+<a class="c-card__flat p-card__flat" href="/other/">O</a>
+</body></html>'''
+
+
+def load_pages(limit: int):
+    """读取样本页面，返回 (详情页HTML列表, 列表页HTML列表)"""
+    detail_pages, list_pages = [], []
+    archive_dir = os.path.join(PROJECT_ROOT, 'archive', 'html')
+    if os.path.isdir(archive_dir):
+        archive = HtmlArchive(archive_dir)
+        for kind, pages in (('detail', detail_pages), ('list', list_pages)):
+            for url in archive.list_urls(kind)[:limit]:
+                pages.append(archive.get(url).decode('utf-8', errors='replace'))
+
+    if not detail_pages:
+        detail_pages = [render_detail_page('https://bandai-hobby.net', str(i)) for i in range(1, limit + 1)]
+    if not list_pages:
+        list_pages = [render_list_page('https://bandai-hobby.net', 'mg', i) for i in range(1, min(limit, 10) + 1)]
+    detail_pages.append(EDGE_CASE_DETAIL)
+    return detail_pages, list_pages
+
+
+def extract_detail(extractor, html: str) -> dict:
+    """解析详情页并逐字段提取，返回 ProductDetails.to_dict()"""
+    doc = extractor.parse(html)
+    return ProductDetails(
+        name=extractor.extract_product_name(doc),
+        image_links=extractor.extract_image_links(doc),
+        product_info=extractor.extract_product_info(doc),
+        article_content=extractor.extract_article_content(doc),
+        url='',
+        product_tag=extractor.extract_product_tag(doc),
+        series=extractor.extract_series_links(doc),
+    ).to_dict()
+
+
+def extract_detail_single_pass(extractor, html: str) -> dict:
+    """解析详情页并单次遍历提取，返回 ProductDetails.to_dict()"""
+    fields = extractor.extract_product_details(extractor.parse(html))
+    return ProductDetails(
+        name=fields['name'],
+        image_links=fields['image_links'],
+        product_info=fields['product_info'],
+        article_content=fields['article_content'],
+        url='',
+        product_tag=fields['product_tag'],
+        series=fields['series'],
+    ).to_dict()
+
+
+def cpu_ms_per_page(func, extractor, pages, repeat: int) -> float:
+    """重复提取样本页面，返回平均每页CPU时间（毫秒）"""
+    start = time.process_time()
+    for _ in range(repeat):
+        for html in pages:
+            func(extractor, html)
+    return (time.process_time() - start) * 1000 / (repeat * len(pages))
+
+
+def extract_list(extractor, html: str):
+    """解析列表页并返回 (总页数, 卡片列表)"""
+    doc = extractor.parse_list_page(html)
+    cards = extractor.extract_product_cards(doc) or []
+    return extractor.extract_total_pages(doc), [(c.href, c.text, c.avatar, p, d) for c, p, d in cards]
+
+
+def run_backend(backend: str, detail_pages, list_pages, repeat: int):
+    """运行一个后端，返回 (结果, 单次遍历是否与逐字段一致, 计时)"""
+    extractor = create_data_extractor(backend)
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        details = [extract_detail(extractor, html) for html in detail_pages]
+        single_pass_ok = details == [extract_detail_single_pass(extractor, html) for html in detail_pages]
+        lists = [extract_list(extractor, html) for html in list_pages]
+
+        timings = {
+            'per_field': cpu_ms_per_page(extract_detail, extractor, detail_pages, repeat),
+            'single_pass': cpu_ms_per_page(extract_detail_single_pass, extractor, detail_pages, repeat),
+            'list': cpu_ms_per_page(extract_list, extractor, list_pages, repeat),
+        }
+
+    return (details, lists), single_pass_ok, timings
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    detail_pages, list_pages = load_pages(limit)
+    print(f"样本: 详情页 {len(detail_pages)} 个, 列表页 {len(list_pages)} 个, 重复 {repeat} 次\n")
+
+    print(f"{'后端':<12} {'详情页 逐字段':>14} {'详情页 单次遍历':>14} {'列表页':>10}   （每页CPU毫秒）")
+    baseline = None
+    for backend in PARSER_BACKENDS:
+        try:
+            results, single_pass_ok, timings = run_backend(backend, detail_pages, list_pages, repeat)
+        except ImportError as e:
+            print(f"{backend:<12} 未安装，跳过 ({e})")
+            continue
+
+        if baseline is None:
+            baseline = results
+            status = "基准"
+        else:
+            mismatched = sum(a != b for a, b in zip(results[0], baseline[0])) + \
+                sum(a != b for a, b in zip(results[1], baseline[1]))
+            status = "一致" if mismatched == 0 else f"❌ {mismatched} 页结果不一致"
+        if not single_pass_ok:
+            status += "，❌ 单次遍历与逐字段结果不一致"
+        saving = 1 - timings['single_pass'] / timings['per_field']
+        print(f"{backend:<12} {timings['per_field']:14.2f} {timings['single_pass']:14.2f} {timings['list']:10.2f}   "
+              f"单次遍历节省 {saving:.0%}   {status}")
+
+if __name__ == '__main__':
+    main()
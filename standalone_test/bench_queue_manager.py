@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试：队列操作吞吐量（每次操作新建连接 vs 共用连接 + WAL vs 批量接口 + 写缓冲）。
+
+用法:
+  python bench_queue_manager.py [产品数] [每批数量]
+
+说明：
+- 在临时目录中新建队列数据库，模拟主循环：添加产品到待处理队列，
+  按批获取待处理产品、逐个标记处理中/已完成，每批统计一次队列状态，部分产品加入失败队列。
+- “每次新建连接”以旧实现的方式运行（每个操作 connect → 执行 → commit → close，默认日志模式）。
+- “批量+写缓冲”按 main.py 的方式：每批一次 mark_many_processing，完成/失败经写缓冲在批末一次提交。
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from models import ProductLink
+from queue_manager import QueueManager
+
+
+class PerCallConnectionQueueManager(QueueManager):
+    """旧实现：每个操作单独打开连接，默认（DELETE）日志模式与 synchronous=FULL"""
+
+    def _connect(self):
+        return None
+
+    @contextmanager
+    def _transaction(self, immediate: bool = False):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        try:
+            if immediate:
+                cursor.execute('BEGIN IMMEDIATE')
+            yield cursor
+            conn.commit()
+        finally:
+            conn.close()
+
+    def close(self):
+        pass
+
+
+def run(queue_cls, db_path: str, count: int, batch_size: int):
+    """逐个调用单条接口，返回 (队列操作数, 秒数)"""
+    links = [ProductLink(href=f"https://example.com/item/{i}", text=f"product {i}") for i in range(count)]
+    ops = 0
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        queue = queue_cls(db_path)
+        for page in range(0, count, 50):
+            queue.add_to_pending_queue(links[page:page + 50], page // 50 + 1)
+            ops += 1
+        while True:
+            products = queue.get_pending_products(batch_size)
+            ops += 1
+            if not products:
+                break
+            for product in products:
+                queue.mark_as_processing(product['id'])
+                ops += 1
+            for product in products:
+                if product['id'] % 10 == 0:
+                    queue.add_to_failed_queue(product['url'], product['product_name'], 'error')
+                    ops += 1
+                queue.mark_as_completed(product['id'])
+                ops += 1
+            queue.get_queue_stats()
+            ops += 1
+        queue.close()
+    return ops, time.perf_counter() - start
+
+
+def run_batched(db_path: str, count: int, batch_size: int):
+    """使用批量接口与写缓冲，返回 (队列操作数, 秒数)；操作数按与 run() 相同的口径计"""
+    links = [ProductLink(href=f"https://example.com/item/{i}", text=f"product {i}") for i in range(count)]
+    ops = 0
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        queue = QueueManager(db_path)
+        for page in range(0, count, 50):
+            queue.add_to_pending_queue(links[page:page + 50], page // 50 + 1)
+            ops += 1
+        with queue.write_buffer() as buffer:
+            while True:
+                products = queue.get_pending_products(batch_size)
+                ops += 1
+                if not products:
+                    break
+                queue.mark_many_processing(product['id'] for product in products)
+                ops += len(products)
+                for product in products:
+                    if product['id'] % 10 == 0:
+                        buffer.fail(product['id'], product['url'], product['product_name'], 'error')
+                        ops += 1
+                    else:
+                        buffer.complete(product['id'])
+                    ops += 1
+                buffer.flush()
+                queue.get_queue_stats()
+                ops += 1
+        queue.close()
+    return ops, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print(f"产品 {count} 个，每批 {batch_size} 个\n")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, queue_cls in (('每次新建连接', PerCallConnectionQueueManager), ('共用连接+WAL', QueueManager)):
+            ops, seconds = run(queue_cls, os.path.join(tmp, f"{queue_cls.__name__}.db"), count, batch_size)
+            results[name] = ops / seconds
+            print(f"{name:<12} {ops} 次操作, {seconds:.2f} 秒, {ops / seconds:,.0f} 次/秒")
+        ops, seconds = run_batched(os.path.join(tmp, "batched.db"), count, batch_size)
+        results['批量+写缓冲'] = ops / seconds
+        print(f"{'批量+写缓冲':<12} {ops} 次操作, {seconds:.2f} 秒, {ops / seconds:,.0f} 次/秒")
+
+    baseline = results['每次新建连接']
+    print()
+    for name, rate in list(results.items())[1:]:
+        print(f"{name}: {rate / baseline:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
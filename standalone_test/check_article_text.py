@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+校验脚本：文章区域文本的树内提取与旧实现（序列化、替换 '<br/>'、重新解析）结果逐字一致。
+
+用法:
+  python check_article_text.py [最多页数] [重复次数]
+
+说明：
+- 样本为HTML归档中的详情页（归档为空时使用替身服务器页面）、基准测试的边界用例，
+  以及下方覆盖注释、注音、<pre>、CDATA、实体等结构的片段。
+- 以旧实现为基准，逐页比较所有已安装解析后端的 extract_article_content 结果，
+  并对比 html.parser 下新旧实现的文章提取耗时。
+"""
+
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+if CURRENT_DIR not in sys.path:
+    sys.path.insert(0, CURRENT_DIR)
+
+from bs4 import BeautifulSoup
+
+from bench_parser_backends import load_pages
+from data_extractor import PARSER_BACKENDS, DataExtractor, create_data_extractor
+
+ARTICLE_FRAGMENTS = [
+    '前文<br>一行目<br/>二行目<br class="sp">三行目<!-- c --><br>四行目',
+    '<p>  </p>\n  <br>  \n<p>\t<br>\t</p>',
+    '漢<ruby>字<rt>じ</rt><rp>(</rp></ruby>を読む<br>次',
+    '<pre>  整形済み\n\n   <br>  </pre>  後<br><br>',
+    'A&amp;B &lt;br/&gt; C&nbsp;D<br>&#x3042;',
+    '<b>太字</b><br><i>斜体</i> <br> 普通<br><span><br></span>',
+    '<template>t<br>t</template><script>"<br/>"</script><style>a{}</style>残り',
+    '<ul>\n<li>項目1<br>補足</li>\n<li>項目2</li>\n</ul>\n',
+]
+
+# <textarea> 内容与 CDATA 的分词方式取决于解析器本身（html.parser 与 HTML5 规范不同），只校验 html.parser
+HTML_PARSER_ONLY_FRAGMENTS = [
+    '<textarea>\n a <br> b \n</textarea>',
+    '<![CDATA[ x <br> y ]]>後',
+]
+
+
+class ReparseDataExtractor(DataExtractor):
+    """旧实现：序列化文章区域、将 '<br/>' 替换为空格后重新解析"""
+
+    def _article_text(self, node):
+        html_content = str(node)
+        html_content = html_content.replace('<br/>', ' ')
+        temp_soup = BeautifulSoup(html_content, 'html.parser')
+        return temp_soup.get_text(separator='\n', strip=False)
+
+
+def fragment_page(fragment: str) -> str:
+    return f'<html><body><div class="pg-products__article">{fragment}</div></body></html>'
+
+
+def article_seconds(extractor, docs, repeat: int) -> float:
+    """只计文章提取本身的耗时（文档已解析）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for doc in docs:
+            extractor.extract_article_content(doc)
+    return time.perf_counter() - start
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    detail_pages, _ = load_pages(limit)
+    pages = detail_pages + [fragment_page(fragment) for fragment in ARTICLE_FRAGMENTS]
+    parser_only_pages = [fragment_page(fragment) for fragment in HTML_PARSER_ONLY_FRAGMENTS]
+    print(f"样本: {len(pages)} 个页面（另有 {len(parser_only_pages)} 个仅校验 html.parser）\n")
+
+    reference = ReparseDataExtractor()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        expected = [reference.extract_article_content(reference.parse(html)) for html in pages + parser_only_pages]
+
+    failed = False
+    for backend in PARSER_BACKENDS:
+        try:
+            extractor = create_data_extractor(backend)
+        except ImportError as e:
+            print(f"{backend:<12} 未安装，跳过 ({e})")
+            continue
+        checked = pages + parser_only_pages if backend == 'html.parser' else pages
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            actual = [extractor.extract_article_content(extractor.parse(html)) for html in checked]
+        mismatched = [i for i, (a, b) in enumerate(zip(actual, expected)) if a != b]
+        if mismatched:
+            failed = True
+            print(f"{backend:<12} ❌ {len(mismatched)} 页不一致")
+            for i in mismatched[:3]:
+                print(f"  第 {i} 页\n    旧实现: {expected[i]!r}\n    当前:   {actual[i]!r}")
+        else:
+            print(f"{backend:<12} ✅ 全部一致")
+
+    current = DataExtractor()
+    docs = [current.parse(html) for html in pages]
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        old_seconds = article_seconds(reference, docs, repeat)
+        new_seconds = article_seconds(current, docs, repeat)
+    count = repeat * len(docs)
+    print(f"\nhtml.parser 文章提取: 重新解析 {old_seconds * 1000 / count:.2f} 毫秒/页，"
+          f"树内提取 {new_seconds * 1000 / count:.2f} 毫秒/页（{old_seconds / new_seconds:.1f}x）")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
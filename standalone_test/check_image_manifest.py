@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片清单查看工具：列出全部产品中还需要下载的图片（只查询清单，不访问各产品的图片目录）
+
+用法:
+  python check_image_manifest.py [最多显示产品数]
+"""
+
+import sys
+import os
+
+# 确保可导入 src 目录
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from image_manifest import ImageManifest
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    manifest = ImageManifest()
+    manifest.report()
+
+    pending = manifest.pending()
+    print(f"\n=== 待下载图片 (显示前 {limit} 个产品) ===")
+    if not pending:
+        print("没有待下载的图片")
+        return
+    for images_dir, urls in list(pending.items())[:limit]:
+        print(f"{images_dir}: {len(urls)} 张")
+        for url in urls[:3]:
+            print(f"  {url}")
+        if len(urls) > 3:
+            print(f"  ... 另有 {len(urls) - 3} 张")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+队列后端一致性检查：对 SQLite 与 Redis 两个队列后端执行同一串操作
+（添加 → 领取 → 续约 → 完成/失败 → 租约到期重置 → 失败队列重试/删除/清空），比较每一步的结果。
+
+用法:
+  python check_queue_backends.py            # Redis 后端使用 fakeredis（需安装 fakeredis，无需 Redis 服务器）
+  python check_queue_backends.py --server   # Redis 后端连接 REDIS_URL 指向的服务器（使用独立的键前缀，结束后删除）
+
+说明：
+- 两个后端的产品ID都从1开始按加入顺序递增，结果中的ID可直接比较；时间字段不参与比较。
+- 任一步结果不一致时退出码为1。
+"""
+
+import os
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import redirect_stdout
+
+# 确保可导入 src 目录
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from models import ProductLink
+from queue_manager import QueueBackend, create_queue_manager
+
+LEASE_SECONDS = 1.0
+PRODUCT_FIELDS = ('id', 'url', 'product_name', 'page_number')
+FAILED_FIELDS = ('url', 'product_name', 'error_message', 'retry_count', 'permanent')
+
+
+def products(rows):
+    return [tuple(row[field] for field in PRODUCT_FIELDS) for row in rows]
+
+
+def failed(rows):
+    return [tuple(row[field] for field in FAILED_FIELDS) for row in rows]
+
+
+def run_flow(queue: QueueBackend):
+    """执行检查用的操作序列，返回 [(步骤名, 结果)]"""
+    steps = []
+    links = [ProductLink(href=f"https://example.com/item/{i}", text=f"product {i}") for i in range(8)]
+
+    steps.append(('添加（含重复URL与无链接卡片）', queue.add_to_pending_queue(
+        links[:5] + [links[0], ProductLink(href=None, text='no link')], page_number=1)))
+    steps.append(('再次添加', queue.add_to_pending_queue(links[3:], page_number=2)))
+    steps.append(('统计', queue.get_queue_stats()))
+    steps.append(('按ID翻页', products(queue.get_pending_page(after_id=2, limit=3))))
+
+    claimed = queue.claim_pending_products(4)
+    steps.append(('领取4个', products(claimed)))
+    steps.append(('续约', queue.renew_leases([row['id'] for row in claimed])))
+    steps.append(('处理中翻页', products(queue.get_pending_page(status='processing'))))
+
+    with queue.write_buffer() as buffer:
+        buffer.complete(claimed[0]['id'])
+        buffer.fail(claimed[1]['id'], claimed[1]['url'], claimed[1]['product_name'], 'HTTP 404: Not Found')
+    queue.add_to_failed_queue(claimed[2]['url'], claimed[2]['product_name'], 'HTTP 503: Service Unavailable')
+    queue.mark_as_completed(claimed[2]['id'])
+    steps.append(('完成/失败后统计', queue.get_queue_stats()))
+
+    # 同一URL再次失败：按URL合并，重试次数累加
+    queue.add_to_failed_queue(claimed[2]['url'], claimed[2]['product_name'], 'timeout')
+    steps.append(('失败队列', failed(queue.get_failed_page())))
+    steps.append(('失败队列（倒序）', failed(queue.get_failed_page(newest_first=True))))
+    steps.append(('到期可重试（未到期）', failed(queue.get_due_failed())))
+
+    time.sleep(LEASE_SECONDS + 0.2)
+    steps.append(('租约到期重置', queue.reset_processing_to_pending()))
+    steps.append(('重置后领取', products(queue.claim_pending_products(2))))
+    steps.append(('重置后统计', queue.get_queue_stats()))
+
+    failed_rows = queue.get_failed_page()
+    queue.increment_failed_retry(failed_rows[-1]['id'], 'HTTP 410: Gone')
+    steps.append(('重试失败后', failed(queue.get_failed_page())))
+    queue.remove_failed(failed_rows[0]['id'])
+    steps.append(('删除一条失败记录', failed(queue.get_failed_page())))
+    steps.append(('清理已完成', queue.clear_completed()))
+    steps.append(('清空失败队列', queue.clear_failed()))
+    steps.append(('最终统计', queue.get_queue_stats()))
+    return steps
+
+
+def redis_queue(use_server: bool) -> QueueBackend:
+    """创建用于检查的 Redis 队列（fakeredis 或真实服务器上的独立前缀）"""
+    prefix = f"bandai:check:{uuid.uuid4().hex[:8]}"
+    if use_server:
+        return create_queue_manager('redis', prefix=prefix, worker_id='checker', lease_seconds=LEASE_SECONDS)
+    import fakeredis
+    client = fakeredis.FakeRedis(decode_responses=True)
+    return create_queue_manager('redis', prefix=prefix, worker_id='checker', lease_seconds=LEASE_SECONDS,
+                                client=client)
+
+
+def main():
+    use_server = '--server' in sys.argv[1:]
+    try:
+        redis_backend = redis_queue(use_server)
+    except ImportError as e:
+        print(f"❌ 无法创建 Redis 后端: {e}（需安装 redis 与 fakeredis）")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            sqlite_backend = create_queue_manager('sqlite', db_path=os.path.join(work_dir, 'queue.db'),
+                                                  worker_id='checker', lease_seconds=LEASE_SECONDS)
+            with sqlite_backend:
+                sqlite_steps = run_flow(sqlite_backend)
+            try:
+                redis_steps = run_flow(redis_backend)
+            finally:
+                if use_server:
+                    keys = list(redis_backend.redis.scan_iter(f"{redis_backend.prefix}:*"))
+                    if keys:
+                        redis_backend.redis.delete(*keys)
+                redis_backend.close()
+
+    mismatches = 0
+    for (step, sqlite_result), (_, redis_result) in zip(sqlite_steps, redis_steps):
+        if sqlite_result == redis_result:
+            print(f"✅ {step}: {sqlite_result}")
+        else:
+            mismatches += 1
+            print(f"❌ {step}:\n   sqlite: {sqlite_result}\n   redis:  {redis_result}")
+
+    print(f"\n{'Redis' if use_server else 'fakeredis'} 与 SQLite 后端: "
+          f"{len(sqlite_steps) - mismatches}/{len(sqlite_steps)} 步一致")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
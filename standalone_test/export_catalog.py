@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+产品目录库工具
+
+- json [--all]：把目录库中的产品导出为各产品文件夹中的 product_details.json（默认只导出有变化的）
+- parquet [输出目录] [品牌]：导出为按品牌分区的 Parquet 数据集（需安装 pyarrow）
+- import [数据目录]：把已有的 product_details.json 导入目录库（目录库出现之前保存的产品）
+- stats：查看目录库统计信息
+"""
+
+import sys
+import os
+
+# 确保可导入 src 目录
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from catalog_store import CatalogStore
+from config import Config, CATALOG_PARQUET_DIR
+
+
+def main():
+    """主函数"""
+    if len(sys.argv) < 2:
+        print("用法:")
+        print("  python export_catalog.py json [--all]      # 导出 product_details.json（默认只导出有变化的产品）")
+        print("  python export_catalog.py parquet [输出目录] [品牌]  # 导出按品牌分区的 Parquet 数据集")
+        print("  python export_catalog.py import [数据目录]  # 导入已有的 product_details.json")
+        print("  python export_catalog.py stats             # 查看统计信息")
+        return
+
+    command = sys.argv[1]
+    with CatalogStore() as catalog:
+        if command == "json":
+            catalog.export_json(only_changed='--all' not in sys.argv[2:])
+        elif command == "parquet":
+            from parquet_export import export_parquet
+            output_dir = sys.argv[2] if len(sys.argv) > 2 else CATALOG_PARQUET_DIR
+            brand = sys.argv[3].upper() if len(sys.argv) > 3 else None
+            export_parquet(catalog, output_dir, brand=brand)
+        elif command == "import":
+            data_dir = sys.argv[2] if len(sys.argv) > 2 else Config.DATA_DIR
+            catalog.import_json(data_dir)
+        elif command == "stats":
+            catalog.report()
+        else:
+            print("未知命令")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+产品分面查询工具
+
+按品牌 / 系列 / 标签筛选产品目录库中的产品（条件全部满足），例如 MG 中 seed 系列的高达基地限定：
+  python facet_query.py --brand MG --series seed --tag gbase
+"""
+
+import sys
+import os
+
+# 确保可导入 src 目录
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from catalog_store import CatalogStore
+from facet_index import FACET_FIELDS
+
+
+def main():
+    """主函数"""
+    args = sys.argv[1:]
+    if len(args) == 2 and args[0] == 'values':
+        with CatalogStore() as catalog:
+            values = catalog.facet_values(args[1])
+        print(f"=== {args[1]} 的取值（{len(values)} 个） ===")
+        for value, count in values:
+            print(f"{value}: {count}")
+        return
+
+    brand, series, tags, limit = None, [], [], None
+    try:
+        while args:
+            option, value = args[0], args[1]
+            if option == '--brand':
+                brand = value.upper()
+            elif option == '--series':
+                series.append(value)
+            elif option == '--tag':
+                tags.append(value)
+            elif option == '--limit':
+                limit = int(value)
+            else:
+                raise ValueError(option)
+            args = args[2:]
+    except (IndexError, ValueError):
+        args = ['?']
+
+    if args or not (brand or series or tags):
+        print("用法:")
+        print("  python facet_query.py [--brand 品牌] [--series 系列 ...] [--tag 标签 ...] [--limit 数量]")
+        print(f"  python facet_query.py values 字段   # 查看字段的全部取值（{' / '.join(FACET_FIELDS)}）")
+        return
+
+    with CatalogStore() as catalog:
+        results = catalog.facet_query(brand, series, tags, limit)
+
+    print(f"=== {len(results)} 个产品 ===")
+    for product in results:
+        print(f"[{product['brand'] or '-'}] {product['product_name']}")
+        print(f"   URL: {product['url']}")
+        print(f"   文件夹: {product['product_dir']}")
+
+
+if __name__ == "__main__":
+    main()
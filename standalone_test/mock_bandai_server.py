@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地替身服务器：模拟 bandai-hobby.net 的列表页、详情页与图片，用于基准测试。
+
+用法:
+  python mock_bandai_server.py [端口] [延迟毫秒]
+
+页面结构与 config.CSS_SELECTORS 保持一致：
+- /brand/<slug>/?p=N     列表页（每页 CARDS_PER_PAGE 个产品卡片）
+- /item/01_<id>/         详情页（IMAGES_PER_ITEM 张缩略图）
+- /img/<id>_<n>.png      图片
+"""
+
+import hashlib
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+TOTAL_PAGES = 5
+CARDS_PER_PAGE = 20
+IMAGES_PER_ITEM = 4
+
+# 1x1 PNG
+PNG_BYTES = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000100ffff03000006000557bfabd4'
+    '0000000049454e44ae426082'
+)
+
+
+def render_list_page(origin: str, slug: str, page: int) -> str:
+    """生成列表页HTML"""
+    cards = []
+    for i in range(CARDS_PER_PAGE):
+        item_id = (page - 1) * CARDS_PER_PAGE + i + 1
+        cards.append(f'''
+      <a href="{origin}/item/01_{item_id}/" class="p-card">
+        <div class="p-card__img"><img src="{origin}/img/{item_id}_avatar.png" alt=""></div>
+        <p class="p-card__tit">MG 1/100 テスト機体 No.{item_id}</p>
+        <p class="p-card__price">{4000 + item_id * 10}円(税10%込)</p>
+        <p class="p-card_date">2025年{(item_id % 12) + 1}月</p>
+      </a>''')
+    pagination = ''.join(
+        f'<li><a class="c-archives__pagination-list-item-link" href="/brand/{slug}/?p={n}">{n}</a></li>'
+        for n in range(1, TOTAL_PAGES + 1)
+    )
+    return f'''<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8"><title>{slug}</title></head>
+<body>
+  <header><nav>{'<a href="/">menu</a>' * 30}</nav></header>
+  <main>
+    <div class="p-card__wrap c-grid -cols2-1">{''.join(cards)}
+    </div>
+    <ul class="c-archives__pagination-list">{pagination}</ul>
+  </main>
+  <footer>{'<p>footer text</p>' * 30}</footer>
+</body></html>'''
+
+
+def render_detail_page(origin: str, item_id: str) -> str:
+    """生成详情页HTML"""
+    thumbs = ''.join(
+        f'<div class="swiper-slide"><img src="{origin}/img/{item_id}_{n}.png" alt=""></div>'
+        for n in range(1, IMAGES_PER_ITEM + 1)
+    )
+    article = '<br>'.join(f'テスト機体の説明文 その{n}。可動域が広く、&amp;ポーズも自在。' for n in range(1, 15))
+    return f'''<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8"><title>item {item_id}</title></head>
+<body>
+  <header><nav>{'<a href="/">menu</a>' * 30}</nav></header>
+  <main>
+    <h1 class="p-heading__h1-product">MG 1/100 テスト機体 No.{item_id}</h1>
+    <div class="pg-products__tags">
+      <span class="pg-products__tag -online">プレミアムバンダイ</span>
+      <span class="pg-products__tag -gbase">ガンダムベース限定</span>
+    </div>
+    <div class="swiper-wrapper pg-products__sliderThumbnailInner">{thumbs}</div>
+    <dl class="pg-products__detail">
+      <dt class="pg-products__label"><span class="pg-products__labelInner">価格</span></dt>
+      <dd class="pg-products__labelTxt">5,500 円 (税10%込)</dd>
+      <dt class="pg-products__label"><span class="pg-products__labelInner">発売日</span></dt>
+      <dd class="pg-products__labelTxt">2025年 3月</dd>
+      <dt class="pg-products__label"><span class="pg-products__labelInner">対象年齢</span></dt>
+      <dd class="pg-products__labelTxt">15歳以上</dd>
+    </dl>
+    <div class="pg-products__article"><p>{article}</p><p>セット内容：本体、<b>武器</b>一式<br/>マーキングシール</p></div>
+    <p class="pg-products__instructionTxt">※画像は開発中のものです。</p>
+    <a class="c-card__flat p-card__flat" href="/series/seed/">SEED</a>
+    <a class="c-card__flat p-card__flat" href="/series/unicorn/">UC</a>
+  </main>
+  <footer>{'<p>footer text</p>' * 30}</footer>
+</body></html>'''
+
+
+class MockBandaiHandler(BaseHTTPRequestHandler):
+    """替身服务器请求处理器"""
+
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+        parsed = urlparse(self.path)
+        origin = f"http://{self.headers.get('Host')}"
+        parts = [p for p in parsed.path.split('/') if p]
+
+        if len(parts) >= 2 and parts[0] == 'brand':
+            page = int(parse_qs(parsed.query).get('p', ['1'])[0])
+            self._send(200, 'text/html; charset=utf-8', render_list_page(origin, parts[1], page).encode('utf-8'))
+        elif len(parts) >= 2 and parts[0] == 'item':
+            item_id = parts[1].split('_')[-1]
+            self._send(200, 'text/html; charset=utf-8', render_detail_page(origin, item_id).encode('utf-8'))
+        elif len(parts) >= 2 and parts[0] == 'img':
+            self._send(200, 'image/png', PNG_BYTES)
+        else:
+            self._send(404, 'text/plain', b'not found')
+
+    def _send(self, status: int, content_type: str, body: bytes):
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if status == 200:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, latency_ms: float = 0.0) -> ThreadingHTTPServer:
+    """
+    在后台线程启动替身服务器
+
+    Args:
+        port: 监听端口，0 表示随机端口
+        latency_ms: 每个请求的模拟延迟（毫秒）
+
+    Returns:
+        ThreadingHTTPServer: 已启动的服务器（server.server_address 可获取端口）
+    """
+    handler = type('Handler', (MockBandaiHandler,), {'latency': latency_ms / 1000.0})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    server = start_server(port, latency_ms)
+    print(f"替身服务器已启动: http://127.0.0.1:{server.server_address[1]} (延迟 {latency_ms}ms)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
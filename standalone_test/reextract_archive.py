@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+一次性脚本：从HTML归档离线重新提取产品详情（不访问网络、不下载图片）。
+
+用法（可选传参）:
+  python reextract_archive.py [BRAND_CODE ...]
+
+说明：
+- 不传品牌时处理 data/ 下的所有品牌目录。
+- 遍历产品目录库中 data/<BRAND>/ 下的产品，按其 url 从归档读取页面，
+  用当前的 DataExtractor 重新提取并覆盖保存，产品文件夹保持不变。
+  （目录库出现之前保存的产品需先运行 export_catalog.py import 导入）
+- 归档中没有的页面会被跳过。
+"""
+
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+# 确保可导入 src 目录
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from scraper import BandaiScraper
+from catalog_store import CatalogStore
+from config import Config, CATALOG_EXPORT_JSON
+
+
+def iter_product_dirs(catalog: CatalogStore, brand_dir: str):
+    """遍历目录库中位于品牌目录下的产品，产出 (文件夹名, url)"""
+    brand_dir = os.path.normpath(brand_dir)
+    products = [
+        (os.path.basename(record['product_dir']), record['url'])
+        for record in catalog.iter_records()
+        if os.path.dirname(record['product_dir']) == brand_dir and record.get('url')
+    ]
+    return sorted(products)
+
+
+def main():
+    brand_codes = sys.argv[1:] or sorted(
+        d for d in os.listdir(Config.DATA_DIR) if os.path.isdir(os.path.join(Config.DATA_DIR, d))
+    )
+
+    scraper = BandaiScraper(replay=True)
+    archived_urls = set(scraper.html_archive.list_urls('detail'))
+    print(f"归档中共有 {len(archived_urls)} 个详情页")
+
+    success_count = 0
+    failed_count = 0
+    skipped_count = 0
+    start = time.perf_counter()
+
+    for brand_code in brand_codes:
+        base_dir = os.path.join(Config.DATA_DIR, brand_code)
+        if not os.path.isdir(base_dir):
+            print(f"品牌目录不存在，跳过: {base_dir}")
+            continue
+
+        for folder_name, url in iter_product_dirs(scraper.catalog, base_dir):
+            if url not in archived_urls:
+                skipped_count += 1
+                continue
+            # 逐条日志过多，重放时静默提取过程
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                result = scraper.scrape_product_details(
+                    product_url=url,
+                    base_dir=base_dir,
+                    queue_product_name=folder_name
+                )
+            if result:
+                success_count += 1
+            else:
+                failed_count += 1
+                print(f"❌ 重新提取失败: {base_dir}/{folder_name}")
+
+    if CATALOG_EXPORT_JSON:
+        scraper.catalog.export_json()
+    scraper.catalog.close()
+    elapsed = time.perf_counter() - start
+    print("\n=== 重新提取完成 ===")
+    print(f"成功: {success_count}，失败: {failed_count}，未归档跳过: {skipped_count}")
+    print(f"耗时: {elapsed:.1f} 秒" + (f"（{success_count / elapsed:.1f} 个/秒）" if elapsed > 0 else ""))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,11 +4,12 @@
 一次性脚本：重试失败队列中的任务。
 
 用法（可选传参）:
-  python retry_failed.py [BRAND_CODE]
+  python retry_failed.py [BRAND_CODE] [最多重试数]
 
 说明：
 - BRAND_CODE 默认为 HG，可传 MG/RG/PG...
-- 成功则从失败队列移除；失败则仅累加重试计数，仍留在失败队列。
+- 只重试已到重试时间的暂时失败（超时、限流等）；永久失败（404 等）不再重试。
+- 成功则从失败队列移除；失败则累加重试计数并按指数退避推迟下次重试。
 """
 
 import sys
@@ -23,20 +24,21 @@ if SRC_DIR not in sys.path:
     sys.path.insert(0, SRC_DIR)
 
 from scraper import BandaiScraper
-from queue_manager import QueueManager
-from config import Config
+from queue_manager import create_queue_manager
+from config import CATALOG_EXPORT_JSON
 
 
 def main():
     brand_code = sys.argv[1] if len(sys.argv) > 1 else 'HG'
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 100
     print(f"重试失败队列，品牌: {brand_code}")
 
     scraper = BandaiScraper()
-    queue_manager = QueueManager(Config.DATABASE_PATH)
+    queue_manager = create_queue_manager()
 
-    failed_items = queue_manager.get_failed_products(limit=1000)
+    failed_items = queue_manager.get_due_failed(limit=limit)
     if not failed_items:
-        print("失败队列为空，无需重试。")
+        print("没有到达重试时间的失败任务，无需重试。")
         return
 
     print(f"待重试失败任务: {len(failed_items)}")
@@ -65,14 +67,19 @@ def main():
                 success_count += 1
                 print("✅ 重试成功，已从失败队列移除")
             else:
-                queue_manager.increment_failed_retry(failed_id)
+                reason = scraper.failure_reasons.pop(url, None)
+                queue_manager.increment_failed_retry(failed_id, reason)
                 failed_count += 1
-                print("❌ 重试失败，已累计重试次数")
+                print("❌ 重试失败，已累计重试次数并推迟下次重试")
         except Exception as e:
-            queue_manager.increment_failed_retry(failed_id)
+            queue_manager.increment_failed_retry(failed_id, str(e))
             failed_count += 1
             print(f"❌ 重试异常: {e}")
 
+    if CATALOG_EXPORT_JSON:
+        scraper.catalog.export_json()
+    scraper.catalog.close()
+
     print("\n=== 重试完成 ===")
     print(f"成功: {success_count}，失败: {failed_count}")
 
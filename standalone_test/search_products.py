@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+产品全文检索工具
+
+在产品目录库的名称与介绍文字中检索，输出匹配产品的URL、品牌与文件夹。
+多个检索词以空格分隔时须全部出现；不少于3个字符的词走全文索引。
+"""
+
+import sys
+import os
+
+# 确保可导入 src 目录
+CURRENT_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from catalog_store import CatalogStore
+
+
+def main():
+    """主函数"""
+    args = sys.argv[1:]
+    brand = None
+    limit = 50
+    if '--brand' in args:
+        index = args.index('--brand')
+        brand = args[index + 1].upper()
+        del args[index:index + 2]
+    if '--limit' in args:
+        index = args.index('--limit')
+        limit = int(args[index + 1])
+        del args[index:index + 2]
+
+    if not args:
+        print("用法:")
+        print("  python search_products.py 检索词 [检索词 ...] [--brand 品牌] [--limit 数量]")
+        return
+
+    query = ' '.join(args)
+    with CatalogStore() as catalog:
+        results = catalog.search(query, limit=limit, brand=brand)
+
+    print(f"=== 检索 \"{query}\"{f'（品牌 {brand}）' if brand else ''}：{len(results)} 个结果 ===")
+    for i, product in enumerate(results, 1):
+        print(f"{i}. [{product['brand'] or '-'}] {product['product_name']}")
+        print(f"   URL: {product['url']}")
+        print(f"   文件夹: {product['product_dir']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,12 +14,11 @@ SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
 if SRC_DIR not in sys.path:
     sys.path.insert(0, SRC_DIR)
 
-from queue_manager import QueueManager
-from config import Config
+from queue_manager import create_queue_manager
 
 def view_queue_stats():
     """查看队列统计信息"""
-    queue_manager = QueueManager(Config.DATABASE_PATH)
+    queue_manager = create_queue_manager()
     stats = queue_manager.get_queue_stats()
     
     print("=== 队列统计信息 ===")
@@ -29,71 +28,55 @@ def view_queue_stats():
     print(f"失败: {stats['failed']}")
     print(f"总计: {sum(stats.values())}")
 
-def view_pending_queue(limit=20):
-    """查看待处理队列"""
-    queue_manager = QueueManager(Config.DATABASE_PATH)
-    products = queue_manager.get_pending_products(limit)
+def view_pending_queue(limit=20, after_id=0):
+    """查看待处理队列（按ID翻页）"""
+    queue_manager = create_queue_manager()
+    products = queue_manager.get_pending_page(after_id, limit)
     
-    print(f"\n=== 待处理队列 (显示前 {limit} 个) ===")
+    print(f"\n=== 待处理队列 (ID {after_id} 之后的 {limit} 个) ===")
     if not products:
         print("队列为空")
         return
     
-    for i, product in enumerate(products, 1):
-        print(f"{i}. {product['product_name']}")
+    for product in products:
+        print(f"{product['id']}. {product['product_name']}")
         print(f"   URL: {product['url']}")
         print(f"   页码: {product['page_number']}")
         print(f"   创建时间: {product['created_at']}")
         print()
+    if len(products) == limit:
+        print(f"下一页: python view_queue.py pending {limit} {products[-1]['id']}")
 
-def view_failed_queue(limit=20):
-    """查看失败队列"""
-    import sqlite3
+def view_failed_queue(limit=20, before_id=None):
+    """查看失败队列（从最新的记录往前按ID翻页）"""
+    queue_manager = create_queue_manager()
+    products = queue_manager.get_failed_page(before_id, limit, newest_first=True)
     
-    conn = sqlite3.connect(Config.DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT url, product_name, error_message, retry_count, created_at
-        FROM failed_queue 
-        ORDER BY created_at DESC
-        LIMIT ?
-    ''', (limit,))
-    
-    products = cursor.fetchall()
-    conn.close()
-    
-    print(f"\n=== 失败队列 (显示前 {limit} 个) ===")
+    title = f"ID {before_id} 之前的 {limit} 个" if before_id is not None else f"最新的 {limit} 个"
+    print(f"\n=== 失败队列 ({title}) ===")
     if not products:
         print("失败队列为空")
         return
     
-    for i, product in enumerate(products, 1):
-        print(f"{i}. {product[1]}")
-        print(f"   URL: {product[0]}")
-        print(f"   错误: {product[2]}")
-        print(f"   重试次数: {product[3]}")
-        print(f"   创建时间: {product[4]}")
+    for product in products:
+        print(f"{product['id']}. {product['product_name']}")
+        print(f"   URL: {product['url']}")
+        print(f"   错误: {product['error_message']}")
+        print(f"   重试次数: {product['retry_count']}")
+        print(f"   创建时间: {product['created_at']}")
         print()
+    if len(products) == limit:
+        print(f"下一页: python view_queue.py failed {limit} {products[-1]['id']}")
 
 def clear_failed_queue():
     """清空失败队列"""
-    import sqlite3
-    
-    conn = sqlite3.connect(Config.DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT COUNT(*) FROM failed_queue')
-    count = cursor.fetchone()[0]
+    queue_manager = create_queue_manager()
+    count = queue_manager.clear_failed()
     
     if count > 0:
-        cursor.execute('DELETE FROM failed_queue')
-        conn.commit()
         print(f"✅ 已清空失败队列，删除了 {count} 个记录")
     else:
         print("失败队列为空")
-    
-    conn.close()
 
 def main():
     """主函数"""
@@ -104,20 +87,22 @@ def main():
             view_queue_stats()
         elif command == "pending":
             limit = int(sys.argv[2]) if len(sys.argv) > 2 else 20
-            view_pending_queue(limit)
+            after_id = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+            view_pending_queue(limit, after_id)
         elif command == "failed":
             limit = int(sys.argv[2]) if len(sys.argv) > 2 else 20
-            view_failed_queue(limit)
+            before_id = int(sys.argv[3]) if len(sys.argv) > 3 else None
+            view_failed_queue(limit, before_id)
         elif command == "clear-failed":
             clear_failed_queue()
         else:
             print("未知命令")
     else:
         print("用法:")
-        print("  python view_queue.py stats              # 查看统计信息")
-        print("  python view_queue.py pending [数量]     # 查看待处理队列")
-        print("  python view_queue.py failed [数量]      # 查看失败队列")
-        print("  python view_queue.py clear-failed       # 清空失败队列")
+        print("  python view_queue.py stats                    # 查看统计信息")
+        print("  python view_queue.py pending [数量] [起始ID]  # 查看待处理队列（从起始ID之后翻页）")
+        print("  python view_queue.py failed [数量] [起始ID]   # 查看失败队列（从最新往前，起始ID之前翻页）")
+        print("  python view_queue.py clear-failed             # 清空失败队列")
 
 if __name__ == "__main__":
     main()